@@ -0,0 +1,5 @@
+# benchmarks
+#
+# Benchmark kecepatan dan akurasi tanpa kamera:
+#   python -m benchmarks.run_benchmarks --out report.json   # pipeline per stage + akurasi HR/RR
+#   python -m benchmarks.bench_pos                           # POS loop vs vektorisasi
@@ -0,0 +1,95 @@
+# benchmarks/bench_pos.py
+#
+# Throughput batch POS: loop per jendela (implementasi lama) vs vektorisasi.
+# Jalankan dari root repo:  python benchmarks/bench_pos.py
+
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from signal_utils import compute_pos  # noqa: E402
+
+
+def compute_pos_loop(signal, fps=30):
+    """
+    Reference: the original per-window POS loop (single estimator).
+    """
+    eps = 1e-9
+    e, c, f = signal.shape
+    w = int(1.6 * fps)
+    P = np.array([[0, 1, -1], [-2, 1, 1]])
+    Q = np.stack([P for _ in range(e)], axis=0)
+    H = np.zeros((e, f))
+
+    for n in np.arange(w, f):
+        m = n - w + 1
+        Cn = signal[:, :, m:(n + 1)]
+        M = 1.0 / (np.mean(Cn, axis=2) + eps)
+        M = np.expand_dims(M, axis=2)
+        Cn = np.multiply(M, Cn)
+        S = np.dot(Q, Cn)[0]
+        S = np.swapaxes(S, 0, 1)
+        S1, S2 = S[:, 0, :], S[:, 1, :]
+        alpha = np.std(S1, axis=1) / (np.std(S2, axis=1) + eps)
+        alpha = np.expand_dims(alpha, axis=1)
+        Hn = S1 + alpha * S2
+        Hn -= np.expand_dims(np.mean(Hn, axis=1), axis=1)
+        H[:, m:(n + 1)] += Hn
+
+    return H.reshape(-1)
+
+
+def synthetic_rgb(n_frames, n_estimators=1, fps=30, hr_hz=1.2, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n_frames) / fps
+    pulse = np.sin(2 * np.pi * hr_hz * t)
+    base = np.array([150.0, 110.0, 90.0])[np.newaxis, :, np.newaxis]
+    gain = np.array([0.3, 0.6, 0.2])[np.newaxis, :, np.newaxis]
+    noise = rng.normal(scale=0.5, size=(n_estimators, 3, n_frames))
+    return base + gain * pulse + noise
+
+
+def time_call(fn, *args, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark batch POS")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--estimators", type=int, default=8,
+                        help="jumlah ROI untuk baris multi-ROI")
+    parser.add_argument("--fps", type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"{'frames':>8} | {'loop (s)':>9} | {'vector (s)':>10} | {'loop fps':>10} | "
+          f"{'vector fps':>11} | {'speedup':>7} | max |diff|")
+    for n in args.sizes:
+        signal = synthetic_rgb(n, fps=args.fps)
+        ref = compute_pos_loop(signal, fps=args.fps)
+        out = compute_pos(signal, fps=args.fps).reshape(-1)
+        diff = np.max(np.abs(ref - out))
+
+        t_loop = time_call(compute_pos_loop, signal, args.fps, repeat=1)
+        t_vec = time_call(compute_pos, signal, args.fps)
+        print(f"{n:>8} | {t_loop:>9.3f} | {t_vec:>10.4f} | {n / t_loop:>10.0f} | "
+              f"{n / t_vec:>11.0f} | {t_loop / t_vec:>6.1f}x | {diff:.2e}")
+
+    # Multi-ROI: semua estimator dalam satu panggilan
+    n = args.sizes[-1]
+    signal = synthetic_rgb(n, n_estimators=args.estimators, fps=args.fps)
+    t_multi = time_call(compute_pos, signal, args.fps)
+    print(f"\n{args.estimators} ROI x {n} frames: {t_multi:.4f} s "
+          f"({args.estimators * n / t_multi:.0f} ROI-frames/s)")
+
+
+if __name__ == "__main__":
+    main()
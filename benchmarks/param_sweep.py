@@ -0,0 +1,234 @@
+# benchmarks/param_sweep.py
+#
+# Sweep parameter tahap sinyal (band filter, jendela POS, prominence puncak,
+# orde filter respirasi, ...) di atas trace rekaman. Tahap mahal (decode
+# video, MediaPipe, rata-rata ROI) hanya dijalankan sekali per sumber lalu
+# disimpan sebagai trace; tiap kombinasi parameter cukup me-replay trace
+# (memmap) di process pool.
+#
+#   python -m benchmarks.param_sweep --synthetic --out sweep.csv
+#   python -m benchmarks.param_sweep sesi01 rekaman.mp4 --grid grid.json --true-hr 72
+
+import argparse
+import concurrent.futures
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from frame_context import FrameContext  # noqa: E402
+from rppg_processor import RPPGProcessor  # noqa: E402
+from respirasi_processor import RespirasiProcessor  # noqa: E402
+from trace_io import TraceRecorder, TraceReader, ReplaySource  # noqa: E402
+from benchmarks.synthetic import SyntheticVideo  # noqa: E402
+from benchmarks.run_benchmarks import DEFAULT_SCENARIOS, rate_error  # noqa: E402
+
+# Parameter per processor (nama = argumen konstruktor)
+RPPG_PARAMS = ("pos_mode", "hr_method", "hr_window_sec", "hr_band", "hr_filter_order",
+               "pos_window_sec", "hr_prominence")
+RESP_PARAMS = ("smoothing_window", "rr_method", "rr_window_sec", "rr_band", "rr_filter_order",
+               "rr_prominence")
+
+DEFAULT_GRID = {
+    "hr_band": [(0.7, 3.0), (0.9, 2.4)],
+    "pos_window_sec": [1.2, 1.6, 2.0],
+    "hr_prominence": [0.3, 0.5],
+    "rr_filter_order": [2, 3, 4],
+}
+
+
+def expand_grid(grid):
+    """
+    {name: [values]} -> list of {name: value}, one per combination.
+    """
+    for name in grid:
+        if name not in RPPG_PARAMS and name not in RESP_PARAMS:
+            raise ValueError(f"Parameter tidak dikenal: {name}")
+    names = list(grid)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(grid[n] for n in names))]
+
+
+def record_synthetic(out_dir, hr_bpm, rr_rpm, fps=30, duration_sec=40, size=(320, 240), seed=0):
+    """
+    Trace dari SyntheticVideo memakai ground truth wajah/bahu (tanpa model).
+    HR/RR sebenarnya disimpan di meta trace.
+    """
+    video = SyntheticVideo(hr_bpm=hr_bpm, rr_rpm=rr_rpm, fps=fps, duration_sec=duration_sec,
+                           width=size[0], height=size[1], seed=seed)
+    rppg = RPPGProcessor(fps=fps)
+    resp = RespirasiProcessor(fps=fps)
+    with TraceRecorder(out_dir, fps=fps, meta={"hr_bpm": hr_bpm, "rr_rpm": rr_rpm, "source": "synthetic"}) as rec:
+        for i in range(len(video)):
+            ctx = FrameContext(video.frame(i), index=i, timestamp=video.time(i))
+            rppg.process_face_box(ctx, video.face_box(i))
+            resp.process_shoulders(ctx, video.shoulders(i))
+            rec.record_frame(ctx, rppg, resp)
+    return out_dir
+
+
+def prepare_sources(sources, cache_dir, inference="inprocess"):
+    """
+    Sumber berupa folder trace dipakai langsung; file video direkam sekali
+    ke cache_dir (dilewati jika trace-nya sudah ada).
+    """
+    traces = []
+    for source in sources:
+        if os.path.isdir(source):
+            traces.append(source)
+            continue
+        out_dir = os.path.join(cache_dir, os.path.splitext(os.path.basename(source))[0])
+        if not os.path.exists(os.path.join(out_dir, "index.json")):
+            from main import analyze_video
+            print(f"Merekam trace: {source} -> {out_dir}", file=sys.stderr)
+            analyze_video(source, inference=inference, progress=False, record=out_dir)
+        traces.append(out_dir)
+    return traces
+
+
+def evaluate(trace_path, params, truth=None):
+    """
+    Replay one trace with one parameter combination.
+    truth: (hr_bpm, rr_rpm), default from the trace meta (may be None).
+    """
+    reader = TraceReader(trace_path)
+    if truth is None:
+        truth = (reader.meta.get("hr_bpm"), reader.meta.get("rr_rpm"))
+    rppg = RPPGProcessor(fps=reader.fps, **{k: v for k, v in params.items() if k in RPPG_PARAMS})
+    resp = RespirasiProcessor(fps=reader.fps, **{k: v for k, v in params.items() if k in RESP_PARAMS})
+
+    n = len(reader)
+    hr = np.zeros(n)
+    rr = np.zeros(n)
+
+    def collect(i, rppg, resp):
+        hr[i] = rppg.get_heart_rate()
+        rr[i] = resp.get_respiration_rate()
+
+    t0 = time.perf_counter()
+    ReplaySource(reader).replay(rppg, resp, callback=collect)
+    runtime = time.perf_counter() - t0
+
+    row = {"trace": os.path.basename(os.path.normpath(trace_path)), "frames": n,
+           "runtime_s": runtime, "replay_fps": n / runtime if runtime > 0 else 0.0}
+    row.update({k: json.dumps(v) if isinstance(v, (list, tuple)) else v for k, v in params.items()})
+    for key, series, true_value in (("hr", hr, truth[0]), ("rr", rr, truth[1])):
+        row[f"{key}_final"] = float(series[-1]) if n else 0.0
+        if true_value is None:
+            row[f"{key}_mae"] = row[f"{key}_final_abs_err"] = None
+        else:
+            err = rate_error(series, true_value)
+            row[f"{key}_mae"] = err["mae"]
+            row[f"{key}_final_abs_err"] = err["final_abs_err"]
+    return row
+
+
+def _evaluate_task(task):
+    return evaluate(*task)
+
+
+def run_sweep(grid, traces, truth=None, workers=None):
+    """
+    Evaluate every combination of `grid` on every trace in a process pool.
+    Returns one row (dict) per (trace, combination).
+    """
+    configs = expand_grid(grid) if isinstance(grid, dict) else list(grid)
+    tasks = [(trace, params, truth) for params in configs for trace in traces]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return [evaluate(*task) for task in tasks]
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return list(executor.map(_evaluate_task, tasks, chunksize=max(1, len(tasks) // (4 * workers))))
+
+
+def summarize(rows, param_names):
+    """
+    Rata-rata error dan runtime per kombinasi (di atas semua trace),
+    diurutkan dari MAE HR terkecil.
+    """
+    groups = {}
+    for row in rows:
+        key = tuple(row[name] for name in param_names)
+        groups.setdefault(key, []).append(row)
+
+    def mean(values):
+        values = [v for v in values if v is not None]
+        return float(np.mean(values)) if values else None
+
+    table = []
+    for key, group in groups.items():
+        entry = dict(zip(param_names, key))
+        entry["traces"] = len(group)
+        entry["runtime_s"] = float(sum(r["runtime_s"] for r in group))
+        entry["hr_mae"] = mean(r["hr_mae"] for r in group)
+        entry["rr_mae"] = mean(r["rr_mae"] for r in group)
+        table.append(entry)
+    table.sort(key=lambda e: (e["hr_mae"] is None, e["hr_mae"] or 0.0, e["rr_mae"] or 0.0))
+    return table
+
+
+def write_csv(rows, path):
+    if not rows:
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Sweep parameter tahap sinyal di atas trace rekaman")
+    parser.add_argument("sources", nargs="*", help="folder trace atau file video")
+    parser.add_argument("--grid", default=None, help="file JSON {parameter: [nilai, ...]}")
+    parser.add_argument("--synthetic", action="store_true",
+                        help="tambahkan trace sintetis dengan HR/RR yang diketahui")
+    parser.add_argument("--cache-dir", default="sweep_traces", help="folder trace hasil rekaman video/sintetis")
+    parser.add_argument("--true-hr", type=float, default=None)
+    parser.add_argument("--true-rr", type=float, default=None)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default=None, help="tabel CSV per (trace, kombinasi)")
+    args = parser.parse_args(argv)
+
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid) as f:
+            grid = json.load(f)
+
+    traces = prepare_sources(args.sources, args.cache_dir)
+    if args.synthetic:
+        for hr_bpm, rr_rpm in DEFAULT_SCENARIOS:
+            out_dir = os.path.join(args.cache_dir, f"synthetic_hr{hr_bpm}_rr{rr_rpm}")
+            if not os.path.exists(os.path.join(out_dir, "index.json")):
+                record_synthetic(out_dir, hr_bpm, rr_rpm)
+            traces.append(out_dir)
+    if not traces:
+        parser.error("tidak ada sumber: beri folder trace/video atau --synthetic")
+
+    truth = None
+    if args.true_hr is not None or args.true_rr is not None:
+        truth = (args.true_hr, args.true_rr)
+
+    n_configs = len(expand_grid(grid))
+    print(f"{n_configs} kombinasi x {len(traces)} trace", file=sys.stderr)
+    t0 = time.perf_counter()
+    rows = run_sweep(grid, traces, truth=truth, workers=args.workers)
+    print(f"Selesai dalam {time.perf_counter() - t0:.1f} s", file=sys.stderr)
+    if args.out:
+        write_csv(rows, args.out)
+
+    param_names = list(grid)
+    for entry in summarize(rows, param_names)[:10]:
+        params = ", ".join(f"{name}={entry[name]}" for name in param_names)
+        hr_mae = "-" if entry["hr_mae"] is None else f"{entry['hr_mae']:.2f}"
+        rr_mae = "-" if entry["rr_mae"] is None else f"{entry['rr_mae']:.2f}"
+        print(f"HR MAE {hr_mae:>6} | RR MAE {rr_mae:>6} | {entry['runtime_s']:6.2f} s | {params}")
+
+
+if __name__ == "__main__":
+    main()
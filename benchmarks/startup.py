@@ -0,0 +1,142 @@
+# benchmarks/startup.py
+#
+# Benchmark cold start: waktu dari start proses sampai frame pertama
+# diproses dan sampai HR pertama terbaca. Tiap pengukuran berjalan di proses
+# Python baru (import dan model benar-benar dingin).
+#   lazy    : model dibuat saat frame pertama (tanpa preload)
+#   preload : ModelLoader dimulai saat start, frame kamera mulai setelah
+#             --idle detik (meniru pengguna di landing page)
+#
+#   python -m benchmarks.startup --out startup.json
+#   python -m benchmarks.startup --modes preload --idle 0 --fast
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+T_START = time.perf_counter()
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+
+def run_child(mode, idle=2.0, fps=30, duration_sec=30, realtime=True, use_detector=False, hr_bpm=72, rr_rpm=15):
+    """
+    Satu pengukuran di proses ini (harus proses baru). Waktu dalam detik.
+    """
+    sys.path.insert(0, ROOT)
+    import model_loader
+
+    result = {"mode": mode, "idle_s": idle if mode == "preload" else 0.0}
+    if mode == "preload":
+        loader = model_loader.preload()
+        time.sleep(idle)
+        result["loader_progress_at_start"] = loader.progress
+
+    t_camera = time.perf_counter()
+    from frame_context import FrameContext
+    from rppg_processor import RPPGProcessor
+    from respirasi_processor import RespirasiProcessor
+    from benchmarks.synthetic import SyntheticVideo
+    result["import_s"] = time.perf_counter() - t_camera
+
+    video = SyntheticVideo(hr_bpm=hr_bpm, rr_rpm=rr_rpm, fps=fps, duration_sec=duration_sec, seed=0)
+    rppg = RPPGProcessor(fps=fps)
+    resp = RespirasiProcessor(fps=fps)
+    result["first_frame_s"] = result["first_hr_s"] = None
+    for i in range(len(video)):
+        if realtime:
+            # Frame ke-i baru tersedia dari kamera pada t_camera + i/fps
+            delay = t_camera + i / fps - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        ctx = FrameContext(video.frame(i), index=i, timestamp=video.time(i))
+        if use_detector:
+            rppg.extract_rgb_from_frame(ctx)
+            resp.extract_resp_from_frame(ctx)
+        else:
+            # Model tetap dijalankan; sinyal memakai ground truth
+            rppg._detect_forehead(ctx)
+            resp.pose.process(ctx.rgb)
+            rppg.process_face_box(ctx, video.face_box(i))
+            resp.process_shoulders(ctx, video.shoulders(i))
+        now = time.perf_counter()
+        if result["first_frame_s"] is None:
+            result["first_frame_s"] = now - t_camera
+        if rppg.get_heart_rate():
+            result["first_hr_s"] = now - t_camera
+            result["first_hr_frame"] = i
+            result["first_hr"] = float(rppg.get_heart_rate())
+            break
+    result["process_start_to_camera_s"] = t_camera - T_START
+    return result
+
+
+def measure(mode, repeat=3, **kwargs):
+    args = [sys.executable, "-m", "benchmarks.startup", "--child", mode,
+            "--idle", str(kwargs.get("idle", 2.0)), "--fps", str(kwargs.get("fps", 30)),
+            "--duration", str(kwargs.get("duration_sec", 30))]
+    if not kwargs.get("realtime", True):
+        args.append("--fast")
+    if kwargs.get("use_detector"):
+        args.append("--use-detector")
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run(args, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        runs.append(json.loads(out.strip().splitlines()[-1]))
+    return runs
+
+
+def summarize(runs, key):
+    values = [r[key] for r in runs if r.get(key) is not None]
+    if not values:
+        return None
+    values.sort()
+    return {"median": values[len(values) // 2], "min": values[0], "max": values[-1]}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark cold start sampai HR pertama")
+    parser.add_argument("--out", default=None, help="file report JSON (default: stdout)")
+    parser.add_argument("--modes", nargs="+", default=["lazy", "preload"], choices=["lazy", "preload"])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--idle", type=float, default=2.0, help="detik di landing page sebelum kamera mulai")
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--fast", action="store_true", help="frame diumpankan secepatnya (bukan laju kamera)")
+    parser.add_argument("--use-detector", action="store_true",
+                        help="pakai hasil model (bukan ground truth) untuk ROI dan bahu")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    options = {"idle": args.idle, "fps": args.fps, "duration_sec": args.duration,
+               "realtime": not args.fast, "use_detector": args.use_detector}
+    if args.child:
+        print(json.dumps(run_child(args.child, **options)))
+        return
+
+    from benchmarks.run_benchmarks import environment_info
+    report = {"environment": environment_info(), "config": options, "modes": {}}
+    for mode in args.modes:
+        runs = measure(mode, repeat=args.repeat, **options)
+        report["modes"][mode] = {
+            "runs": runs,
+            "first_frame_s": summarize(runs, "first_frame_s"),
+            "first_hr_s": summarize(runs, "first_hr_s"),
+        }
+        first_frame, first_hr = report["modes"][mode]["first_frame_s"], report["modes"][mode]["first_hr_s"]
+        print(f"{mode:>8}: frame pertama {first_frame['median'] * 1000:8.1f} ms | HR pertama "
+              + (f"{first_hr['median']:6.2f} s" if first_hr else "     -"), file=sys.stderr)
+
+    text = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/synthetic.py
+#
+# Generator video sintetis dengan ground truth HR dan RR yang diketahui:
+# patch kulit (wajah) yang warnanya dimodulasi denyut, dan bentuk bahu yang
+# naik-turun mengikuti napas.
+
+import numpy as np
+import cv2
+
+
+class SyntheticVideo:
+    """
+    Renders BGR frames with a pulsating skin patch and breathing shoulders.
+
+    Ground truth is exposed per frame: face_box() gives the relative face
+    box (same format as the face detector output) and shoulders() the
+    normalised shoulder points (same format as the pose output).
+    """
+
+    # Gain per kanal (B, G, R): sinyal denyut paling kuat di kanal hijau
+    PULSE_GAIN_BGR = np.array([0.35, 1.0, 0.55])
+
+    def __init__(self, hr_bpm=72, rr_rpm=15, fps=30, duration_sec=40, width=640, height=480,
+                 pulse_amplitude=2.0, breath_amplitude_px=6.0, noise_std=2.0, seed=0):
+        self.hr_bpm = hr_bpm
+        self.rr_rpm = rr_rpm
+        self.fps = fps
+        self.duration_sec = duration_sec
+        self.width = width
+        self.height = height
+        self.pulse_amplitude = pulse_amplitude
+        self.breath_amplitude_px = breath_amplitude_px
+        self.noise_std = noise_std
+        self.n_frames = int(round(duration_sec * fps))
+        self._rng = np.random.default_rng(seed)
+
+        # Geometri wajah (kotak wajah ~ seperti output FaceDetection)
+        self.face_rect = (int(0.38 * width), int(0.22 * height), int(0.62 * width), int(0.52 * height))
+        self.shoulder_y = int(0.74 * height)
+
+        self._background = np.full((height, width, 3), (60, 70, 80), dtype=np.float32)
+        x1, y1, x2, y2 = self.face_rect
+        cx, cy = (x1 + x2) // 2, (y1 + y2) // 2
+        yy, xx = np.ogrid[:height, :width]
+        # Elips wajah diperbesar ke atas supaya ROI jidat (di atas kotak) tetap berisi kulit
+        self._face_mask = (((xx - cx) / (0.6 * (x2 - x1))) ** 2 +
+                           ((yy - (cy - 0.1 * (y2 - y1))) / (0.7 * (y2 - y1))) ** 2) <= 1.0
+        self._skin_bgr = np.array([120.0, 150.0, 200.0], dtype=np.float32)
+
+    def __len__(self):
+        return self.n_frames
+
+    def time(self, i):
+        return i / self.fps
+
+    def pulse(self, i):
+        return np.sin(2 * np.pi * self.hr_bpm / 60.0 * self.time(i))
+
+    def breath_offset(self, i):
+        return self.breath_amplitude_px * np.sin(2 * np.pi * self.rr_rpm / 60.0 * self.time(i))
+
+    def face_box(self, i=None):
+        x1, y1, x2, y2 = self.face_rect
+        return (x1 / self.width, y1 / self.height, (x2 - x1) / self.width, (y2 - y1) / self.height)
+
+    def shoulders(self, i):
+        y = (self.shoulder_y + self.breath_offset(i)) / self.height
+        return ((0.3, y), (0.7, y))
+
+    def frame(self, i):
+        img = self._background.copy()
+        img[self._face_mask] = self._skin_bgr + self.pulse_amplitude * self.pulse(i) * self.PULSE_GAIN_BGR
+
+        # Bahu: trapesium gelap yang naik-turun
+        y = int(round(self.shoulder_y + self.breath_offset(i)))
+        w, h = self.width, self.height
+        pts = np.array([[int(0.22 * w), h], [int(0.3 * w), y], [int(0.7 * w), y], [int(0.78 * w), h]], np.int32)
+        cv2.fillPoly(img, [pts], (90, 40, 40))
+
+        if self.noise_std > 0:
+            img += self._rng.normal(scale=self.noise_std, size=img.shape).astype(np.float32)
+        return np.clip(img, 0, 255).astype(np.uint8)
+
+    def __iter__(self):
+        for i in range(self.n_frames):
+            yield self.frame(i)
+
+    def write(self, path, fourcc="MJPG"):
+        """
+        Simpan sebagai file video (mis. pengganti kamera untuk session_manager).
+        """
+        writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*fourcc), self.fps, (self.width, self.height))
+        if not writer.isOpened():
+            raise IOError(f"Tidak bisa menulis video: {path}")
+        try:
+            for frame in self:
+                writer.write(frame)
+        finally:
+            writer.release()
+        return path
@@ -0,0 +1,290 @@
+# camera_discovery.py
+#
+# Enumerasi kamera di thread latar belakang, dengan backend per platform
+# (V4L2 /dev/video* di Linux, DirectShow di Windows, AVFoundation di macOS).
+# Hasil dan kapabilitas tiap perangkat (resolusi, fps) di-cache sehingga
+# refresh berikutnya tidak membuka ulang perangkat yang sudah dikenal.
+#   discovery = CameraDiscovery().start()
+#   ... discovery.done / discovery.devices
+#   cap = open_camera(discovery.devices[0]["id"])
+
+import glob
+import os
+import re
+import shutil
+import subprocess
+import sys
+import threading
+
+import cv2
+
+# Resolusi yang dicoba saat kapabilitas tidak bisa dibaca dari driver
+COMMON_RESOLUTIONS = ((640, 480), (1280, 720), (1920, 1080))
+
+
+def default_backend(platform=None):
+    platform = platform or sys.platform
+    if platform.startswith("win"):
+        return cv2.CAP_DSHOW
+    if platform == "darwin":
+        return cv2.CAP_AVFOUNDATION
+    if platform.startswith("linux"):
+        return cv2.CAP_V4L2
+    return cv2.CAP_ANY
+
+
+def open_camera(index, backend=None):
+    """
+    cv2.VideoCapture dengan backend platform; jatuh ke CAP_ANY bila gagal.
+    """
+    backend = default_backend() if backend is None else backend
+    cap = cv2.VideoCapture(index, backend)
+    if not cap.isOpened() and backend != cv2.CAP_ANY:
+        cap.release()
+        cap = cv2.VideoCapture(index)
+    return cap
+
+
+def _probe_modes(cap, resolutions=()):
+    """
+    Mode (lebar, tinggi, fps) dari capture yang sudah terbuka: mode bawaan
+    lalu tiap resolusi yang diterima driver.
+    """
+    def current():
+        return (int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)), int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+                float(cap.get(cv2.CAP_PROP_FPS)))
+
+    modes = [current()]
+    for width, height in resolutions:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+        mode = current()
+        if mode[:2] == (width, height) and mode not in modes:
+            modes.append(mode)
+    return modes
+
+
+class OpenCVProvider:
+    """
+    Portable provider: probes indices 0..max_index-1 with cv2.VideoCapture
+    and stops at the first index that does not open.
+    """
+
+    def __init__(self, backend=None, max_index=4, resolutions=()):
+        self.backend = default_backend() if backend is None else backend
+        self.max_index = max_index
+        self.resolutions = resolutions
+        self.name = f"opencv:{self.backend}"
+
+    def list_devices(self):
+        devices = []
+        for index in range(self.max_index):
+            cap = cv2.VideoCapture(index, self.backend)
+            opened = cap.isOpened()
+            cap.release()
+            if not opened:
+                break
+            devices.append({"id": index, "name": f"Kamera {index}", "path": str(index)})
+        return devices
+
+    def capabilities(self, device):
+        cap = cv2.VideoCapture(device["id"], self.backend)
+        try:
+            return _probe_modes(cap, self.resolutions) if cap.isOpened() else []
+        finally:
+            cap.release()
+
+
+class V4L2Provider:
+    """
+    Linux provider: lists /dev/video* nodes without opening them (names
+    from sysfs, metadata nodes skipped). Capabilities come from
+    `v4l2-ctl --list-formats-ext` when available, otherwise from OpenCV.
+    """
+
+    name = "v4l2"
+
+    def __init__(self, dev_glob="/dev/video*", sysfs="/sys/class/video4linux", resolutions=COMMON_RESOLUTIONS):
+        self.dev_glob = dev_glob
+        self.sysfs = sysfs
+        self.resolutions = resolutions
+        self.v4l2_ctl = shutil.which("v4l2-ctl")
+
+    def _read_sysfs(self, node, attr):
+        try:
+            with open(os.path.join(self.sysfs, node, attr)) as f:
+                return f.read().strip()
+        except OSError:
+            return None
+
+    def list_devices(self):
+        devices = []
+        for path in glob.glob(self.dev_glob):
+            node = os.path.basename(path)
+            match = re.fullmatch(r"video(\d+)", node)
+            if not match:
+                continue
+            # Satu kamera UVC biasanya punya node capture (index 0) dan node metadata
+            if self._read_sysfs(node, "index") not in (None, "0"):
+                continue
+            index = int(match.group(1))
+            label = self._read_sysfs(node, "name")
+            name = f"Kamera {index} ({label})" if label else f"Kamera {index}"
+            devices.append({"id": index, "name": name, "path": path})
+        devices.sort(key=lambda d: d["id"])
+        return devices
+
+    def capabilities(self, device):
+        if self.v4l2_ctl:
+            try:
+                out = subprocess.run([self.v4l2_ctl, "-d", device["path"], "--list-formats-ext"],
+                                     capture_output=True, text=True, timeout=5).stdout
+                modes = parse_v4l2_formats(out)
+                if modes:
+                    return modes
+            except (OSError, subprocess.SubprocessError):
+                pass
+        cap = cv2.VideoCapture(device["id"], cv2.CAP_V4L2)
+        try:
+            return _probe_modes(cap, self.resolutions) if cap.isOpened() else []
+        finally:
+            cap.release()
+
+
+def parse_v4l2_formats(text):
+    """
+    Mode unik (lebar, tinggi, fps) dari keluaran `v4l2-ctl --list-formats-ext`.
+    """
+    modes = []
+    size = None
+    for line in text.splitlines():
+        match = re.search(r"Size: \w+ (\d+)x(\d+)", line)
+        if match:
+            size = (int(match.group(1)), int(match.group(2)))
+            continue
+        match = re.search(r"Interval: .*\(([\d.]+) fps\)", line)
+        if match and size:
+            mode = size + (float(match.group(1)),)
+            if mode not in modes:
+                modes.append(mode)
+    return modes
+
+
+class FakeDeviceProvider:
+    """
+    In-memory provider for tests and demos: `devices` is a list of dicts
+    with "id", "name" and optionally "modes"; `delay` simulates slow probing.
+    """
+
+    name = "fake"
+
+    def __init__(self, devices, delay=0.0):
+        self.devices = [dict(d) for d in devices]
+        self.delay = delay
+        self.list_calls = 0
+        self.capability_calls = 0
+        self._event = threading.Event()
+
+    def list_devices(self):
+        self.list_calls += 1
+        self._event.wait(self.delay)
+        return [{"id": d["id"], "name": d.get("name", f"Kamera {d['id']}"), "path": d.get("path", str(d["id"]))}
+                for d in self.devices]
+
+    def capabilities(self, device):
+        self.capability_calls += 1
+        self._event.wait(self.delay)
+        for d in self.devices:
+            if d["id"] == device["id"]:
+                return list(d.get("modes", []))
+        return []
+
+
+def default_provider(platform=None):
+    platform = platform or sys.platform
+    if platform.startswith("linux") and os.path.isdir("/dev"):
+        return V4L2Provider()
+    return OpenCVProvider(backend=default_backend(platform))
+
+
+class CameraDiscovery:
+    """
+    Runs device enumeration off the UI thread. Each device dict carries
+    "id", "name", "path" and "modes" [(width, height, fps), ...];
+    capabilities are cached per device path across refreshes.
+    The UI polls `done` (or passes a callback, called from the worker thread).
+    probe_capabilities=False only lists devices ("modes" stays []): probing
+    opens each device, so a UI that may open a camera at the same time
+    should not probe.
+    """
+
+    def __init__(self, provider=None, probe_capabilities=True):
+        self.provider = provider or default_provider()
+        self.probe_capabilities = probe_capabilities
+        self.error = None
+        self._lock = threading.Lock()
+        self._devices = []
+        self._caps_cache = {}
+        self._thread = None
+        self._done = threading.Event()
+
+    def start(self, callback=None):
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._done.clear()
+        self.error = None
+        self._thread = threading.Thread(target=self._run, args=(callback,), name="camera-discovery", daemon=True)
+        self._thread.start()
+        return self
+
+    def _run(self, callback):
+        try:
+            self.refresh()
+        except Exception as e:
+            self.error = e
+        finally:
+            self._done.set()
+        if callback is not None:
+            callback(self.devices)
+
+    def refresh(self):
+        """
+        Enumerasi sinkron; kapabilitas hanya diprobe untuk perangkat baru.
+        """
+        devices = self.provider.list_devices()
+        for device in devices:
+            key = device.get("path", device["id"])
+            if self.probe_capabilities and key not in self._caps_cache:
+                self._caps_cache[key] = self.provider.capabilities(device)
+            device["modes"] = self._caps_cache.get(key, [])
+        with self._lock:
+            self._devices = devices
+        return devices
+
+    def invalidate(self, device=None):
+        if device is None:
+            self._caps_cache.clear()
+        else:
+            self._caps_cache.pop(device.get("path", device["id"]), None)
+
+    def wait(self, timeout=None):
+        self._done.wait(timeout)
+        return self.devices
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+    @property
+    def devices(self):
+        with self._lock:
+            return list(self._devices)
+
+
+if __name__ == "__main__":
+    discovery = CameraDiscovery().start()
+    for device in discovery.wait():
+        modes = ", ".join(f"{w}x{h}@{fps:g}" for w, h, fps in device["modes"]) or "-"
+        print(f"{device['id']}: {device['name']} [{device['path']}] {modes}")
+    if discovery.error:
+        print(f"Error: {discovery.error}")
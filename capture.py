@@ -0,0 +1,288 @@
+# capture.py
+
+import queue
+import threading
+import time
+
+import cv2
+
+from frame_context import FrameContext
+from latency import NULL_MONITOR
+
+
+class RateMeter:
+    """
+    Event rate (per second) as an exponential moving average of intervals.
+    """
+
+    def __init__(self, smoothing=0.1):
+        self.smoothing = smoothing
+        self.count = 0
+        self._last = None
+        self._interval = None
+
+    def tick(self, now=None):
+        now = time.monotonic() if now is None else now
+        if self._last is not None:
+            dt = now - self._last
+            if self._interval is None:
+                self._interval = dt
+            else:
+                self._interval += self.smoothing * (dt - self._interval)
+        self._last = now
+        self.count += 1
+
+    @property
+    def rate(self):
+        if not self._interval:
+            return 0.0
+        return 1.0 / self._interval
+
+
+class LatestFrameCapture:
+    """
+    Background capture thread with latest-frame semantics.
+    Only the newest frame is kept; frames that were overwritten before a
+    consumer picked them up are counted as dropped. Every frame is stamped
+    with its capture time (time.monotonic()) and a running index.
+    close() releases the capture device only once the thread has stopped
+    reading from it.
+    """
+
+    def __init__(self, cap, latency=None):
+        self.cap = cap
+        self.latency = latency or NULL_MONITOR
+        self.meter = RateMeter()
+        self.dropped = 0
+        self.failed_reads = 0
+
+        self._cond = threading.Condition()
+        self._latest = None
+        self._consumed = True
+        self._running = False
+        self._thread = None
+        self._release_on_exit = False
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="capture", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=1.0):
+        """
+        Hentikan thread capture. False jika thread belum berhenti dalam timeout.
+        """
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return False
+            self._thread = None
+        return True
+
+    def close(self, timeout=1.0):
+        """
+        stop() lalu release cap. Jika thread masih di dalam cap.read(),
+        release dilakukan thread itu sendiri saat keluar.
+        """
+        self._release_on_exit = True
+        stopped = self.stop(timeout)
+        if stopped:
+            self._release()
+        return stopped
+
+    def _release(self):
+        with self._cond:
+            cap, self.cap = self.cap, None
+        if cap is not None:
+            cap.release()
+
+    @property
+    def running(self):
+        return self._running
+
+    @property
+    def rate(self):
+        return self.meter.rate
+
+    def _run(self):
+        index = 0
+        while self._running:
+            with self.latency.stage("capture"):
+                ret, frame = self.cap.read()
+            timestamp = time.monotonic()
+            if not ret:
+                self.failed_reads += 1
+                if self.failed_reads > 50:
+                    break
+                time.sleep(0.01)
+                continue
+            self.failed_reads = 0
+            self.meter.tick(timestamp)
+
+            ctx = FrameContext(frame, index=index, timestamp=timestamp)
+            index += 1
+            with self._cond:
+                if not self._consumed:
+                    self.dropped += 1
+                self._latest = ctx
+                self._consumed = False
+                self._cond.notify_all()
+
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
+        if self._release_on_exit:
+            self._release()
+
+    def read(self, timeout=None):
+        """
+        Block until a frame not yet consumed is available and return it as
+        a FrameContext. Returns None on timeout or when capture stopped.
+        """
+        with self._cond:
+            if self._consumed:
+                self._cond.wait_for(lambda: not self._consumed or not self._running, timeout)
+            if self._consumed:
+                return None
+            self._consumed = True
+            return self._latest
+
+
+class ProcessingWorker:
+    """
+    Pulls the newest frame from a LatestFrameCapture, runs `process_fn`
+    on it in a background thread and publishes the latest result.
+    The UI polls get_result() instead of doing the work itself.
+    """
+
+    def __init__(self, capture, process_fn):
+        self.capture = capture
+        self.process_fn = process_fn
+        self.meter = RateMeter()
+        self.last_error = None
+
+        self._lock = threading.Lock()
+        self._result = None
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        if self._running:
+            return self
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="processing", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=2.0):
+        """
+        Hentikan thread pemrosesan. False jika thread belum berhenti dalam timeout.
+        """
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return False
+            self._thread = None
+        return True
+
+    @property
+    def running(self):
+        return self._running
+
+    @property
+    def rate(self):
+        return self.meter.rate
+
+    def _run(self):
+        while self._running:
+            ctx = self.capture.read(timeout=0.2)
+            if ctx is None:
+                if not self.capture.running:
+                    break
+                continue
+            try:
+                result = self.process_fn(ctx)
+            except Exception as e:
+                self.last_error = e
+                continue
+            self.meter.tick()
+            with self._lock:
+                self._result = result
+        self._running = False
+
+    def get_result(self):
+        """
+        Latest unread result, or None if nothing new since the last call.
+        """
+        with self._lock:
+            result, self._result = self._result, None
+        return result
+
+
+class VideoFileReader:
+    """
+    Decodes a video file on a background thread into a bounded queue.
+    Unlike LatestFrameCapture no frame is dropped: the reader blocks when
+    the consumer falls behind. Timestamps come from the frame index and
+    the file's frame rate, so offline runs are deterministic.
+    """
+
+    def __init__(self, path, fps=None, queue_size=64, max_frames=None):
+        self.path = path
+        self.cap = cv2.VideoCapture(path)
+        if not self.cap.isOpened():
+            raise IOError(f"Tidak bisa membuka video: {path}")
+        file_fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.fps = fps or (file_fps if file_fps and file_fps > 0 else 30)
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT) or 0)
+        self.max_frames = max_frames
+        self.meter = RateMeter()
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._running = False
+        self._thread = None
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="video-reader", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        # Kosongkan queue agar thread reader tidak tertahan di put()
+        while self._thread is not None and self._thread.is_alive():
+            try:
+                self._queue.get_nowait()
+            except Exception:
+                self._thread.join(0.05)
+        self.cap.release()
+
+    def _run(self):
+        index = 0
+        try:
+            while self._running:
+                if self.max_frames is not None and index >= self.max_frames:
+                    break
+                ret, frame = self.cap.read()
+                if not ret:
+                    break
+                self.meter.tick()
+                self._queue.put(FrameContext(frame, index=index, timestamp=index / self.fps))
+                index += 1
+        finally:
+            self._queue.put(None)
+
+    def __iter__(self):
+        while True:
+            ctx = self._queue.get()
+            if ctx is None:
+                return
+            yield ctx
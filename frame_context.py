@@ -0,0 +1,85 @@
+# frame_context.py
+
+import cv2
+
+
+class FrameContext:
+    """
+    Per-frame preprocessing shared by every processor.
+    Wraps the raw BGR frame with its index and capture timestamp (None if
+    the caller did not supply one: processors then take every frame as one
+    sample step instead of resampling on processing time); the RGB/gray
+    conversions and resized copies are computed lazily, at most once per
+    frame, and reused by whoever asks next. Treat all views as read-only.
+    """
+
+    def __init__(self, bgr, index=None, timestamp=None):
+        self.bgr = bgr
+        self.index = index
+        self.timestamp = timestamp
+        self._rgb = None
+        self._gray = None
+        self._resized = {}
+
+    @classmethod
+    def wrap(cls, frame, index=None, timestamp=None):
+        """
+        Return `frame` unchanged if it is already a FrameContext, else wrap the BGR array.
+        """
+        if isinstance(frame, cls):
+            return frame
+        return cls(frame, index=index, timestamp=timestamp)
+
+    @property
+    def shape(self):
+        return self.bgr.shape
+
+    @property
+    def height(self):
+        return self.bgr.shape[0]
+
+    @property
+    def width(self):
+        return self.bgr.shape[1]
+
+    @property
+    def rgb(self):
+        if self._rgb is None:
+            self._rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+        return self._rgb
+
+    @property
+    def gray(self):
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2GRAY)
+        return self._gray
+
+    def resized(self, size=None, scale=None):
+        """
+        Resized copy as a FrameContext (same index/timestamp), cached per size.
+        size is (width, height); alternatively give a scale factor.
+        """
+        if size is None:
+            size = (max(1, int(round(self.width * scale))), max(1, int(round(self.height * scale))))
+        size = (int(size[0]), int(size[1]))
+        if size == (self.width, self.height):
+            return self
+
+        ctx = self._resized.get(size)
+        if ctx is None:
+            interpolation = cv2.INTER_AREA if size[0] < self.width else cv2.INTER_LINEAR
+            ctx = FrameContext(cv2.resize(self.bgr, size, interpolation=interpolation),
+                               index=self.index, timestamp=self.timestamp)
+            self._resized[size] = ctx
+        return ctx
+
+    def for_inference(self, scale=1.0):
+        """
+        Konteks untuk input model: salinan diperkecil (di-cache, dipakai
+        bersama semua model) jika scale < 1. Output model yang relatif
+        (0..1) berlaku sama untuk frame asli, jadi sampling ROI tetap di
+        resolusi penuh.
+        """
+        if scale is None or scale >= 1.0:
+            return self
+        return self.resized(scale=scale)
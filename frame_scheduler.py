@@ -0,0 +1,170 @@
+# frame_scheduler.py
+#
+# Load shedding per frame saat CPU tertinggal. Tiap stage punya prioritas:
+#   roi   : deteksi/tracking jidat + rata-rata ROI, selalu berjalan
+#   pose  : inferensi Pose, bisa diturunkan ke pose_min_hz
+#   rates : estimasi HR/RR, bisa diturunkan ke rate_min_hz
+# Stage berprioritas terendah dilepas lebih dulu (rates, lalu pose) bila
+# waktu per frame melebihi budget, dan dipulihkan bila ada headroom.
+# Frame yang dilewati Pose diisi resampling timestamp di RespirasiProcessor.
+#   scheduler = FrameScheduler(rppg, resp, budget_sec=1 / 30)
+#   scheduler.process(ctx)
+#   logging.getLogger("frame_scheduler").setLevel(logging.DEBUG)  # skip per frame
+
+import logging
+import time
+from collections import deque
+
+from frame_context import FrameContext
+
+logger = logging.getLogger(__name__)
+
+# Urutan pelepasan: indeks = level shedding yang melepas stage tersebut
+SHED_ORDER = ("rates", "pose")
+
+
+class FrameScheduler:
+    """
+    Runs RPPGProcessor/RespirasiProcessor on one frame within a per-frame
+    time budget. `level` counts how many stages of SHED_ORDER are
+    decimated: it rises when the smoothed frame time exceeds `budget_sec`
+    and falls after `recover_frames` frames whose time, plus the estimated
+    cost of the shed work, stays below `headroom * budget_sec`. While pose
+    is shed it still runs when due at `pose_min_hz`, or when the frame
+    deadline leaves room for it. Decisions are logged and kept in `events`.
+    """
+
+    def __init__(self, rppg_proc, resp_proc, budget_sec=1 / 30, pose_min_hz=10.0, rate_min_hz=1.0,
+                 smoothing=0.2, headroom=0.7, recover_frames=60, cooldown_frames=15, history=256):
+        self.rppg_proc = rppg_proc
+        self.resp_proc = resp_proc
+        self.budget_sec = budget_sec
+        self.pose_min_hz = pose_min_hz
+        self.rate_min_hz = rate_min_hz
+        self.smoothing = smoothing
+        self.headroom = headroom
+        self.recover_frames = recover_frames
+        self.cooldown_frames = cooldown_frames
+        self.level = 0
+        self.avg_sec = None
+        self.pose_sec = None        # EMA biaya Pose (hanya frame yang menjalankannya)
+        self.events = deque(maxlen=history)
+        self.counts = {"frames": 0, "over_budget": 0, "pose_run": 0, "pose_skipped": 0, "level_changes": 0}
+        self._fast_frames = 0
+        # Frame awal (inisialisasi model, cache) tidak dipakai untuk keputusan
+        self._cooldown = cooldown_frames
+        self._pose_ratio = 1.0      # EMA porsi frame yang menjalankan Pose
+        self._last_pose_time = None
+        self.pose_ran = False       # apakah Pose berjalan di frame terakhir (untuk TraceRecorder)
+
+    def shed(self, stage):
+        return stage in SHED_ORDER[:self.level]
+
+    def process(self, frame):
+        """
+        Proses satu frame (BGR array atau FrameContext) sesuai level saat ini.
+        """
+        ctx = FrameContext.wrap(frame)
+        now = ctx.timestamp
+        if now is None:
+            now = self.counts["frames"] * self._frame_interval()
+        t0 = time.perf_counter()
+
+        if self.rppg_proc:
+            self.rppg_proc.extract_rgb_from_frame(ctx)
+
+        ran_pose = False
+        if self.resp_proc:
+            if self._pose_wanted(now, time.perf_counter() - t0):
+                t_pose = time.perf_counter()
+                self.resp_proc.extract_resp_from_frame(ctx)
+                self._ema_pose(time.perf_counter() - t_pose)
+                self._last_pose_time = now
+                ran_pose = True
+                self.counts["pose_run"] += 1
+            else:
+                self.counts["pose_skipped"] += 1
+                logger.debug("frame %s: pose dilewati (level %d)", ctx.index, self.level)
+
+        frame_sec = time.perf_counter() - t0
+        self.counts["frames"] += 1
+        if frame_sec > self.budget_sec:
+            self.counts["over_budget"] += 1
+        self.pose_ran = ran_pose
+        self._pose_ratio += self.smoothing * (float(ran_pose) - self._pose_ratio)
+        self._update_level(frame_sec, ctx.index)
+        return frame_sec
+
+    def _frame_interval(self):
+        fps = getattr(self.rppg_proc or self.resp_proc, "fps", 30)
+        return 1.0 / fps
+
+    def _pose_wanted(self, now, elapsed):
+        if not self.shed("pose") or self._last_pose_time is None:
+            return True
+        # Minimal pose_min_hz; selain itu hanya bila masih muat dalam deadline frame
+        if now - self._last_pose_time >= 1.0 / self.pose_min_hz - 1e-6:
+            return True
+        return self.pose_sec is not None and elapsed + self.pose_sec <= self.budget_sec
+
+    def _ema_pose(self, sec):
+        self.pose_sec = sec if self.pose_sec is None else self.pose_sec + self.smoothing * (sec - self.pose_sec)
+
+    def _update_level(self, frame_sec, index):
+        if self.avg_sec is None:
+            self.avg_sec = frame_sec
+        else:
+            self.avg_sec += self.smoothing * (frame_sec - self.avg_sec)
+        if self._cooldown > 0:
+            self._cooldown -= 1
+            return
+
+        if self.avg_sec > self.budget_sec and self.level < len(SHED_ORDER):
+            self._set_level(self.level + 1, index)
+        elif self.level > 0 and self._restored_estimate() < self.headroom * self.budget_sec:
+            self._fast_frames += 1
+            if self._fast_frames >= self.recover_frames:
+                self._set_level(self.level - 1, index)
+        else:
+            self._fast_frames = 0
+
+    def _restored_estimate(self):
+        """
+        Perkiraan waktu per frame bila stage terakhir yang dilepas dipulihkan.
+        """
+        if SHED_ORDER[self.level - 1] == "pose" and self.pose_sec is not None:
+            return self.avg_sec + (1.0 - self._pose_ratio) * self.pose_sec
+        return self.avg_sec
+
+    def _set_level(self, level, index=None):
+        restore = level < self.level
+        stage = SHED_ORDER[level] if restore else SHED_ORDER[self.level]
+        self.level = level
+        self.counts["level_changes"] += 1
+        self._apply_rates()
+        event = {"frame": index, "action": "restore" if restore else "shed", "stage": stage,
+                 "level": level, "avg_ms": 1000 * self.avg_sec, "budget_ms": 1000 * self.budget_sec}
+        self.events.append(event)
+        logger.info("frame %s: %s %s (level %d, rata-rata %.1f ms, budget %.1f ms)", index,
+                    "pulihkan" if restore else "lepas", stage, level, event["avg_ms"], event["budget_ms"])
+        # EMA diulang dari awal agar keputusan berikut memakai waktu di level baru
+        self.avg_sec = None
+        self._fast_frames = 0
+        self._cooldown = self.cooldown_frames
+
+    def _apply_rates(self):
+        for proc in (self.rppg_proc, self.resp_proc):
+            if proc is not None:
+                every = round(proc.fps / self.rate_min_hz) if self.shed("rates") else 1
+                proc.set_rate_every(every)
+
+    def get_stats(self):
+        frames = max(1, self.counts["frames"])
+        return {
+            **self.counts,
+            "level": self.level,
+            "shed": list(SHED_ORDER[:self.level]),
+            "over_budget_ratio": self.counts["over_budget"] / frames,
+            "pose_ratio": self.counts["pose_run"] / frames,
+            "pose_ms": 1000 * self.pose_sec if self.pose_sec is not None else None,
+        }
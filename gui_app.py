@@ -3,6 +3,7 @@ from tkinter import ttk, messagebox
 import cv2
 import numpy as np
 import os
+import time
 
 try:
     from PIL import Image, ImageTk
@@ -17,6 +18,14 @@ try:
 except ImportError:
     MATPLOTLIB_AVAILABLE = False
 
+from camera_discovery import CameraDiscovery, open_camera
+from capture import LatestFrameCapture, ProcessingWorker, RateMeter
+from parallel_inference import InferenceRunner
+from frame_scheduler import FrameScheduler
+from latency import LatencyMonitor
+import model_loader
+from plot_backend import BlitPlot
+
 try:
     from rppg_processor import RPPGProcessor
     from respirasi_processor import RespirasiProcessor
@@ -28,7 +37,8 @@ except ImportError as e:
     print(f"ERROR DEBUG: Tidak bisa impor RPPGProcessor atau RespirasiProcessor: {e}")
 
 class AppRPPG(tk.Tk):
-    def __init__(self, master=None):
+    def __init__(self, master=None, inference_mode="inprocess", latency_enabled=False, latency_log=None,
+                 plot_fps=20, camera_provider=None, inference_scale=1.0, frame_budget_ms=None):
         super().__init__(master)
         self.title("VitalCam - Real-Time Monitoring")
 
@@ -46,18 +56,57 @@ class AppRPPG(tk.Tk):
         self.webcam_active = False
         self.webcam_update_job = None
         self.camera_selection_visible = False
+        # Enumerasi kamera di thread latar (provider bisa diganti, mis. FakeDeviceProvider)
+        # Hanya daftar perangkat: probe mode (buka + ganti resolusi) bisa bentrok dengan open_camera
+        self.camera_discovery = CameraDiscovery(provider=camera_provider, probe_capabilities=False)
+        self.capture = None
+        self.worker = None
+        # Worker yang belum berhenti saat stop_webcam_feed (masih di _process_frame)
+        self._stopping_worker = None
+        self.display_meter = RateMeter()
+        # Laju gambar ulang grafik (blitting), terpisah dari laju pemrosesan
+        self.plot_fps = plot_fps
+
+        # Timing per stage (p50/p95/p99 + drop), opsional diekspor ke JSON lines
+        self.latency = LatencyMonitor(enabled=latency_enabled or bool(latency_log), jsonl_path=latency_log)
+        self._latency_requested = self.latency.enabled   # tetap aktif walau overlay disembunyikan
+        self.latency_overlay_visible = False
+        self._dropped_seen = 0
+
+        # Jalur tampilan: ukuran target dihitung saat <Configure>, buffer dan PhotoImage dipakai ulang
+        self._video_area = None      # (lebar, tinggi) webcam_label
+        self._display_src = None     # (lebar, tinggi) frame sumber
+        self._display_size = None    # (lebar, tinggi) frame tampil
+        self._display_buf = None
+        self._display_img = None     # PIL Image berbagi memori dengan _display_buf
+        self._photo = None
 
         self.rppg_proc = None
         self.resp_proc = None
         if PROCESSORS_AVAILABLE:
             try:
-                self.rppg_proc = RPPGProcessor(fps=30)
-                self.resp_proc = RespirasiProcessor(fps=getattr(self.rppg_proc, 'fps', 15))
+                # inference_scale < 1: model pada frame diperkecil, ROI tetap resolusi penuh kamera
+                self.rppg_proc = RPPGProcessor(fps=30, latency=self.latency, inference_scale=inference_scale)
+                self.resp_proc = RespirasiProcessor(fps=getattr(self.rppg_proc, 'fps', 15), latency=self.latency,
+                                                    inference_scale=inference_scale)
             except Exception as e:
                 messagebox.showerror("Error Processor", f"Gagal membuat instance processor: {e}")
         else:
             messagebox.showwarning("Peringatan Processor", "Modul Processor tidak ditemukan.")
 
+        # Model dimuat di background (no-op jika landing page sudah memulai loader)
+        if inference_mode == "inprocess": model_loader.preload()
+
+        # "inprocess" (default) atau "process"/"auto": FaceDetection dan Pose di proses worker terpisah
+        self.inference_mode = inference_mode
+        self.inference = None
+        if self.rppg_proc and self.resp_proc and inference_mode != "inprocess":
+            self.inference = InferenceRunner(self.rppg_proc, self.resp_proc, mode=inference_mode)
+        elif self.rppg_proc and self.resp_proc and frame_budget_ms:
+            # Budget per frame: Pose/estimasi rate diturunkan saat CPU tertinggal
+            scheduler = FrameScheduler(self.rppg_proc, self.resp_proc, budget_sec=frame_budget_ms / 1000.0)
+            self.inference = InferenceRunner(self.rppg_proc, self.resp_proc, mode="inprocess", scheduler=scheduler)
+
         self._setup_plots()
         self.create_widgets()
         self.detect_available_cameras()
@@ -70,33 +119,33 @@ class AppRPPG(tk.Tk):
             self.ax_rppg = self.fig_rppg.add_subplot(111)
             self.ax_rppg.set_title("Sinyal rPPG", fontsize=10)
             self.ax_rppg.set_xlabel("Sampel", fontsize=8); self.ax_rppg.set_ylabel("Intensitas", fontsize=8)
-            self.line_rppg, = self.ax_rppg.plot([], [], 'r-')
-            self.peaks_rppg_line_plot, = self.ax_rppg.plot([], [], 'bo', markersize=3)
-            self.ax_rppg.set_ylim(-15, 15) # TODO: SESUAIKAN RENTANG Y RPPG!
-            self.ax_rppg.set_xlim(0, 250)
+            self.ax_rppg.set_ylim(-15, 15) # Rentang awal; diperlebar/dipersempit otomatis oleh BlitPlot
+            self.rppg_plot = BlitPlot(self.ax_rppg, n_points=250, max_fps=self.plot_fps)
+            self.line_rppg = self.rppg_plot.add_line('r-')
+            self.peaks_rppg_line_plot = self.rppg_plot.add_artist(self.ax_rppg.plot([], [], 'bo', markersize=3)[0])
             self.fig_rppg.tight_layout()
 
             self.fig_resp = Figure(figsize=(5, 2.5), dpi=100)
             self.ax_resp = self.fig_resp.add_subplot(111)
             self.ax_resp.set_title("Sinyal Respirasi", fontsize=10)
             self.ax_resp.set_xlabel("Sampel", fontsize=8); self.ax_resp.set_ylabel("Pergerakan", fontsize=8)
-            self.line_resp, = self.ax_resp.plot([], [], 'g-')
-            self.ax_resp.set_ylim(-0.8, 0.8) # TODO: SESUAIKAN RENTANG Y RESPIRASI!
-            self.ax_resp.set_xlim(0, 250)
+            self.ax_resp.set_ylim(-0.8, 0.8)
+            self.resp_plot = BlitPlot(self.ax_resp, n_points=250, max_fps=self.plot_fps)
+            self.line_resp = self.resp_plot.add_line('g-')
             self.fig_resp.tight_layout()
         else:
-            self.fig_rppg = self.ax_rppg = self.line_rppg = self.peaks_rppg_line_plot = None
-            self.fig_resp = self.ax_resp = self.line_resp = None
+            self.fig_rppg = self.ax_rppg = self.line_rppg = self.peaks_rppg_line_plot = self.rppg_plot = None
+            self.fig_resp = self.ax_resp = self.line_resp = self.resp_plot = None
 
     def detect_available_cameras(self):
-        self.available_cameras = []
-        index = 0
-        while True:
-            cap_test = cv2.VideoCapture(index, cv2.CAP_DSHOW)
-            if not cap_test.isOpened(): cap_test.release(); break
-            else: self.available_cameras.append({"id": index, "name": f"Kamera {index}"})
-            cap_test.release(); index += 1
-            if index > 3: break
+        # Tidak memblokir: hasil diambil oleh _poll_camera_discovery di thread Tk
+        self.camera_discovery.start()
+        self.after(100, self._poll_camera_discovery)
+
+    def _poll_camera_discovery(self):
+        if not self.camera_discovery.done: self.after(100, self._poll_camera_discovery); return
+        if self.camera_discovery.error: print(f"Error enumerasi kamera: {self.camera_discovery.error}")
+        self.available_cameras = self.camera_discovery.devices
         if self.available_cameras and hasattr(self, 'camera_combobox'):
             self.camera_combobox['values'] = [cam['name'] for cam in self.available_cameras]
             if self.available_cameras:
@@ -109,6 +158,7 @@ class AppRPPG(tk.Tk):
         global_control_frame = tk.Frame(self, pady=5); global_control_frame.pack(fill=tk.X, side=tk.TOP)
         self.btn_start_webcam = ttk.Button(global_control_frame, text="Mulai Kamera", command=self.start_webcam_feed); self.btn_start_webcam.pack(side=tk.LEFT, padx=10)
         self.btn_stop_webcam = ttk.Button(global_control_frame, text="Stop Kamera", command=self.stop_webcam_feed, state=tk.DISABLED); self.btn_stop_webcam.pack(side=tk.LEFT, padx=5)
+        self.lbl_rates = tk.Label(global_control_frame, text="", font=("Arial", 9), fg="gray"); self.lbl_rates.pack(side=tk.RIGHT, padx=10)
         main_content_frame = tk.Frame(self, bg="white"); main_content_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         main_content_frame.columnconfigure(0, weight=1, minsize=300, uniform="app_cols"); main_content_frame.columnconfigure(1, weight=1, minsize=300, uniform="app_cols")
         main_content_frame.rowconfigure(0, weight=2, minsize=250, uniform="app_rows_main"); main_content_frame.rowconfigure(1, weight=1, minsize=200, uniform="app_rows_main")
@@ -128,6 +178,8 @@ class AppRPPG(tk.Tk):
         self.webcam_label = tk.Label(webcam_frame_container, bg="black"); self.webcam_label.pack(fill=tk.BOTH, expand=True, padx=1, pady=1)
         self.camera_control_frame = tk.Frame(webcam_frame_container) ; self.camera_control_frame.place(relx=1.0, rely=0.0, anchor="ne", x=-5, y=5)
         self.btn_select_camera = ttk.Button(self.camera_control_frame, text="📷", width=3, command=self.toggle_camera_selection); self.btn_select_camera.pack(side=tk.LEFT)
+        self.btn_latency = ttk.Button(self.camera_control_frame, text="⏱", width=3, command=self.toggle_latency_overlay); self.btn_latency.pack(side=tk.LEFT, padx=(5,0))
+        self.lbl_latency = tk.Label(webcam_frame_container, text="", font=("Courier", 8), fg="#00FF66", bg="black", justify=tk.LEFT, anchor="nw")
         self.camera_var = tk.StringVar(); self.camera_combobox = ttk.Combobox(self.camera_control_frame, textvariable=self.camera_var, state="readonly", width=15); self.camera_combobox.bind("<<ComboboxSelected>>", self.on_camera_selected)
         numeric_data_area = ttk.LabelFrame(right_column_frame, text=" Data Terukur "); numeric_data_area.grid(row=1, column=0, sticky="nsew", padx=5, pady=(5,0)); numeric_data_area.columnconfigure(0, weight=1); numeric_data_area.columnconfigure(1, weight=1); numeric_data_area.rowconfigure(0, weight=1); numeric_data_area.rowconfigure(1, weight=2); numeric_data_area.rowconfigure(2, weight=1)
         tk.Label(numeric_data_area, text="RR", font=("Arial", 12, "bold"), fg="green").grid(row=0, column=0, sticky="s", pady=(5,0))
@@ -145,6 +197,15 @@ class AppRPPG(tk.Tk):
                 self.camera_combobox.pack(side=tk.LEFT, padx=(5,0)); self.camera_selection_visible = True
             else: messagebox.showinfo("Info Kamera", "Tidak ada kamera terdeteksi.")
 
+    def toggle_latency_overlay(self):
+        if self.latency_overlay_visible:
+            self.lbl_latency.place_forget(); self.latency_overlay_visible = False
+            self.latency.enabled = self._latency_requested
+        else:
+            self.latency.enabled = True
+            self.lbl_latency.config(text=self.latency.format_summary()); self.lbl_latency.place(relx=0.0, rely=0.0, anchor="nw", x=5, y=5)
+            self.latency_overlay_visible = True
+
     def on_camera_selected(self, event):
         selected_name = self.camera_var.get(); new_cam_index = next((cam['id'] for cam in self.available_cameras if cam['name'] == selected_name), -1)
         if new_cam_index == -1: return
@@ -154,132 +215,199 @@ class AppRPPG(tk.Tk):
         if self.camera_selection_visible: self.camera_combobox.pack_forget(); self.camera_selection_visible = False
 
     def start_webcam_feed(self):
-        if self.webcam_active: return
-        self.cap = cv2.VideoCapture(self.selected_camera_index, cv2.CAP_DSHOW)
+        if self.webcam_active or self._stopping_worker: return
+        self.cap = open_camera(self.selected_camera_index)
         if not self.cap.isOpened(): messagebox.showerror("Error Kamera", f"Tidak bisa buka kamera {self.selected_camera_index}."); self.cap = None; return
         self.webcam_active = True
         self.btn_start_webcam.config(state=tk.DISABLED); self.btn_stop_webcam.config(state=tk.NORMAL); self.btn_select_camera.config(state=tk.DISABLED)
         if self.camera_selection_visible: self.camera_combobox.pack_forget(); self.camera_selection_visible = False
+        # Capture dan pemrosesan berjalan di thread terpisah; thread Tk hanya menampilkan hasil
+        self.capture = LatestFrameCapture(self.cap, latency=self.latency).start(); self._dropped_seen = 0
+        self.worker = ProcessingWorker(self.capture, self._process_frame).start()
+        self.display_meter = RateMeter()
         self._update_frame()
 
     def stop_webcam_feed(self):
         if not self.webcam_active: return
         self.webcam_active = False
         if self.webcam_update_job: self.after_cancel(self.webcam_update_job); self.webcam_update_job = None
-        if self.cap: self.cap.release(); self.cap = None
-        self.btn_start_webcam.config(state=tk.NORMAL); self.btn_stop_webcam.config(state=tk.DISABLED); self.btn_select_camera.config(state=tk.NORMAL)
+        if self.worker:
+            # Processor tidak boleh dipakai dua thread: Start/ganti kamera ditahan sampai worker lama selesai
+            if not self.worker.stop(): self._stopping_worker = self.worker; self._poll_stopping_worker()
+            self.worker = None
+        # close(): cap di-release setelah thread capture benar-benar berhenti membaca
+        if self.capture: self.capture.close(); self.capture = None
+        elif self.cap: self.cap.release()
+        self.cap = None
+        idle_state = tk.DISABLED if self._stopping_worker else tk.NORMAL
+        self.btn_start_webcam.config(state=idle_state); self.btn_stop_webcam.config(state=tk.DISABLED); self.btn_select_camera.config(state=idle_state)
         if MATPLOTLIB_AVAILABLE:
-            if hasattr(self, 'line_rppg'): self._update_rppg_plot([], []) 
-            if hasattr(self, 'line_resp'): self._update_resp_plot([])
-        self.lbl_hr_value.config(text="--"); self.lbl_rr_value.config(text="--")
+            self._update_rppg_plot([], [], force=True)
+            self._update_resp_plot([], force=True)
+        self.lbl_hr_value.config(text="--"); self.lbl_rr_value.config(text="--"); self.lbl_rates.config(text="")
+
+    def _poll_stopping_worker(self):
+        if not self._stopping_worker: return
+        if not self._stopping_worker.stop(timeout=0): self.after(100, self._poll_stopping_worker); return
+        self._stopping_worker = None
+        if not self.webcam_active: self.btn_start_webcam.config(state=tk.NORMAL); self.btn_select_camera.config(state=tk.NORMAL)
+
+    def _process_frame(self, frame_ctx):
+        """
+        Dijalankan di thread ProcessingWorker: proses satu frame dan kembalikan
+        snapshot hasil (salinan data, aman dibaca thread Tk).
+        """
+        result = {"hr": None, "rr": None, "hr_error": False, "rr_error": False,
+                  "rppg_plot": [], "resp_plot": [], "hr_peaks": [], "frame_rgb": None,
+                  "capture_time": frame_ctx.timestamp}
+        self.latency.record("queue_wait", time.monotonic() - frame_ctx.timestamp)
+        dropped = self.capture.dropped if self.capture else 0
+        self.latency.add_dropped(dropped - self._dropped_seen); self._dropped_seen = dropped
+
+        if self.inference:
+            try:
+                self.inference.process(frame_ctx)
+            except Exception as e:
+                result["hr_error"] = result["rr_error"] = True
+
+        if self.rppg_proc:
+            try:
+                if not self.inference: self.rppg_proc.extract_rgb_from_frame(frame_ctx)
+                result["hr"] = self.rppg_proc.get_heart_rate()
+                rppg_data_full = self.rppg_proc.get_filtered_rppg()
+                if rppg_data_full is not None and len(rppg_data_full) > 0:
+                    result["rppg_plot"] = np.array(rppg_data_full[-250:]) # Ambil N sampel terakhir (salinan)
+                if hasattr(self.rppg_proc, 'get_last_hr_peaks'): # Cek jika method ada (OPSIONAL untuk plot puncak)
+                    all_peaks = self.rppg_proc.get_last_hr_peaks()
+                    if len(all_peaks) > 0 and len(rppg_data_full) > 0:
+                        offset = max(0, len(rppg_data_full) - len(result["rppg_plot"]))
+                        result["hr_peaks"] = [p - offset for p in all_peaks if p >= offset and p < offset + len(result["rppg_plot"])]
+            except Exception as e:
+                result["hr_error"] = True
+
+        if self.resp_proc:
+            try:
+                if not self.inference: self.resp_proc.extract_resp_from_frame(frame_ctx)
+                result["rr"] = self.resp_proc.get_respiration_rate()
+                resp_data_full = self.resp_proc.get_filtered_resp()
+                if resp_data_full is not None and len(resp_data_full) > 0:
+                    result["resp_plot"] = np.array(resp_data_full[-250:])
+            except Exception as e:
+                result["rr_error"] = True
+
+        # Frame RGB konteks tidak disalin; overlay digambar thread Tk di buffer tampilan
+        result["frame_rgb"] = frame_ctx.rgb
+        result["forehead_rect"] = self.rppg_proc.get_forehead_rect() if self.rppg_proc else None
+        result["shoulders"] = self.resp_proc.get_last_shoulder_points() if self.resp_proc else None
+        self.latency.frame_done(frame_ctx.index)
+        return result
 
     def _update_frame(self):
-        if not self.webcam_active or not self.cap or not self.cap.isOpened(): self.stop_webcam_feed(); return
-        ret, frame = self.cap.read()
-        if ret:
-            frame_asli = frame.copy(); frame_tampil = frame.copy()
-            hr_val, rr_val = None, None
-            rppg_data_for_plot, resp_data_for_plot, hr_peaks_for_plot = [], [], []
-
-            if self.rppg_proc:
-                try:
-                    self.rppg_proc.extract_rgb_from_frame(frame_asli)
-                    forehead_rect = self.rppg_proc.get_forehead_rect()
-                    if forehead_rect: cv2.rectangle(frame_tampil, forehead_rect[:2], forehead_rect[2:], (0,255,0), 2)
-                    
-                    hr_val = self.rppg_proc.get_heart_rate() # Menggunakan method dari rppg_processor.py mu
-                    rppg_data_full = self.rppg_proc.get_filtered_rppg() # Menggunakan method dari rppg_processor.py mu
-                    
-                    if rppg_data_full is not None and len(rppg_data_full) > 0:
-                        rppg_data_for_plot = rppg_data_full[-250:] # Ambil N sampel terakhir
-                    
-                    if hasattr(self.rppg_proc, 'get_last_hr_peaks'): # Cek jika method ada (OPSIONAL untuk plot puncak)
-                        all_peaks = self.rppg_proc.get_last_hr_peaks()
-                        if all_peaks and rppg_data_full and len(rppg_data_full) > 0:
-                             offset = max(0, len(rppg_data_full) - len(rppg_data_for_plot))
-                             hr_peaks_for_plot = [p - offset for p in all_peaks if p >= offset and p < offset + len(rppg_data_for_plot)]
-                except Exception as e: 
-                    # print(f"ERROR rppg_proc: {e}") # Matikan print error ini jika terlalu berisik saat debug
-                    self.lbl_hr_value.config(text="Err") # Ubah pesan error agar lebih singkat
-            
-            if self.resp_proc:
-                try:
-                    self.resp_proc.extract_resp_from_frame(frame_asli)
-                    shoulder_points_list = self.resp_proc.get_shoulder_points()
-                    if shoulder_points_list and shoulder_points_list[0] != ((0,0),(0,0)):
-                         last_shoulders = shoulder_points_list[-1]
-                         if last_shoulders[0]!=(0,0): cv2.circle(frame_tampil, last_shoulders[0], 5, (0,255,0), -1)
-                         if last_shoulders[1]!=(0,0): cv2.circle(frame_tampil, last_shoulders[1], 5, (0,255,0), -1)
-                    
-                    rr_val = self.resp_proc.get_respiration_rate() # Menggunakan method dari respirasi_processor.py mu
-                    resp_data_full = self.resp_proc.get_filtered_resp() # Menggunakan method dari respirasi_processor.py mu
-                    if resp_data_full is not None and len(resp_data_full) > 0:
-                        resp_data_for_plot = resp_data_full[-250:]
-                except Exception as e: 
-                    # print(f"ERROR resp_proc: {e}") # Matikan print error ini jika terlalu berisik saat debug
-                    self.lbl_rr_value.config(text="Err")
+        if not self.webcam_active or not self.capture: self.stop_webcam_feed(); return
+        if not self.capture.running and not self.worker.running: self.stop_webcam_feed(); return
+        result = self.worker.get_result()
+        if result is not None:
+            self.display_meter.tick()
 
             # Tampilkan Video
-            display_frame_rgb = cv2.cvtColor(frame_tampil, cv2.COLOR_BGR2RGB)
-            target_w = self.webcam_label.winfo_width(); target_h = self.webcam_label.winfo_height()
-            if target_w > 1 and target_h > 1 and display_frame_rgb.shape[0] > 0 and display_frame_rgb.shape[1] > 0:
-                h_ori, w_ori = display_frame_rgb.shape[:2]
-                ratio_ori = w_ori / h_ori if h_ori > 0 else 1; ratio_target = target_w / target_h if target_h > 0 else ratio_ori
-                if ratio_ori > ratio_target: new_w = target_w; new_h = int(target_w / ratio_ori) if ratio_ori != 0 else target_h
-                else: new_h = target_h; new_w = int(target_h * ratio_ori) if ratio_target != 0 else target_w
-                if new_w > 0 and new_h > 0: resized_frame = cv2.resize(display_frame_rgb, (new_w, new_h))
-                else: resized_frame = display_frame_rgb
-                img = Image.fromarray(resized_frame)
-            else: img = Image.fromarray(display_frame_rgb)
-            imgtk = ImageTk.PhotoImage(image=img); self.webcam_label.configure(image=imgtk); self.webcam_label.image = imgtk
+            with self.latency.stage("display"): self._show_frame(result["frame_rgb"], result["forehead_rect"], result["shoulders"])
 
             # Update Plot
+            rppg_data_for_plot, resp_data_for_plot = result["rppg_plot"], result["resp_plot"]
             if MATPLOTLIB_AVAILABLE:
-                if len(rppg_data_for_plot) > 1: self._update_rppg_plot(rppg_data_for_plot, hr_peaks_for_plot)
-                else: self._update_rppg_plot([], [])
-                if len(resp_data_for_plot) > 1: self._update_resp_plot(resp_data_for_plot)
-                else: self._update_resp_plot([])
-            
+                with self.latency.stage("plot"):
+                    if len(rppg_data_for_plot) > 1: self._update_rppg_plot(rppg_data_for_plot, result["hr_peaks"])
+                    else: self._update_rppg_plot([], [])
+                    if len(resp_data_for_plot) > 1: self._update_resp_plot(resp_data_for_plot)
+                    else: self._update_resp_plot([])
+
             # Update Nilai HR/RR
-            self.lbl_hr_value.config(text=f"{hr_val:.0f}" if hr_val is not None and hr_val != 0 else "--")
-            self.lbl_rr_value.config(text=f"{rr_val:.0f}" if rr_val is not None and rr_val != 0 else "--")
+            hr_val, rr_val = result["hr"], result["rr"]
+            if result["hr_error"]: self.lbl_hr_value.config(text="Err")
+            else: self.lbl_hr_value.config(text=f"{hr_val:.0f}" if hr_val is not None and hr_val != 0 else "--")
+            if result["rr_error"]: self.lbl_rr_value.config(text="Err")
+            else: self.lbl_rr_value.config(text=f"{rr_val:.0f}" if rr_val is not None and rr_val != 0 else "--")
+
+            # Laju capture / proses / tampil ditampilkan terpisah
+            self.lbl_rates.config(text=f"Capture {self.capture.rate:.1f} fps | Proses {self.worker.rate:.1f} fps | "
+                                       f"Tampil {self.display_meter.rate:.1f} fps | Drop {self.capture.dropped}")
+            if self.latency_overlay_visible and self.display_meter.count % 15 == 0:
+                self.lbl_latency.config(text=self.latency.format_summary())
+
+        if self.webcam_active: self.webcam_update_job = self.after(15, self._update_frame)
+
+    def _update_display_size(self, src_w, src_h):
+        """
+        Hitung ukuran tampil (pertahankan aspek) dan alokasikan ulang buffer
+        serta PhotoImage hanya jika ukuran sumber/area berubah.
+        """
+        self._display_src = (src_w, src_h)
+        area_w, area_h = self._video_area if self._video_area else (src_w, src_h)
+        ratio_ori = src_w / src_h
+        if ratio_ori > area_w / area_h: new_w = area_w; new_h = max(1, int(area_w / ratio_ori))
+        else: new_h = area_h; new_w = max(1, int(area_h * ratio_ori))
+        if (new_w, new_h) == self._display_size and self._photo is not None: return
+        self._display_size = (new_w, new_h)
+        self._display_buf = np.empty((new_h, new_w, 3), dtype=np.uint8)
+        self._display_img = Image.frombuffer("RGB", (new_w, new_h), self._display_buf, "raw", "RGB", 0, 1)
+        self._photo = ImageTk.PhotoImage(image=self._display_img)
+        self.webcam_label.configure(image=self._photo); self.webcam_label.image = self._photo
 
-        if self.webcam_active: self.webcam_update_job = self.after(40, self._update_frame)
+    def _show_frame(self, frame_rgb, forehead_rect=None, shoulders=None):
+        src_h, src_w = frame_rgb.shape[:2]
+        if src_w == 0 or src_h == 0: return
+        if (src_w, src_h) != self._display_src or self._photo is None: self._update_display_size(src_w, src_h)
+        new_w, new_h = self._display_size
+        # Resize langsung ke buffer tampilan, lalu overlay dalam koordinat tampilan
+        if (new_w, new_h) == (src_w, src_h): np.copyto(self._display_buf, frame_rgb)
+        else: cv2.resize(frame_rgb, (new_w, new_h), dst=self._display_buf, interpolation=cv2.INTER_LINEAR)
+        sx = new_w / src_w; sy = new_h / src_h
+        if forehead_rect:
+            x1, y1, x2, y2 = forehead_rect
+            cv2.rectangle(self._display_buf, (int(x1*sx), int(y1*sy)), (int(x2*sx), int(y2*sy)), (0,255,0), 2)
+        if shoulders:
+            for point in shoulders:
+                if point != (0,0): cv2.circle(self._display_buf, (int(point[0]*sx), int(point[1]*sy)), 5, (0,255,0), -1)
+        self._photo.paste(self._display_img)
 
-    def _update_rppg_plot(self, data_list, peaks_list=None):
-        if not MATPLOTLIB_AVAILABLE or not hasattr(self, 'line_rppg') or self.line_rppg is None: return
+    def _update_rppg_plot(self, data_list, peaks_list=None, force=False):
+        if not MATPLOTLIB_AVAILABLE or getattr(self, 'rppg_plot', None) is None: return
         try:
-            np_data = np.array(data_list)
-            if np_data.ndim == 1 and np_data.size > 1:
-                self.line_rppg.set_ydata(np_data); self.line_rppg.set_xdata(np.arange(len(np_data)))
-                self.ax_rppg.set_xlim(0, len(np_data) if len(np_data) > 0 else 250)
-                # Sumbu Y sudah di-set di _setup_plots, tidak di-autoscale lagi per frame
-                if peaks_list and hasattr(self, 'peaks_rppg_line_plot'): # peaks_list bisa list kosong
-                    valid_peaks = [p for p in peaks_list if 0 <= p < len(np_data)]
-                    self.peaks_rppg_line_plot.set_data(valid_peaks, np_data[valid_peaks] if valid_peaks else [])
-                elif hasattr(self, 'peaks_rppg_line_plot'): self.peaks_rppg_line_plot.set_data([],[])
-            else: 
-                self.line_rppg.set_ydata([]); self.line_rppg.set_xdata([])
-                if hasattr(self, 'peaks_rppg_line_plot'): self.peaks_rppg_line_plot.set_data([],[])
-            self.canvas_rppg.draw_idle()
+            # Buffer garis sudah dialokasikan; data disalin di tempat, digambar ulang via blit (throttled)
+            np_data = np.asarray(data_list, dtype=float)
+            if np_data.ndim != 1 or np_data.size <= 1: np_data = np_data[:0]
+            self.rppg_plot.set_line(self.line_rppg, np_data)
+            if peaks_list: # Data rata kanan: geser indeks puncak ke posisi buffer
+                offset = self.rppg_plot.n_points - len(np_data)
+                valid_peaks = np.array([p for p in peaks_list if 0 <= p < len(np_data)], dtype=int)
+                self.peaks_rppg_line_plot.set_data(valid_peaks + offset, np_data[valid_peaks])
+            else: self.peaks_rppg_line_plot.set_data([], [])
+            self.rppg_plot.render(force=force)
         except Exception as e: print(f"Error update RPPG plot: {e}")
 
-    def _update_resp_plot(self, data_list, peaks_list=None):
-        if not MATPLOTLIB_AVAILABLE or not hasattr(self, 'line_resp') or self.line_resp is None: return
+    def _update_resp_plot(self, data_list, peaks_list=None, force=False):
+        if not MATPLOTLIB_AVAILABLE or getattr(self, 'resp_plot', None) is None: return
         try:
-            np_data = np.array(data_list)
-            if np_data.ndim == 1 and np_data.size > 1:
-                self.line_resp.set_ydata(np_data); self.line_resp.set_xdata(np.arange(len(np_data)))
-                self.ax_resp.set_xlim(0, len(np_data) if len(np_data) > 0 else 250)
-                # Sumbu Y sudah di-set di _setup_plots
-            else:
-                self.line_resp.set_ydata([]); self.line_resp.set_xdata([])
-            self.canvas_resp.draw_idle()
+            np_data = np.asarray(data_list, dtype=float)
+            if np_data.ndim != 1 or np_data.size <= 1: np_data = np_data[:0]
+            self.resp_plot.set_line(self.line_resp, np_data)
+            self.resp_plot.render(force=force)
         except Exception as e: print(f"Error update Resp plot: {e}")
 
-    def on_window_resize(self, event): pass
+    def on_window_resize(self, event):
+        # <Configure> toplevel juga diterima untuk widget anak; hanya area video yang relevan
+        if event.widget is not self.webcam_label or event.width <= 1 or event.height <= 1: return
+        # Sisakan border/padding label agar ukuran yang diminta label tidak ikut membesar
+        inset = 2 * sum(int(float(self.webcam_label.cget(opt))) for opt in ("borderwidth", "highlightthickness"))
+        area = (max(1, event.width - inset), max(1, event.height - inset))
+        if area == self._video_area: return
+        self._video_area = area
+        if self._display_src: self._update_display_size(*self._display_src)
     def on_closing_window(self):
         if self.webcam_active: self.stop_webcam_feed()
+        if self._stopping_worker: self._stopping_worker.stop(timeout=None); self._stopping_worker = None
+        if self.inference: self.inference.close()
+        self.latency.close()
         self.destroy()
 
 if __name__ == "__main__":
@@ -13,21 +13,17 @@ except ImportError:
     print("ERROR KRITIS AWAL: Pillow (PIL) tidak terinstal.")
 
 
-try:
-    from gui_app import AppRPPG  # Asumsi kelas utama di gui_app.py adalah AppRPPG
-    GUI_APP_AVAILABLE = True
-    print("DEBUG: Kelas AppRPPG dari gui_app.py berhasil diimpor.")
-except ImportError as e:
-    GUI_APP_AVAILABLE = False
-    print(f"ERROR DEBUG: Tidak bisa impor AppRPPG dari gui_app.py: {e}")
-    # Pesan error akan ditampilkan jika tombol START diklik dan GUI_APP_AVAILABLE False
+import model_loader  # ringan: mediapipe baru diimpor di thread loader
+
+# gui_app (matplotlib, processor) diimpor saat START diklik, bukan saat landing page dibuka
 
 print("--- landing_page.py: Skrip Mulai Dijalankan ---")
 
 class LandingPage(tk.Tk):
-    def __init__(self):
+    def __init__(self, frontend="tk"):
         super().__init__()
         print("DEBUG: LandingPage __init__ - Mulai")
+        self.frontend = frontend  # "tk" (AppRPPG) atau "qt" (qt_app.MonitorWindow)
         self.title("VitalCam - Selamat Datang!")
 
         self.guide_window_instance = None
@@ -63,6 +59,10 @@ class LandingPage(tk.Tk):
 
         self.bind("<Configure>", self.on_resize_event)
         self.after(100, lambda: self.on_resize_event(None))
+
+        # Model MediaPipe dimuat + warm-up di background selama landing page tampil
+        self.model_loader = model_loader.preload()
+        self.after(200, self._poll_model_loader)
         print("DEBUG: LandingPage __init__ - Selesai")
 
     def load_assets(self):
@@ -285,9 +285,38 @@ class LandingPage(tk.Tk):
         print("DEBUG: Event binding untuk klik dan motion di canvas ditambahkan.")
         print("DEBUG: LandingPage setup_ui_elements - Selesai (tanpa membuat tk.Button untuk tombol utama)")
 
+    def _draw_loader_status(self):
+        loader = self.model_loader
+        if loader.error: text = f"Gagal memuat model: {loader.error}"
+        elif loader.done: text = "Model siap"
+        else: text = f"Memuat model: {loader.status} ({loader.progress:.0%})"
+        self.bg_canvas.delete("loader_status")
+        self.bg_canvas.create_text(self.winfo_width() / 2, self.winfo_height() - 30, text=text,
+                                   font=("Arial", 10), fill=self.text_fg_color, anchor=tk.CENTER, tags="loader_status")
+
+    def _poll_model_loader(self):
+        self._draw_loader_status()
+        if not self.model_loader.done: self.after(200, self._poll_model_loader)
+
     def launch_main_application(self):
         print("DEBUG: Tombol START diklik! Meluncurkan aplikasi utama...")
-        if GUI_APP_AVAILABLE and AppRPPG: # Pastikan AppRPPG berhasil diimpor
+        if self.frontend == "qt":
+            try:
+                import qt_app
+            except ImportError as e:
+                messagebox.showerror("Kesalahan Aplikasi",
+                                     f"Frontend Qt butuh PyQt6 dan pyqtgraph.\n{e}")
+                return
+            self.destroy()
+            qt_app.run_app([])
+            return
+        try:
+            from gui_app import AppRPPG  # Asumsi kelas utama di gui_app.py adalah AppRPPG
+            print("DEBUG: Kelas AppRPPG dari gui_app.py berhasil diimpor.")
+        except ImportError as e:
+            print(f"ERROR DEBUG: Tidak bisa impor AppRPPG dari gui_app.py: {e}")
+            AppRPPG = None
+        if AppRPPG: # Pastikan AppRPPG berhasil diimpor
             print("DEBUG: Menutup LandingPage...")
             self.destroy() # Menutup jendela landing page
 
@@ -412,6 +441,7 @@ class LandingPage(tk.Tk):
                 y_pos_btn_canvas += btn_h + (current_height * button_spacing_canvas_factor)
 
             print(f"DEBUG: Tombol-tombol (sebagai gambar canvas) di-update dan diposisikan.")
+            if hasattr(self, "model_loader"): self._draw_loader_status()
 
         except Exception as e_resize:
             print(f"ERROR KRITIS di on_resize_event: {e_resize}")
@@ -420,6 +450,11 @@ class LandingPage(tk.Tk):
 
 if __name__ == "__main__":
     print("DEBUG: Masuk blok if __name__ == '__main__'")
+    import argparse
+    parser = argparse.ArgumentParser(description="VitalCam")
+    parser.add_argument("--frontend", choices=["tk", "qt"], default="tk",
+                        help="tk: AppRPPG (Tkinter), qt: PyQt6 + pyqtgraph")
+    args = parser.parse_args()
     if not PILLOW_AVAILABLE:
         root_err_check = tk.Tk()
         root_err_check.withdraw()
@@ -431,7 +466,7 @@ if __name__ == "__main__":
     app_created_successfully = False
     try:
         print("DEBUG: Mencoba membuat instance LandingPage...")
-        app = LandingPage()
+        app = LandingPage(frontend=args.frontend)
         if hasattr(app, 'winfo_exists') and app.winfo_exists():
             app_created_successfully = True
             print("DEBUG: Instance LandingPage berhasil dibuat dan jendela masih ada.")
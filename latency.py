@@ -0,0 +1,190 @@
+# latency.py
+
+import json
+import threading
+import time
+
+import numpy as np
+
+from ring_buffer import RingBuffer
+
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    __slots__ = ("monitor", "name", "t0")
+
+    def __init__(self, monitor, name):
+        self.monitor = monitor
+        self.name = name
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.monitor.record(self.name, time.perf_counter() - self.t0)
+        return False
+
+
+class LatencyMonitor:
+    """
+    Lightweight per-stage timing hooks.
+
+        with monitor.stage("pos"):
+            ...
+
+    When disabled, stage() returns a shared no-op context manager, so the
+    hooks can stay in the hot path. When enabled, the last `window`
+    durations per stage are kept for rolling p50/p95/p99, dropped frames
+    are counted, and every finished frame can be appended to a JSON lines
+    file for offline analysis.
+
+    Pending per-frame stage times are kept per thread: frame_done() closes
+    the record of the calling (processing) thread only. Stages timed on
+    other threads (capture, display/plot) are written as separate records
+    tagged with their thread name, so they never land in another frame.
+    """
+
+    def __init__(self, enabled=False, window=300, jsonl_path=None):
+        self.enabled = enabled
+        self.window = window
+        self.dropped = 0
+        self.frames = 0
+
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._current = {}    # thread ident -> {stage: detik} sejak frame_done terakhir
+        self._thread_names = {}
+        self._jsonl = None
+        if jsonl_path:
+            self.export_jsonl(jsonl_path)
+
+    def stage(self, name):
+        if not self.enabled:
+            return _NULL_STAGE
+        return _Stage(self, name)
+
+    def record(self, name, seconds):
+        if not self.enabled:
+            return
+        with self._lock:
+            buf = self._stages.get(name)
+            if buf is None:
+                buf = self._stages[name] = RingBuffer(self.window, fps=1)
+            buf.append(seconds)
+            current = self._thread_current()
+            current[name] = current.get(name, 0.0) + seconds
+
+    def add_dropped(self, n=1):
+        if self.enabled and n > 0:
+            with self._lock:
+                self.dropped += n
+                current = self._thread_current()
+                current["dropped"] = current.get("dropped", 0) + n
+
+    def _thread_current(self):
+        # Dipanggil dengan _lock dipegang
+        ident = threading.get_ident()
+        current = self._current.get(ident)
+        if current is None:
+            current = self._current[ident] = {}
+            self._thread_names[ident] = threading.current_thread().name
+        return current
+
+    def frame_done(self, frame_index=None, timestamp=None):
+        """
+        Close the per-frame record (stages recorded on the calling thread
+        since its previous call) and write it to the JSON lines export if
+        active, followed by one record per other thread with pending stages.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            ident = threading.get_ident()
+            current = self._current.pop(ident, {})
+            others, self._current = self._current, {}
+            self.frames += 1
+            if self._jsonl is not None:
+                t = time.time() if timestamp is None else timestamp
+                self._write_record(frame_index, t, ident, current)
+                # Capture/tampilan berjalan di thread lain dengan laju sendiri
+                for other, stages in others.items():
+                    self._write_record(None, t, other, stages)
+
+    def _write_record(self, frame_index, t, ident, stages):
+        dropped = stages.pop("dropped", 0)
+        line = {
+            "frame": frame_index,
+            "t": t,
+            "thread": self._thread_names.get(ident, threading.current_thread().name),
+            "stages_ms": {k: round(v * 1000.0, 4) for k, v in stages.items()},
+            "dropped": dropped,
+        }
+        self._jsonl.write(json.dumps(line) + "\n")
+
+    def percentiles(self, name, q=(50, 95, 99)):
+        """
+        Rolling percentiles of one stage in milliseconds (None if unseen).
+        """
+        with self._lock:
+            buf = self._stages.get(name)
+            if buf is None or len(buf) == 0:
+                return None
+            values = np.array(buf.latest())
+        return tuple(float(v) for v in np.percentile(values * 1000.0, q))
+
+    def summary(self):
+        """
+        {stage: {"p50_ms", "p95_ms", "p99_ms", "n"}} plus frame/drop counts.
+        """
+        result = {"frames": self.frames, "dropped": self.dropped, "stages": {}}
+        for name in list(self._stages):
+            p = self.percentiles(name)
+            if p is not None:
+                result["stages"][name] = {"p50_ms": p[0], "p95_ms": p[1], "p99_ms": p[2],
+                                          "n": len(self._stages[name])}
+        return result
+
+    def format_summary(self):
+        """
+        Ringkasan teks untuk overlay GUI.
+        """
+        s = self.summary()
+        lines = [f"{'stage':<14}{'p50':>7}{'p95':>7}{'p99':>7}  ms"]
+        for name, v in s["stages"].items():
+            lines.append(f"{name:<14}{v['p50_ms']:>7.1f}{v['p95_ms']:>7.1f}{v['p99_ms']:>7.1f}")
+        lines.append(f"frames {s['frames']}  dropped {s['dropped']}")
+        return "\n".join(lines)
+
+    def export_jsonl(self, path):
+        self.close()
+        self._jsonl = open(path, "a", buffering=1)
+
+    def reset(self):
+        with self._lock:
+            self._stages = {}
+            self._current = {}
+            self._thread_names = {}
+            self.dropped = 0
+            self.frames = 0
+
+    def close(self):
+        if self._jsonl is not None:
+            self._jsonl.close()
+            self._jsonl = None
+
+
+# Monitor nonaktif bersama, dipakai processor jika tidak diberi monitor
+NULL_MONITOR = LatencyMonitor(enabled=False)
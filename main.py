@@ -1,36 +1,231 @@
 # main.py
+#
+# Analisis offline file video (tanpa GUI), secepat CPU mengizinkan:
+#   python main.py rekaman.mp4 --out hasil.csv
+#   python main.py rekaman.mp4 --out hasil.npz --hr-method spectral
+#   python main.py rekaman.mp4 --record sesi01      (simpan trace upstream)
+#   python main.py sesi01 --hr-method spectral      (replay trace, tanpa video/model)
 
-import cv2
+import argparse
+import csv
+import logging
+import os
+import time
+
+import numpy as np
+
+from capture import VideoFileReader
 from rppg_processor import RPPGProcessor
-from signal_utils import bandpass_filter, calculate_heart_rate
-from visualization import plot_signal_with_peaks
+from respirasi_processor import RespirasiProcessor
+from parallel_inference import InferenceRunner, InferenceScaleController
+from frame_scheduler import FrameScheduler
+from trace_io import TraceRecorder, ReplaySource
+
+TRACE_COLUMNS = [
+    "frame", "time_s", "hr_bpm", "rr_rpm", "r_mean", "g_mean", "b_mean",
+    "rppg", "resp_motion", "resp_filtered",
+    "roi_x1", "roi_y1", "roi_x2", "roi_y2",
+    "l_shoulder_x", "l_shoulder_y", "r_shoulder_x", "r_shoulder_y",
+]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Analisis HR/RR offline dari file video")
+    parser.add_argument("video", help="path file video, atau folder trace untuk replay")
+    parser.add_argument("--out", default=None,
+                        help="file output .csv atau .npz (default: <video>.csv)")
+    parser.add_argument("--fps", type=float, default=None,
+                        help="paksa fps (default: dari metadata video)")
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--hr-method", choices=["peaks", "spectral"], default="peaks")
+    parser.add_argument("--rr-method", choices=["peaks", "spectral"], default="peaks")
+    parser.add_argument("--detect-every", type=int, default=1,
+                        help="deteksi wajah tiap N frame, di antaranya tracking")
+    parser.add_argument("--inference", choices=["inprocess", "process", "auto"], default="inprocess")
+    parser.add_argument("--inference-scale", type=float, default=1.0,
+                        help="skala frame untuk model (mis. 0.5 untuk 1080p); ROI tetap resolusi penuh")
+    parser.add_argument("--frame-budget-ms", type=float, default=None,
+                        help="turunkan skala inferensi otomatis bila waktu per frame melebihi budget")
+    parser.add_argument("--shed", action="store_true",
+                        help="lepas Pose (min 10 Hz) dan estimasi HR/RR (min 1 Hz) bila melebihi --shed-budget-ms")
+    parser.add_argument("--shed-budget-ms", type=float, default=None,
+                        help="budget per frame untuk --shed (default: 1/fps); terpisah dari --frame-budget-ms")
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--record", default=None, metavar="DIR",
+                        help="rekam trace upstream (RGB ROI, ROI, bahu) ke folder DIR untuk replay")
+    return parser.parse_args(argv)
+
+
+def _trace_row(index, timestamp, rppg, resp):
+    """
+    Satu baris TRACE_COLUMNS, ditambah dua indeks grid seragam untuk
+    menyejajarkan kolom rppg (lihat _to_traces).
+    """
+    rgb = rppg.rgb.last()
+    rppg_out = rppg.rppg_filter.output.last()
+    motion = resp.shoulder_motion_signal.last()
+    resp_out = resp.resp_filter.output.last()
+    rect = rppg.get_forehead_rect() or (-1, -1, -1, -1)
+    (lx, ly), (rx, ry) = resp.get_last_shoulder_points() or ((0, 0), (0, 0))
+    return (
+        index, timestamp, rppg.get_heart_rate(), resp.get_respiration_rate(),
+        rgb[0], rgb[1], rgb[2],
+        np.nan if rppg_out is None else float(rppg_out),
+        np.nan if motion is None else float(motion),
+        np.nan if resp_out is None else float(resp_out),
+        *rect, lx, ly, rx, ry,
+        # Sampel seragam terakhir frame ini, dan sampel seragam milik output
+        # rppg terakhir (output ke-j = sampel j + 1, tertinggal satu jendela POS)
+        rppg.rgb_uniform.total - 1, rppg.rppg_filter.output.total,
+    )
+
+
+def _to_traces(rows):
+    data = np.array(rows, dtype=float).reshape(-1, len(TRACE_COLUMNS) + 2)
+    traces = {name: data[:, i] for i, name in enumerate(TRACE_COLUMNS)}
+    # IncrementalPOS baru memfinalkan sampel setelah jendela terakhir yang
+    # mencakupnya lewat (~window - 1 sampel kemudian); kolom rppg digeser
+    # agar baris tiap frame berisi nilai untuk sampelnya sendiri. Frame
+    # terakhir (belum final saat video habis) bernilai NaN.
+    frame_sample, rppg_sample = data[:, -2], data[:, -1]
+    by_sample = {int(k): v for k, v in zip(rppg_sample, traces["rppg"]) if v == v}
+    traces["rppg"] = np.array([by_sample.get(int(k), np.nan) for k in frame_sample])
+    return traces
+
+
+def analyze_video(path, fps=None, max_frames=None, hr_method="peaks", rr_method="peaks",
+                  detect_every=1, inference="inprocess", queue_size=64, progress=True, record=None,
+                  inference_scale=1.0, frame_budget_ms=None, shed=False, shed_budget_ms=None):
+    """
+    Decode `path` on a reader thread and run both processors on every frame.
+    Returns (traces, stats): traces is a dict of per-frame arrays keyed by
+    TRACE_COLUMNS. If `record` is a folder, upstream results are also
+    written there as a replayable trace (see trace_io).
+    """
+    reader = VideoFileReader(path, fps=fps, queue_size=queue_size, max_frames=max_frames)
+    fps = reader.fps
+    rppg = RPPGProcessor(fps=fps, hr_method=hr_method, detect_every=detect_every)
+    resp = RespirasiProcessor(fps=fps, rr_method=rr_method)
+    recorder = TraceRecorder(record, fps=fps, meta={"source": os.path.abspath(path)}) if record else None
+    controller = None
+    if frame_budget_ms:
+        controller = InferenceScaleController(budget_sec=frame_budget_ms / 1000.0, initial=inference_scale)
+    scheduler = None
+    if shed:
+        # Budget sendiri: --frame-budget-ms hanya mengatur skala inferensi
+        budget_sec = shed_budget_ms / 1000.0 if shed_budget_ms else 1.0 / fps
+        scheduler = FrameScheduler(rppg, resp, budget_sec=budget_sec)
+    runner = InferenceRunner(rppg, resp, mode=inference, recorder=recorder,
+                             inference_scale=inference_scale, scale_controller=controller,
+                             scheduler=scheduler)
+
+    rows = []
+    t_start = time.perf_counter()
+    reader.start()
+    try:
+        for ctx in reader:
+            runner.process(ctx)
+            rows.append(_trace_row(ctx.index, ctx.timestamp, rppg, resp))
+
+            if progress and ctx.index % 300 == 0 and ctx.index > 0:
+                elapsed = time.perf_counter() - t_start
+                total = reader.frame_count or "?"
+                print(f"  frame {ctx.index}/{total}  {ctx.index / elapsed:.1f} fps")
+    finally:
+        reader.stop()
+        runner.close()
+        if recorder is not None:
+            recorder.close()
+
+    elapsed = time.perf_counter() - t_start
+    traces = _to_traces(rows)
+    stats = {
+        "frames": len(rows),
+        "video_fps": fps,
+        "wall_time_s": elapsed,
+        "throughput_fps": len(rows) / elapsed if elapsed > 0 else 0.0,
+        "decode_fps": reader.meter.rate,
+        "realtime_factor": (len(rows) / fps) / elapsed if elapsed > 0 else 0.0,
+        "inference_scale": runner.inference_scale,
+        "inference_scale_changes": controller.changes if controller else 0,
+        "shed_level_changes": scheduler.counts["level_changes"] if scheduler else 0,
+        "pose_ratio": scheduler.get_stats()["pose_ratio"] if scheduler else 1.0,
+    }
+    return traces, stats
+
+
+def replay_trace(path, hr_method="peaks", rr_method="peaks"):
+    """
+    Seperti analyze_video, tetapi dari trace hasil --record: hanya tahap
+    sinyal yang dijalankan (tanpa decode video dan tanpa model).
+    """
+    source = ReplaySource(path)
+    fps = source.fps
+    rppg = RPPGProcessor(fps=fps, hr_method=hr_method)
+    resp = RespirasiProcessor(fps=fps, rr_method=rr_method)
+    frames = source.reader.column("frame")
+    times = source.reader.column("time")
+    rows = []
+
+    def collect(i, rppg, resp):
+        rows.append(_trace_row(frames[i], times[i], rppg, resp))
+
+    t_start = time.perf_counter()
+    source.replay(rppg, resp, callback=collect)
+    elapsed = time.perf_counter() - t_start
+    stats = {
+        "frames": len(rows),
+        "video_fps": fps,
+        "wall_time_s": elapsed,
+        "throughput_fps": len(rows) / elapsed if elapsed > 0 else 0.0,
+        "decode_fps": 0.0,
+        "realtime_factor": (len(rows) / fps) / elapsed if elapsed > 0 else 0.0,
+    }
+    return _to_traces(rows), stats
+
 
-def main():
-    rppg = RPPGProcessor(fps=30)
-    cap = cv2.VideoCapture(0)
+def save_traces(traces, out_path, stats=None):
+    if out_path.lower().endswith(".npz"):
+        extra = {f"stat_{k}": np.asarray(v) for k, v in (stats or {}).items()}
+        np.savez_compressed(out_path, **traces, **extra)
+        return
+    with open(out_path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(TRACE_COLUMNS)
+        columns = [traces[name] for name in TRACE_COLUMNS]
+        for row in zip(*columns):
+            writer.writerow([f"{v:.6g}" for v in row])
 
-    frame_count = 0
-    max_frames = 300  # 10 detik
 
-    while frame_count < max_frames:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        rppg.extract_rgb_from_frame(frame)
-        cv2.imshow("Live Feed", frame)
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
-        frame_count += 1
+def main(argv=None):
+    args = parse_args(argv)
+    if args.shed:
+        # Keputusan shed/pulihkan dari FrameScheduler ditampilkan di konsol
+        logging.basicConfig(level=logging.INFO, format="  %(name)s: %(message)s")
+    out_path = args.out or os.path.splitext(os.path.normpath(args.video))[0] + ".csv"
 
-    cap.release()
-    cv2.destroyAllWindows()
+    print(f"Analisis: {args.video}")
+    if os.path.isdir(args.video):
+        traces, stats = replay_trace(args.video, hr_method=args.hr_method, rr_method=args.rr_method)
+    else:
+        traces, stats = analyze_video(
+            args.video, fps=args.fps, max_frames=args.max_frames,
+            hr_method=args.hr_method, rr_method=args.rr_method,
+            detect_every=args.detect_every, inference=args.inference,
+            queue_size=args.queue_size, record=args.record,
+            inference_scale=args.inference_scale, frame_budget_ms=args.frame_budget_ms,
+            shed=args.shed, shed_budget_ms=args.shed_budget_ms)
+    save_traces(traces, out_path, stats)
 
-    rgb_signals = rppg.get_rgb_signals()
-    rppg_raw = rppg.compute_pos(rgb_signals)
-    rppg_filtered = bandpass_filter(rppg_raw)
+    hr = traces["hr_bpm"]
+    rr = traces["rr_rpm"]
+    print(f"Selesai: {stats['frames']} frame dalam {stats['wall_time_s']:.1f} s "
+          f"-> {stats['throughput_fps']:.1f} fps end-to-end "
+          f"({stats['realtime_factor']:.1f}x real-time, decode {stats['decode_fps']:.1f} fps)")
+    if len(hr):
+        print(f"HR akhir: {hr[-1]:.1f} bpm | RR akhir: {rr[-1]:.1f} rpm")
+    print(f"Output: {out_path}")
 
-    hr, peaks = calculate_heart_rate(rppg_filtered)
-    plot_signal_with_peaks(rppg_filtered, peaks, hr)
 
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
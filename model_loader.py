@@ -0,0 +1,160 @@
+# model_loader.py
+#
+# Import mediapipe dan pembuatan model MediaPipe ditunda sampai dibutuhkan.
+# Landing page dapat memulai ModelLoader di thread latar belakang: model
+# dibuat dan di-warm-up dengan frame dummy selagi pengguna masih di landing
+# page, sehingga frame kamera pertama tidak menunggu model.
+#   model_loader.preload()            # mulai di background
+#   model_loader.get_loader().progress
+#   model = model_loader.load_model("face")   # dipakai processor
+
+import importlib
+import threading
+import time
+
+import numpy as np
+
+KINDS = ("face", "pose")
+
+# Modul pipeline yang ikut diimpor di background (scipy.signal ~1 s saat dingin)
+PRELOAD_MODULES = ("rppg_processor", "respirasi_processor")
+
+# Ukuran frame dummy untuk warm-up (tinggi, lebar, kanal)
+WARMUP_SHAPE = (480, 640, 3)
+
+
+def import_mediapipe():
+    import mediapipe as mp
+    return mp
+
+
+def build_model(kind):
+    mp = import_mediapipe()
+    if kind == "face":
+        return mp.solutions.face_detection.FaceDetection(model_selection=1, min_detection_confidence=0.5)
+    if kind == "pose":
+        return mp.solutions.pose.Pose(static_image_mode=False)
+    raise ValueError(f"Model tidak dikenal: {kind}")
+
+
+def warm_up(model, shape=WARMUP_SHAPE):
+    """
+    Satu inferensi pada frame hitam: inisialisasi graph/delegate terjadi di
+    sini, bukan pada frame kamera pertama.
+    """
+    model.process(np.zeros(shape, dtype=np.uint8))
+
+
+class ModelLoader:
+    """
+    Builds (and warms up) MediaPipe models on a background thread.
+    Each preloaded model is handed out once through take(); later callers
+    get a freshly built model, because a MediaPipe graph must not be shared
+    between processors.
+    """
+
+    def __init__(self, kinds=KINDS, warmup=True, warmup_shape=WARMUP_SHAPE, modules=PRELOAD_MODULES):
+        self.kinds = tuple(kinds)
+        self.modules = tuple(modules)
+        self.warmup = warmup
+        self.warmup_shape = warmup_shape
+        self.error = None
+        self.status = "belum dimulai"
+        self.timings = {}
+        self._steps = len(self.modules) + 1 + len(self.kinds) * (2 if warmup else 1)
+        self._steps_done = 0
+        self._models = {}
+        self._ready = {kind: threading.Event() for kind in self.kinds}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._done = threading.Event()
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="model-loader", daemon=True)
+            self._thread.start()
+        return self
+
+    def _step(self, status, fn):
+        self.status = status
+        t0 = time.perf_counter()
+        result = fn()
+        self.timings[status] = time.perf_counter() - t0
+        self._steps_done += 1
+        return result
+
+    def _run(self):
+        try:
+            for name in self.modules:
+                self._step(f"import {name}", lambda: importlib.import_module(name))
+            self._step("import mediapipe", import_mediapipe)
+            for kind in self.kinds:
+                try:
+                    model = self._step(f"memuat {kind}", lambda: build_model(kind))
+                    if self.warmup:
+                        self._step(f"warm-up {kind}", lambda: warm_up(model, self.warmup_shape))
+                    with self._lock:
+                        self._models[kind] = model
+                finally:
+                    self._ready[kind].set()
+            self.status = "siap"
+        except Exception as e:
+            self.error = e
+            self.status = f"gagal: {e}"
+        finally:
+            for event in self._ready.values():
+                event.set()
+            self._done.set()
+
+    def take(self, kind, timeout=None):
+        """
+        Model hasil preload (menunggu bila masih dimuat), atau None jika
+        sudah diambil / tidak di-preload / gagal.
+        """
+        if kind not in self._ready or self._thread is None:
+            return None
+        self._ready[kind].wait(timeout)
+        with self._lock:
+            return self._models.pop(kind, None)
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    @property
+    def progress(self):
+        """
+        0.0 .. 1.0
+        """
+        return 1.0 if self.done else self._steps_done / self._steps
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+
+_loader = None
+_loader_lock = threading.Lock()
+
+
+def preload(kinds=KINDS, warmup=True, modules=PRELOAD_MODULES):
+    """
+    Mulai loader bersama (sekali per proses) dan kembalikan instance-nya.
+    """
+    global _loader
+    with _loader_lock:
+        if _loader is None:
+            _loader = ModelLoader(kinds=kinds, warmup=warmup, modules=modules).start()
+        return _loader
+
+
+def get_loader():
+    return _loader
+
+
+def load_model(kind):
+    """
+    Ambil model preload jika ada, jika tidak bangun langsung (di thread pemanggil).
+    """
+    loader = _loader
+    model = loader.take(kind) if loader is not None else None
+    return model if model is not None else build_model(kind)
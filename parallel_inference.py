@@ -0,0 +1,441 @@
+# parallel_inference.py
+#
+# Mode eksekusi paralel: FaceDetection dan Pose masing-masing berjalan di
+# proses worker sendiri. Frame diserahkan lewat slot shared memory (tanpa
+# pickling piksel); hanya (slot, frame_index) yang dikirim lewat queue.
+
+import multiprocessing
+import queue
+import time
+import warnings
+
+import numpy as np
+
+from frame_context import FrameContext
+from model_loader import build_model, warm_up
+
+try:
+    from multiprocessing import shared_memory
+    SHARED_MEMORY_AVAILABLE = True
+except ImportError:
+    SHARED_MEMORY_AVAILABLE = False
+
+
+class SharedFrameRing:
+    """
+    Fixed number of frame slots in one shared memory block.
+    The owner writes frames into free slots; workers attach by name and
+    read the slot as a NumPy view (no copy, no pickling).
+    """
+
+    def __init__(self, frame_shape, n_slots=4, dtype=np.uint8, name=None):
+        self.frame_shape = tuple(frame_shape)
+        self.n_slots = n_slots
+        self.dtype = np.dtype(dtype)
+        self.slot_nbytes = int(np.prod(self.frame_shape)) * self.dtype.itemsize
+        self._owner = name is None
+        if self._owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=self.slot_nbytes * n_slots)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.frames = np.ndarray((n_slots,) + self.frame_shape, dtype=self.dtype, buffer=self.shm.buf)
+        self._free = list(range(n_slots))
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def put(self, frame):
+        """
+        Copy `frame` into a free slot and return the slot index (None if full).
+        A smaller frame (e.g. downscaled for inference) fills the top-left
+        corner of the slot.
+        """
+        if not self._free:
+            return None
+        slot = self._free.pop(0)
+        h, w = frame.shape[:2]
+        self.frames[slot, :h, :w] = frame
+        return slot
+
+    def release(self, slot):
+        if slot not in self._free:
+            self._free.append(slot)
+
+    def close(self):
+        self.frames = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
+
+
+def _run_model(kind, model, frame_rgb):
+    """
+    Jalankan model dan kembalikan hasil ringkas yang murah di-pickle.
+    face: list (xmin, ymin, width, height) relatif semua wajah; pose: titik bahu ternormalisasi.
+    """
+    results = model.process(frame_rgb)
+    if kind == "face":
+        if not results.detections:
+            return None
+        face_boxes = []
+        for detection in results.detections:
+            bbox = detection.location_data.relative_bounding_box
+            face_boxes.append((bbox.xmin, bbox.ymin, bbox.width, bbox.height))
+        return face_boxes
+    if not results.pose_landmarks:
+        return None
+    landmarks = results.pose_landmarks.landmark
+    return ((landmarks[11].x, landmarks[11].y), (landmarks[12].x, landmarks[12].y))
+
+
+def _inference_worker(kind, shm_name, frame_shape, n_slots, task_queue, result_queue):
+    import cv2
+
+    ring = SharedFrameRing(frame_shape, n_slots=n_slots, name=shm_name)
+    try:
+        model = build_model(kind)
+        warm_up(model, frame_shape)
+        result_queue.put((kind, -1, None, "ready"))
+        while True:
+            task = task_queue.get()
+            if task is None:
+                break
+            slot, frame_index, h, w = task
+            frame_rgb = cv2.cvtColor(ring.frames[slot, :h, :w], cv2.COLOR_BGR2RGB)
+            try:
+                payload = _run_model(kind, model, frame_rgb)
+            except Exception as e:
+                result_queue.put((kind, frame_index, slot, f"error: {e}"))
+                continue
+            result_queue.put((kind, frame_index, slot, payload))
+    finally:
+        ring.close()
+
+
+# Interval pengecekan worker yang mati saat menunggu hasil (detik)
+WORKER_POLL_SEC = 0.2
+
+
+class WorkerDiedError(RuntimeError):
+    """
+    A worker process exited after startup; its pending results never arrive.
+    """
+
+
+class ParallelInference:
+    """
+    Runs face detection and pose estimation in two worker processes.
+    Frames go through SharedFrameRing slots; results come back per model
+    and are merged by frame index.
+    """
+
+    KINDS = ("face", "pose")
+
+    def __init__(self, frame_shape, n_slots=4, start_timeout=30.0):
+        if not SHARED_MEMORY_AVAILABLE:
+            raise RuntimeError("multiprocessing.shared_memory tidak tersedia")
+        self.frame_shape = tuple(frame_shape)
+        self.n_slots = n_slots
+        self.start_timeout = start_timeout
+
+        self._mp = multiprocessing.get_context("spawn")
+        self.ring = SharedFrameRing(self.frame_shape, n_slots=n_slots)
+        self._task_queues = {kind: self._mp.Queue() for kind in self.KINDS}
+        self._result_queue = self._mp.Queue()
+        self._workers = []
+        self._pending = {}   # frame_index -> {"slot": ..., "face": ..., "pose": ...}
+        self._done = {}
+        self.errors = 0
+
+    def start(self):
+        for kind in self.KINDS:
+            proc = self._mp.Process(
+                target=_inference_worker, name=f"inference-{kind}", daemon=True,
+                args=(kind, self.ring.name, self.frame_shape, self.n_slots,
+                      self._task_queues[kind], self._result_queue))
+            proc.start()
+            self._workers.append(proc)
+
+        # Tunggu kedua model selesai dibuat di proses worker
+        ready = set()
+        deadline = time.monotonic() + self.start_timeout
+        while ready != set(self.KINDS):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not all(p.is_alive() for p in self._workers):
+                self.close()
+                raise RuntimeError("Worker inferensi gagal dimulai")
+            try:
+                kind, _, _, payload = self._result_queue.get(timeout=min(remaining, 0.5))
+            except queue.Empty:
+                continue
+            if payload == "ready":
+                ready.add(kind)
+        return self
+
+    def submit(self, frame, frame_index):
+        """
+        Copy a BGR frame (at most frame_shape) into a free slot and dispatch
+        it to both workers. Returns False if all slots are still in use.
+        Raises WorkerDiedError if a worker process has died.
+        """
+        self._check_workers()
+        slot = self.ring.put(frame)
+        if slot is None:
+            return False
+        self._pending[frame_index] = {"slot": slot}
+        h, w = frame.shape[:2]
+        for kind in self.KINDS:
+            self._task_queues[kind].put((slot, frame_index, h, w))
+        return True
+
+    @property
+    def alive(self):
+        return bool(self._workers) and all(p.is_alive() for p in self._workers)
+
+    def _check_workers(self):
+        """
+        Jika ada worker yang mati: lepas semua slot yang menunggu hasilnya
+        (tidak akan pernah datang) dan raise WorkerDiedError.
+        """
+        dead = [p for p in self._workers if not p.is_alive()]
+        if not dead:
+            return
+        for entry in self._pending.values():
+            self.ring.release(entry["slot"])
+        self._pending.clear()
+        raise WorkerDiedError("Worker inferensi berhenti: " +
+                           ", ".join(f"{p.name} (exitcode {p.exitcode})" for p in dead))
+
+    def collect(self, timeout=None):
+        """
+        Receive worker results until at least one frame has both results
+        (or timeout). Returns {frame_index: (face_boxes, shoulders)}.
+        Raises WorkerDiedError if a worker process has died.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._done:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            try:
+                # Tunggu bertahap agar worker yang mati terdeteksi tanpa menunggu timeout penuh
+                wait = WORKER_POLL_SEC if remaining is None else min(remaining, WORKER_POLL_SEC)
+                kind, frame_index, slot, payload = self._result_queue.get(timeout=wait)
+            except queue.Empty:
+                self._check_workers()
+                continue
+            entry = self._pending.get(frame_index)
+            if entry is None:
+                continue
+            if isinstance(payload, str):
+                self.errors += 1
+                payload = None
+            entry[kind] = payload
+            if all(k in entry for k in self.KINDS):
+                del self._pending[frame_index]
+                self.ring.release(entry["slot"])
+                self._done[frame_index] = (entry["face"], entry["pose"])
+
+        done, self._done = self._done, {}
+        return done
+
+    def close(self):
+        for kind in self.KINDS:
+            try:
+                self._task_queues[kind].put(None)
+            except Exception:
+                pass
+        for proc in self._workers:
+            proc.join(timeout=2.0)
+            if proc.is_alive():
+                proc.terminate()
+        self._workers = []
+        self.ring.close()
+
+
+class InferenceScaleController:
+    """
+    Picks the inference scale from the measured per-frame time. When the
+    smoothed frame time exceeds `budget_sec` the scale drops one level. It
+    goes back up one level after `recover_frames` consecutive frames whose
+    time, extrapolated to the larger level by pixel count, stays below
+    `headroom * budget_sec` (this stops flip-flopping between two levels).
+    Discrete levels keep the resized-frame cache and the model input size
+    stable.
+    """
+
+    LEVELS = (1.0, 0.75, 0.5, 0.375, 0.25)
+
+    def __init__(self, budget_sec=1 / 30, levels=LEVELS, initial=1.0, smoothing=0.2, headroom=0.9,
+                 recover_frames=60, cooldown_frames=15):
+        self.budget_sec = budget_sec
+        self.levels = tuple(sorted(levels, reverse=True))
+        self.smoothing = smoothing
+        self.headroom = headroom
+        self.recover_frames = recover_frames
+        self.cooldown_frames = cooldown_frames
+        self.level = min(range(len(self.levels)), key=lambda i: abs(self.levels[i] - initial))
+        self.changes = 0
+        self.avg_sec = None
+        self._fast_frames = 0
+        self._cooldown = 0
+
+    @property
+    def scale(self):
+        return self.levels[self.level]
+
+    def _set_level(self, level):
+        self.level = level
+        self.changes += 1
+        # EMA diulang dari awal agar keputusan berikut memakai waktu di skala baru
+        self.avg_sec = None
+        self._fast_frames = 0
+        self._cooldown = self.cooldown_frames
+
+    def update(self, frame_sec):
+        """
+        Catat waktu satu frame (detik) dan kembalikan skala untuk frame berikutnya.
+        """
+        if self.avg_sec is None:
+            self.avg_sec = frame_sec
+        else:
+            self.avg_sec += self.smoothing * (frame_sec - self.avg_sec)
+        if self._cooldown > 0:
+            self._cooldown -= 1
+            return self.scale
+
+        if self.avg_sec > self.budget_sec and self.level < len(self.levels) - 1:
+            self._set_level(self.level + 1)
+        elif (self.level > 0 and
+              self.avg_sec * (self.levels[self.level - 1] / self.scale) ** 2 < self.headroom * self.budget_sec):
+            self._fast_frames += 1
+            if self._fast_frames >= self.recover_frames:
+                self._set_level(self.level - 1)
+        else:
+            self._fast_frames = 0
+        return self.scale
+
+
+class InferenceRunner:
+    """
+    Runs both processors on a frame, either in-process (current path) or
+    with the models in parallel worker processes.
+
+    mode: "inprocess", "process", or "auto" (process when possible, else
+    fall back to in-process with a warning).
+    inference_scale: models see the frame downscaled by this factor; ROI
+    colour means are still taken from the full-resolution frame.
+    scale_controller: optional InferenceScaleController that adapts the
+    scale to the per-frame time budget.
+    scheduler: optional FrameScheduler; on the in-process path it decides
+    per frame which stages run (pose/rates are shed when behind schedule).
+    """
+
+    def __init__(self, rppg_proc, resp_proc, mode="auto", n_slots=4, timeout=2.0, recorder=None,
+                 inference_scale=None, scale_controller=None, scheduler=None):
+        self.rppg_proc = rppg_proc
+        self.resp_proc = resp_proc
+        self.scale_controller = scale_controller
+        self.scheduler = scheduler
+        if inference_scale is None:
+            inference_scale = scale_controller.scale if scale_controller else getattr(rppg_proc, "inference_scale", 1.0)
+        self.set_inference_scale(inference_scale)
+        # Opsional: TraceRecorder yang mencatat hasil upstream tiap frame
+        self.recorder = recorder
+        self.requested_mode = mode
+        self.mode = "inprocess" if mode == "inprocess" else None
+        self.n_slots = n_slots
+        self.timeout = timeout
+        self.parallel = None
+        self.timeouts = 0
+        # False jika Pose dilepas scheduler pada frame terakhir
+        self.pose_ran = True
+
+    def set_inference_scale(self, scale):
+        self.inference_scale = scale
+        for proc in (self.rppg_proc, self.resp_proc):
+            if proc is not None:
+                proc.inference_scale = scale
+
+    def _ensure_parallel(self, frame_shape):
+        if self.parallel is not None and self.parallel.frame_shape == tuple(frame_shape):
+            return True
+        if self.parallel is not None:
+            self.parallel.close()
+            self.parallel = None
+        try:
+            self.parallel = ParallelInference(frame_shape, n_slots=self.n_slots).start()
+            self.mode = "process"
+            return True
+        except Exception as e:
+            if self.requested_mode == "process":
+                raise
+            warnings.warn(f"Inferensi paralel tidak tersedia, kembali ke in-process: {e}")
+            self.mode = "inprocess"
+            return False
+
+    def process(self, frame):
+        """
+        Process one frame (BGR array or FrameContext) with both processors.
+        """
+        ctx = FrameContext.wrap(frame)
+        t0 = time.perf_counter()
+        self._process(ctx)
+        if self.scale_controller is not None:
+            scale = self.scale_controller.update(time.perf_counter() - t0)
+            if scale != self.inference_scale:
+                self.set_inference_scale(scale)
+        if self.recorder is not None:
+            self.recorder.record_frame(ctx, self.rppg_proc, self.resp_proc, pose_ran=self.pose_ran)
+
+    def _process(self, ctx):
+        self.pose_ran = True
+        # Slot shared memory seukuran frame penuh; frame yang diperkecil mengisi sebagian slot
+        if self.mode != "inprocess" and self._ensure_parallel(ctx.shape):
+            try:
+                if self._process_parallel(ctx):
+                    return
+            except WorkerDiedError as e:
+                # Worker mati: sisa sesi berjalan in-process (satu peringatan saja)
+                warnings.warn(f"{e}; kembali ke in-process")
+                self.parallel.close()
+                self.parallel = None
+                self.mode = "inprocess"
+            # Slot penuh atau hasil terlambat: proses frame ini di jalur lama
+        if self.scheduler is not None:
+            self.scheduler.process(ctx)
+            self.pose_ran = self.scheduler.pose_ran
+            return
+        if self.rppg_proc:
+            self.rppg_proc.extract_rgb_from_frame(ctx)
+        if self.resp_proc:
+            self.resp_proc.extract_resp_from_frame(ctx)
+
+    def _process_parallel(self, ctx):
+        """
+        True jika hasil worker untuk frame ini sudah diterapkan.
+        """
+        index = ctx.index if ctx.index is not None else id(ctx)
+        if not self.parallel.submit(ctx.for_inference(self.inference_scale).bgr, index):
+            return False
+        deadline = time.monotonic() + self.timeout
+        while True:
+            results = self.parallel.collect(timeout=max(0.0, deadline - time.monotonic()))
+            if index in results:
+                face_boxes, shoulders = results[index]
+                if self.rppg_proc:
+                    self.rppg_proc.process_face_boxes(ctx, face_boxes)
+                if self.resp_proc:
+                    self.resp_proc.process_shoulders(ctx, shoulders)
+                return True
+            # Hasil frame lama yang terlambat diabaikan
+            if not results or time.monotonic() >= deadline:
+                break
+        self.timeouts += 1
+        return False
+
+    def close(self):
+        if self.parallel is not None:
+            self.parallel.close()
+            self.parallel = None
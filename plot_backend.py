@@ -0,0 +1,149 @@
+# plot_backend.py
+
+import time
+
+import numpy as np
+
+
+class BlitPlot:
+    """
+    Scrolling line plot on one matplotlib Axes, redrawn by blitting.
+
+    Every line owns a preallocated y buffer of `n_points` samples
+    (right-aligned, NaN where there is no data yet) against a fixed x axis,
+    so an update is a single in-place copy. render() restores the cached
+    background and redraws only the animated artists; a full figure draw
+    happens only when the y-limits must change or the canvas was redrawn
+    (e.g. resized). Redraws are throttled to `max_fps`, independent of how
+    often new data arrives.
+    """
+
+    def __init__(self, ax, n_points=250, max_fps=20.0, autoscale=True, margin=0.15, shrink_ratio=0.25):
+        self.ax = ax
+        self.n_points = n_points
+        self.autoscale = autoscale
+        self.margin = margin
+        self.shrink_ratio = shrink_ratio
+        self.max_fps = max_fps
+        self.x = np.arange(n_points)
+        self.renders = 0
+        self.full_draws = 0
+
+        self._lines = []
+        self._buffers = []
+        self._artists = []
+        self._canvas = None
+        self._cid = None
+        self._background = None
+        self._dirty = True
+        self._last_render = 0.0
+
+    @property
+    def max_fps(self):
+        return self._max_fps
+
+    @max_fps.setter
+    def max_fps(self, value):
+        self._max_fps = value
+        self._min_interval = 1.0 / value if value else 0.0
+
+    def add_line(self, *args, **kwargs):
+        """
+        Tambah garis dengan buffer sendiri; kembalikan indeks untuk set_line().
+        """
+        y = np.full(self.n_points, np.nan)
+        line, = self.ax.plot(self.x, y, *args, animated=True, **kwargs)
+        self.ax.set_xlim(0, self.n_points - 1)
+        self._lines.append(line)
+        self._buffers.append(y)
+        return len(self._lines) - 1
+
+    def add_artist(self, artist):
+        """
+        Artist lain (marker, gambar) yang ikut digambar ulang tiap render.
+        """
+        artist.set_animated(True)
+        self._artists.append(artist)
+        return artist
+
+    def set_line(self, index, data):
+        buf = self._buffers[index]
+        data = np.asarray(data, dtype=float).reshape(-1)[-self.n_points:]
+        n = len(data)
+        buf[:self.n_points - n] = np.nan
+        buf[self.n_points - n:] = data
+        self._lines[index].set_ydata(buf)
+        self._dirty = True
+
+    def mark_dirty(self):
+        self._dirty = True
+
+    def clear(self):
+        for index in range(len(self._lines)):
+            self.set_line(index, ())
+
+    def _bind(self):
+        # Canvas bisa berganti (mis. FigureCanvasTkAgg dibuat setelah Figure)
+        canvas = self.ax.figure.canvas
+        if canvas is self._canvas:
+            return canvas
+        if self._canvas is not None and self._cid is not None:
+            self._canvas.mpl_disconnect(self._cid)
+        self._canvas = canvas
+        self._cid = canvas.mpl_connect("draw_event", self._on_draw)
+        self._background = None
+        return canvas
+
+    def _on_draw(self, event):
+        self._background = self._canvas.copy_from_bbox(self.ax.bbox)
+        self._draw_artists()
+
+    def _draw_artists(self):
+        for artist in self._lines + self._artists:
+            self.ax.draw_artist(artist)
+
+    def _update_ylim(self):
+        """
+        Ubah batas Y hanya jika data keluar batas atau jauh lebih sempit
+        (histeresis), supaya full redraw jarang terjadi.
+        """
+        if not self.autoscale:
+            return False
+        lo, hi = np.inf, -np.inf
+        for buf in self._buffers:
+            finite = buf[np.isfinite(buf)]
+            if finite.size:
+                lo = min(lo, finite.min())
+                hi = max(hi, finite.max())
+        if not np.isfinite(lo):
+            return False
+        cur_lo, cur_hi = self.ax.get_ylim()
+        span = hi - lo if hi > lo else max(abs(hi), 1.0)
+        if lo < cur_lo or hi > cur_hi or span < self.shrink_ratio * (cur_hi - cur_lo):
+            pad = self.margin * span
+            self.ax.set_ylim(lo - pad, hi + pad)
+            return True
+        return False
+
+    def render(self, force=False, now=None):
+        """
+        Gambar jika ada data baru dan interval throttle sudah lewat.
+        Returns True if something was drawn.
+        """
+        now = time.monotonic() if now is None else now
+        if not force and (not self._dirty or now - self._last_render < self._min_interval):
+            return False
+        canvas = self._bind()
+        limits_changed = self._update_ylim()
+        if limits_changed or self._background is None or not getattr(canvas, "supports_blit", True):
+            # draw_event menyimpan background baru dan menggambar artist animasi
+            canvas.draw()
+            self.full_draws += 1
+        else:
+            canvas.restore_region(self._background)
+            self._draw_artists()
+            canvas.blit(self.ax.bbox)
+        self._last_render = now
+        self._dirty = False
+        self.renders += 1
+        return True
@@ -0,0 +1,365 @@
+# qt_app.py
+#
+# Frontend alternatif berbasis PyQt6 + pyqtgraph. Capture dan pemrosesan
+# berjalan di QThread; thread UI hanya menampilkan hasil terbaru: frame
+# dibungkus QImage langsung dari buffer NumPy (tanpa salinan) dan sinyal
+# digambar dengan PlotDataItem pyqtgraph.
+#   python qt_app.py --camera 0
+#   python landing_page.py --frontend qt
+
+import argparse
+import sys
+import threading
+
+import cv2
+import numpy as np
+from PyQt6 import QtCore, QtGui, QtWidgets
+import pyqtgraph as pg
+
+from camera_discovery import CameraDiscovery, open_camera
+from capture import LatestFrameCapture, RateMeter
+from latency import LatencyMonitor
+import model_loader
+from parallel_inference import InferenceRunner
+from frame_scheduler import FrameScheduler
+from rppg_processor import RPPGProcessor
+from respirasi_processor import RespirasiProcessor
+
+PLOT_POINTS = 250
+
+
+def draw_overlay(frame_rgb, forehead_rect, shoulders):
+    if forehead_rect:
+        cv2.rectangle(frame_rgb, forehead_rect[:2], forehead_rect[2:], (0, 255, 0), 2)
+    if shoulders:
+        for point in shoulders:
+            if point != (0, 0):
+                cv2.circle(frame_rgb, point, 5, (0, 255, 0), -1)
+    return frame_rgb
+
+
+class PipelineWorker(QtCore.QThread):
+    """
+    Capture + processing thread. Only the newest result is kept; the UI
+    takes it with take_result() on its own refresh timer (plot_fps), so a
+    slow UI never builds up a queue of stale frames.
+    """
+
+    failed = QtCore.pyqtSignal(str)
+
+    def __init__(self, source, runner, latency=None, parent=None):
+        super().__init__(parent)
+        self.source = source
+        self.runner = runner
+        self.latency = latency
+        self.meter = RateMeter()
+        self.capture = None
+        self._lock = threading.Lock()
+        self._result = None
+
+    def run(self):
+        cap = open_camera(self.source) if isinstance(self.source, int) else cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            self.failed.emit(f"Tidak bisa buka kamera {self.source}.")
+            return
+        self.capture = LatestFrameCapture(cap, latency=self.latency).start()
+        try:
+            while not self.isInterruptionRequested():
+                ctx = self.capture.read(timeout=0.2)
+                if ctx is None:
+                    if not self.capture.running:
+                        break
+                    continue
+                try:
+                    result = self._process(ctx)
+                except Exception as e:
+                    self.failed.emit(f"Error pemrosesan: {e}")
+                    continue
+                self.meter.tick()
+                with self._lock:
+                    self._result = result
+        finally:
+            self.capture.close()
+
+    def _process(self, ctx):
+        self.runner.process(ctx)
+        rppg, resp = self.runner.rppg_proc, self.runner.resp_proc
+        # Salinan kecil (aman dibaca thread UI); frame tampilan adalah buffer baru
+        frame_rgb = draw_overlay(ctx.rgb.copy(), rppg.get_forehead_rect(), resp.get_last_shoulder_points())
+        if self.latency is not None:
+            self.latency.frame_done(ctx.index)
+        return {
+            "frame_rgb": frame_rgb,
+            "hr": rppg.get_heart_rate(),
+            "rr": resp.get_respiration_rate(),
+            "rppg": np.array(rppg.get_filtered_rppg()[-PLOT_POINTS:], dtype=float),
+            "resp": np.array(resp.get_filtered_resp()[-PLOT_POINTS:], dtype=float),
+        }
+
+    def take_result(self):
+        with self._lock:
+            result, self._result = self._result, None
+        return result
+
+    @property
+    def dropped(self):
+        return self.capture.dropped if self.capture else 0
+
+    @property
+    def capture_rate(self):
+        return self.capture.rate if self.capture else 0.0
+
+
+class VideoWidget(QtWidgets.QWidget):
+    """
+    Shows an RGB NumPy frame through a QImage that wraps the array's
+    buffer (no copy); scaling happens in the paint call.
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._frame = None
+        self._image = None
+        self.setMinimumSize(320, 240)
+        self.setSizePolicy(QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Expanding)
+
+    def set_frame(self, frame_rgb):
+        frame_rgb = np.ascontiguousarray(frame_rgb)
+        h, w = frame_rgb.shape[:2]
+        # Referensi array disimpan selama QImage dipakai
+        self._frame = frame_rgb
+        self._image = QtGui.QImage(frame_rgb.data, w, h, frame_rgb.strides[0], QtGui.QImage.Format.Format_RGB888)
+        self.update()
+
+    def clear(self):
+        self._frame = self._image = None
+        self.update()
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtCore.Qt.GlobalColor.black)
+        if self._image is not None:
+            size = self._image.size().scaled(self.size(), QtCore.Qt.AspectRatioMode.KeepAspectRatio)
+            x = (self.width() - size.width()) // 2
+            y = (self.height() - size.height()) // 2
+            painter.drawImage(QtCore.QRect(x, y, size.width(), size.height()), self._image)
+        painter.end()
+
+
+class MonitorWindow(QtWidgets.QMainWindow):
+    def __init__(self, camera_index=None, inference_mode="inprocess", plot_fps=30, latency_enabled=False,
+                 camera_provider=None, frame_budget_ms=None):
+        super().__init__()
+        self.setWindowTitle("VitalCam - Real-Time Monitoring (Qt)")
+        self.resize(1200, 750)
+
+        self.latency = LatencyMonitor(enabled=latency_enabled)
+        self.rppg_proc = RPPGProcessor(fps=30, latency=self.latency)
+        self.resp_proc = RespirasiProcessor(fps=30, latency=self.latency)
+        scheduler = None
+        if frame_budget_ms and inference_mode == "inprocess":
+            scheduler = FrameScheduler(self.rppg_proc, self.resp_proc, budget_sec=frame_budget_ms / 1000.0)
+        self.runner = InferenceRunner(self.rppg_proc, self.resp_proc, mode=inference_mode, scheduler=scheduler)
+        if inference_mode == "inprocess":
+            model_loader.preload()
+        self.worker = None
+        # Worker yang belum berhenti saat stop_feed (masih di runner.process)
+        self._stopping_worker = None
+        self.display_meter = RateMeter()
+        self._x = np.arange(PLOT_POINTS, dtype=float)
+
+        self._build_ui()
+        # Hanya daftar perangkat: probe mode (buka + ganti resolusi) bisa bentrok dengan open_camera
+        self.camera_discovery = CameraDiscovery(provider=camera_provider, probe_capabilities=False)
+        self.discovery_timer = QtCore.QTimer(self)
+        self.discovery_timer.setInterval(100)
+        self.discovery_timer.timeout.connect(self._poll_camera_discovery)
+        if camera_index is not None:
+            self._fill_cameras([{"id": camera_index, "name": f"Kamera {camera_index}"}])
+        else:
+            self.detect_available_cameras()
+
+        # Refresh UI pada plot_fps, terpisah dari laju pemrosesan
+        self.refresh_timer = QtCore.QTimer(self)
+        self.refresh_timer.setInterval(int(1000 / plot_fps))
+        self.refresh_timer.timeout.connect(self._refresh)
+
+    def _build_ui(self):
+        pg.setConfigOptions(antialias=False, background="w", foreground="k")
+        central = QtWidgets.QWidget()
+        self.setCentralWidget(central)
+        root = QtWidgets.QVBoxLayout(central)
+
+        controls = QtWidgets.QHBoxLayout()
+        self.camera_combobox = QtWidgets.QComboBox()
+        self.btn_start = QtWidgets.QPushButton("Mulai Kamera")
+        self.btn_stop = QtWidgets.QPushButton("Stop Kamera")
+        self.btn_stop.setEnabled(False)
+        self.btn_start.clicked.connect(self.start_feed)
+        self.btn_stop.clicked.connect(self.stop_feed)
+        self.lbl_rates = QtWidgets.QLabel("")
+        self.lbl_rates.setStyleSheet("color: gray;")
+        controls.addWidget(QtWidgets.QLabel("Kamera:"))
+        controls.addWidget(self.camera_combobox)
+        controls.addWidget(self.btn_start)
+        controls.addWidget(self.btn_stop)
+        controls.addStretch(1)
+        controls.addWidget(self.lbl_rates)
+        root.addLayout(controls)
+
+        content = QtWidgets.QGridLayout()
+        root.addLayout(content, 1)
+
+        self.plot_rppg = pg.PlotWidget(title="Sinyal rPPG")
+        self.plot_resp = pg.PlotWidget(title="Sinyal Respirasi")
+        for plot in (self.plot_rppg, self.plot_resp):
+            plot.setXRange(0, PLOT_POINTS - 1, padding=0)
+            plot.setMouseEnabled(x=False, y=False)
+            plot.getPlotItem().hideButtons()
+        self.curve_rppg = self.plot_rppg.plot(pen=pg.mkPen("r", width=1.5))
+        self.curve_resp = self.plot_resp.plot(pen=pg.mkPen("g", width=1.5))
+        content.addWidget(self.plot_rppg, 0, 0)
+        content.addWidget(self.plot_resp, 1, 0)
+
+        self.video = VideoWidget()
+        content.addWidget(self.video, 0, 1)
+
+        readouts = QtWidgets.QHBoxLayout()
+        self.lbl_rr_value = self._readout(readouts, "RR", "rpm", "green")
+        self.lbl_hr_value = self._readout(readouts, "rPPG", "bpm", "red")
+        content.addLayout(readouts, 1, 1)
+        content.setColumnStretch(0, 1)
+        content.setColumnStretch(1, 1)
+
+    def _readout(self, layout, title, unit, color):
+        box = QtWidgets.QVBoxLayout()
+        for text, size in ((title, 12), ("--", 36), (unit, 10)):
+            label = QtWidgets.QLabel(text)
+            label.setAlignment(QtCore.Qt.AlignmentFlag.AlignCenter)
+            label.setStyleSheet(f"color: {color}; font-size: {size}pt; font-weight: bold;")
+            box.addWidget(label)
+            if text == "--":
+                value = label
+        layout.addLayout(box)
+        return value
+
+    def detect_available_cameras(self):
+        # Enumerasi di thread latar; combobox diisi saat hasil siap
+        self.camera_combobox.clear()
+        self.camera_combobox.addItem("Mencari kamera...")
+        self.btn_start.setEnabled(False)
+        self.camera_discovery.start()
+        self.discovery_timer.start()
+
+    def _poll_camera_discovery(self):
+        if not self.camera_discovery.done:
+            return
+        self.discovery_timer.stop()
+        if self.camera_discovery.error:
+            self.lbl_rates.setText(f"Error enumerasi kamera: {self.camera_discovery.error}")
+        self._fill_cameras(self.camera_discovery.devices)
+
+    def _fill_cameras(self, cameras):
+        self.camera_combobox.clear()
+        for camera in cameras:
+            self.camera_combobox.addItem(camera["name"], camera["id"])
+        self.btn_start.setEnabled(bool(cameras))
+
+    # ===== Kontrol =====
+
+    def start_feed(self):
+        if self.worker is not None or self._stopping_worker is not None:
+            return
+        source = self.camera_combobox.currentData()
+        if source is None:
+            QtWidgets.QMessageBox.information(self, "Info Kamera", "Tidak ada kamera terdeteksi.")
+            return
+        self.worker = PipelineWorker(source, self.runner, latency=self.latency, parent=self)
+        self.worker.failed.connect(self._on_worker_failed)
+        self.worker.finished.connect(self._on_worker_finished)
+        self.worker.start()
+        self.display_meter = RateMeter()
+        self.btn_start.setEnabled(False)
+        self.btn_stop.setEnabled(True)
+        self.camera_combobox.setEnabled(False)
+        self.refresh_timer.start()
+
+    def stop_feed(self):
+        self.refresh_timer.stop()
+        worker, self.worker = self.worker, None
+        if worker is not None:
+            worker.requestInterruption()
+            if not worker.wait(3000):
+                # Processor tidak boleh dipakai dua thread: Start ditahan sampai worker lama selesai
+                self._stopping_worker = worker
+                worker.finished.connect(self._on_stopping_worker_finished)
+                if worker.isFinished():
+                    self._on_stopping_worker_finished()
+        self.btn_start.setEnabled(self.camera_combobox.count() > 0 and self._stopping_worker is None)
+        self.btn_stop.setEnabled(False)
+        self.camera_combobox.setEnabled(True)
+        self.curve_rppg.setData([], [])
+        self.curve_resp.setData([], [])
+        self.video.clear()
+        self.lbl_hr_value.setText("--")
+        self.lbl_rr_value.setText("--")
+        self.lbl_rates.setText("")
+
+    def _on_worker_failed(self, message):
+        self.lbl_rates.setText(message)
+        if self.worker is not None and not self.worker.capture:
+            QtWidgets.QMessageBox.critical(self, "Error Kamera", message)
+
+    def _on_worker_finished(self):
+        if self.worker is not None:
+            self.stop_feed()
+
+    def _on_stopping_worker_finished(self):
+        self._stopping_worker = None
+        if self.worker is None:
+            self.btn_start.setEnabled(self.camera_combobox.count() > 0)
+
+    def _refresh(self):
+        if self.worker is None:
+            return
+        result = self.worker.take_result()
+        if result is None:
+            return
+        self.display_meter.tick()
+        self.video.set_frame(result["frame_rgb"])
+        for curve, data in ((self.curve_rppg, result["rppg"]), (self.curve_resp, result["resp"])):
+            # Data rata kanan pada sumbu x tetap
+            n = len(data)
+            curve.setData(self._x[PLOT_POINTS - n:], data, skipFiniteCheck=True)
+        hr, rr = result["hr"], result["rr"]
+        self.lbl_hr_value.setText(f"{hr:.0f}" if hr else "--")
+        self.lbl_rr_value.setText(f"{rr:.0f}" if rr else "--")
+        self.lbl_rates.setText(f"Capture {self.worker.capture_rate:.1f} fps | Proses {self.worker.meter.rate:.1f} fps | "
+                               f"Tampil {self.display_meter.rate:.1f} fps | Drop {self.worker.dropped}")
+
+    def closeEvent(self, event):
+        self.stop_feed()
+        if self._stopping_worker is not None:
+            self._stopping_worker.wait()
+        self.runner.close()
+        self.latency.close()
+        super().closeEvent(event)
+
+
+def run_app(argv=None):
+    parser = argparse.ArgumentParser(description="VitalCam - frontend PyQt6/pyqtgraph")
+    parser.add_argument("--camera", type=int, default=None, help="indeks kamera (default: deteksi otomatis)")
+    parser.add_argument("--inference", choices=["inprocess", "process", "auto"], default="inprocess")
+    parser.add_argument("--plot-fps", type=int, default=30)
+    parser.add_argument("--latency", action="store_true")
+    args = parser.parse_args(argv)
+
+    app = QtWidgets.QApplication.instance() or QtWidgets.QApplication(sys.argv[:1])
+    window = MonitorWindow(camera_index=args.camera, inference_mode=args.inference,
+                           plot_fps=args.plot_fps, latency_enabled=args.latency)
+    window.show()
+    return app.exec()
+
+
+if __name__ == "__main__":
+    sys.exit(run_app())
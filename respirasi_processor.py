@@ -1,40 +1,103 @@
 # respirasi_processor.py
 
-import cv2
 import numpy as np
-import mediapipe as mp
 from collections import deque
-from signal_utils import bandpass_filter_respirasi, calculate_respiration_rate
+from signal_utils import calculate_respiration_rate, StreamingBandpass, SpectralRateEstimator, UniformResampler
+from ring_buffer import RingBuffer
+from frame_context import FrameContext
+from latency import NULL_MONITOR
+from model_loader import load_model
 
 
 class RespirasiProcessor:
-    def __init__(self, max_len=100, smoothing_window=5, fps=30):
-        self.pose = mp.solutions.pose.Pose(static_image_mode=False)
+    def __init__(self, max_len=100, smoothing_window=5, fps=30, buffer_sec=60, refine_display_sec=None,
+                 rr_method="peaks", rr_window_sec=30, rate_update_hz=1.0, latency=None,
+                 rr_band=(0.2, 0.33), rr_filter_order=3, rr_prominence=0.1, inference_scale=1.0,
+                 max_gap_sec=1.0, rate_every=1):
+        # Model dibuat saat pertama dipakai (replay trace tidak membutuhkannya)
+        self._pose = None
+        # Pose berjalan di frame yang diperkecil (landmark ternormalisasi)
+        self.inference_scale = inference_scale
         self.prev_shoulder_y = None
-        self.shoulder_motion_signal = []
+        self._prev_shoulder_time = None
+        # Histori sinyal dibatasi buffer_sec detik (memori konstan).
+        # shoulder_motion_signal berada di grid seragam fps (hasil resampling
+        # bila frame membawa timestamp); shoulder_time = timestamp capture per frame
+        self.shoulder_motion_signal = RingBuffer(buffer_sec, fps=fps)
+        self.shoulder_time = RingBuffer(buffer_sec, fps=fps)
+        self.resampler = UniformResampler(fs=fps, max_gap_sec=max_gap_sec)
         self.filtered_signal = []
+        # Filter kausal: hanya sampel baru yang difilter tiap frame
+        self.rr_band = tuple(rr_band)
+        self.rr_filter_order = rr_filter_order
+        self.resp_filter = StreamingBandpass(fs=fps, low=rr_band[0], high=rr_band[1], order=rr_filter_order,
+                                             capacity_sec=buffer_sec)
+        self.refine_display_sec = refine_display_sec
+        # Estimasi RR: "peaks" (hitung puncak) atau "spectral" (Welch, diperbarui rate_update_hz)
+        self.rr_method = rr_method
+        self.rr_prominence = rr_prominence
+        self.rr_estimator = SpectralRateEstimator(fs=fps, low=rr_band[0], high=rr_band[1],
+                                                  window_sec=rr_window_sec, update_hz=rate_update_hz)
         self.respiration_rate = 0
-        self.shoulder_points = []
+        # Estimasi RR hanya tiap rate_every sampel seragam (lihat FrameScheduler)
+        self.rate_every = rate_every
+        self._rate_pending = 0
+        self.shoulder_points = RingBuffer(buffer_sec, fps=fps, shape=(2, 2), dtype=np.int32)
         self.smoothed_signal = deque(maxlen=smoothing_window)
         self.fps = fps
+        # Hook timing per stage (LatencyMonitor); nonaktif = hampir tanpa biaya
+        self.latency = latency or NULL_MONITOR
 
-    def extract_resp_from_frame(self, frame):
-        h, w, _ = frame.shape
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.pose.process(frame_rgb)
+    @property
+    def pose(self):
+        if self._pose is None:
+            self._pose = load_model("pose")
+        return self._pose
 
+    def extract_resp_from_frame(self, frame):
+        """
+        frame: BGR array atau FrameContext (konversi warna dipakai bersama).
+        """
+        ctx = FrameContext.wrap(frame)
+        with self.latency.stage("pose"):
+            results = self.pose.process(ctx.for_inference(self.inference_scale).rgb)
+
+        shoulders = None
         if results.pose_landmarks:
             landmarks = results.pose_landmarks.landmark
 
             # Ambil titik bahu kiri (id 11) dan kanan (id 12)
             left_shoulder = landmarks[11]
             right_shoulder = landmarks[12]
+            shoulders = ((left_shoulder.x, left_shoulder.y), (right_shoulder.x, right_shoulder.y))
+
+        self.process_shoulders(ctx, shoulders)
+
+    def process_shoulders(self, frame, shoulders):
+        """
+        Perbarui sinyal dari titik bahu yang sudah dihitung (mis. proses worker).
+        shoulders: ((left_x, left_y), (right_x, right_y)) ternormalisasi, atau None.
+        """
+        ctx = FrameContext.wrap(frame)
+        h, w, _ = ctx.shape
+
+        points = None
+        if shoulders is not None:
+            (left_nx, left_ny), (right_nx, right_ny) = shoulders
 
             # Konversi koordinat normalisasi ke piksel
-            left_x = int(left_shoulder.x * w)
-            left_y = int(left_shoulder.y * h)
-            right_x = int(right_shoulder.x * w)
-            right_y = int(right_shoulder.y * h)
+            points = ((int(left_nx * w), int(left_ny * h)), (int(right_nx * w), int(right_ny * h)))
+        self.process_shoulder_pixels(points, timestamp=ctx.timestamp)
+
+    def process_shoulder_pixels(self, points, timestamp=None):
+        """
+        Perbarui sinyal dari titik bahu dalam piksel (mis. replay trace).
+        points: ((left_x, left_y), (right_x, right_y)), atau None.
+        timestamp: waktu capture (detik); None = satu frame dianggap satu langkah grid.
+        """
+        value = 0
+        if points is not None:
+            (left_x, left_y), (right_x, right_y) = points
 
             # Simpan titik bahu
             self.shoulder_points.append(((left_x, left_y), (right_x, right_y)))
@@ -44,27 +107,55 @@ class RespirasiProcessor:
                 dy_left = self.prev_shoulder_y[0] - left_y
                 dy_right = self.prev_shoulder_y[1] - right_y
                 motion = (dy_left + dy_right) / 2
+                # Normalisasi ke perpindahan per langkah grid (1/fps), agar
+                # interval frame yang tidak rata tidak mengubah amplitudo
+                if timestamp is not None and self._prev_shoulder_time is not None:
+                    steps = (timestamp - self._prev_shoulder_time) * self.fps
+                    if steps > 0:
+                        motion /= steps
                 self.smoothed_signal.append(motion)
-                smoothed_value = np.mean(self.smoothed_signal)
-                self.shoulder_motion_signal.append(smoothed_value)
-            else:
-                self.shoulder_motion_signal.append(0)
+                value = np.mean(self.smoothed_signal)
 
             self.prev_shoulder_y = (left_y, right_y)
+            self._prev_shoulder_time = timestamp
         else:
-            self.shoulder_motion_signal.append(0)
             self.shoulder_points.append(((0, 0), (0, 0)))
 
+        self.shoulder_time.append(np.nan if timestamp is None else timestamp)
+        if timestamp is None:
+            samples = (value,)
+        else:
+            with self.latency.stage("resample"):
+                samples = self.resampler.push(timestamp, value)
+            if len(samples) == 0:
+                return
+        self.shoulder_motion_signal.extend(samples)
+
         # Filter sinyal respirasi dan hitung RR (napas per menit)
-        if len(self.shoulder_motion_signal) >= 30:
-            self.filtered_signal = bandpass_filter_respirasi(
-                self.shoulder_motion_signal, fs=self.fps)
-            self.respiration_rate, _ = calculate_respiration_rate(
-                self.filtered_signal, fs=self.fps)
+        with self.latency.stage("resp_filter"):
+            self.resp_filter.process(np.asarray(samples, dtype=float))
+        if len(self.resp_filter) >= 30:
+            self.filtered_signal = self.resp_filter.get_output()
+            self._rate_pending += len(samples)
+            if self._rate_pending >= self.rate_every:
+                # Semua sampel sejak estimasi terakhir, agar throttle estimator tetap per sampel
+                n_new, self._rate_pending = self._rate_pending, 0
+                self._update_respiration_rate(n_new)
         else:
-            self.filtered_signal = self.shoulder_motion_signal
+            self.filtered_signal = self.shoulder_motion_signal.latest()
             self.respiration_rate = 0
 
+    def set_rate_every(self, n):
+        self.rate_every = max(1, int(n))
+
+    def _update_respiration_rate(self, n_new):
+        with self.latency.stage("rr_rate"):
+            if self.rr_method == "spectral":
+                self.respiration_rate = self.rr_estimator.update(self.filtered_signal, n_new)
+            else:
+                self.respiration_rate, _ = calculate_respiration_rate(
+                    self.filtered_signal, fs=self.fps, prominence=self.rr_prominence)
+
     def apply_smoothing(self, signal, window_size=5):
         if len(signal) < window_size:
             return signal
@@ -75,13 +166,24 @@ class RespirasiProcessor:
     # === Getter ===
 
     def get_signal(self):
-        return self.shoulder_motion_signal
+        return self.shoulder_motion_signal.latest()
 
     def get_filtered_resp(self):
+        if self.refine_display_sec and len(self.resp_filter) >= 30:
+            return self.resp_filter.refine(self.refine_display_sec)
         return self.filtered_signal
 
     def get_respiration_rate(self):
         return self.respiration_rate
 
     def get_shoulder_points(self):
-        return self.shoulder_points
\ No newline at end of file
+        return self.shoulder_points.latest()
+
+    def get_last_shoulder_points(self):
+        """
+        ((left_x, left_y), (right_x, right_y)) frame terakhir, atau None.
+        """
+        last = self.shoulder_points.last()
+        if last is None:
+            return None
+        return tuple(tuple(int(v) for v in point) for point in last)
@@ -0,0 +1,91 @@
+# ring_buffer.py
+
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Bounded, preallocated NumPy history buffer for per-frame signals.
+
+    Capacity is given in seconds (capacity_sec * fps samples). Storage is
+    2x capacity; when the write position reaches the end, the latest
+    samples are moved back to the front (amortized O(1) per append), so
+    the latest window is always one contiguous, writable view.
+
+    Views returned by latest()/slicing stay valid until the next append.
+    """
+
+    def __init__(self, capacity_sec, fps=30, shape=(), dtype=float):
+        self.fps = fps
+        self.capacity = max(1, int(round(capacity_sec * fps)))
+        self.sample_shape = tuple(shape)
+        self._data = np.zeros((2 * self.capacity,) + self.sample_shape, dtype=dtype)
+        self._end = 0
+        self._len = 0
+        self.total = 0  # jumlah seluruh sampel yang pernah masuk
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, key):
+        return self.latest()[key]
+
+    def __array__(self, dtype=None, copy=None):
+        data = self.latest()
+        if dtype is not None:
+            return data.astype(dtype)
+        return data.copy() if copy else data
+
+    @property
+    def dtype(self):
+        return self._data.dtype
+
+    def clear(self):
+        self._end = 0
+        self._len = 0
+        self.total = 0
+
+    def _make_room(self, n):
+        if self._end + n <= self._data.shape[0]:
+            return
+        keep = min(self._len, self.capacity - n)
+        self._data[:keep] = self._data[self._end - keep:self._end]
+        self._end = keep
+        self._len = keep
+
+    def append(self, value):
+        self._make_room(1)
+        self._data[self._end] = value
+        self._end += 1
+        self._len = min(self._len + 1, self.capacity)
+        self.total += 1
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        n = len(values)
+        if n == 0:
+            return
+        self.total += n
+        if n >= self.capacity:
+            self._data[:self.capacity] = values[-self.capacity:]
+            self._end = self._len = self.capacity
+            return
+        self._make_room(n)
+        self._data[self._end:self._end + n] = values
+        self._end += n
+        self._len = min(self._len + n, self.capacity)
+
+    def latest(self, n=None):
+        """
+        Zero-copy contiguous view of the latest n samples (all if None).
+        """
+        n = self._len if n is None else min(n, self._len)
+        return self._data[self._end - n:self._end]
+
+    def last(self):
+        """
+        Most recent sample, or None if the buffer is empty.
+        """
+        if self._len == 0:
+            return None
+        return self._data[self._end - 1]
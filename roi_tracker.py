@@ -0,0 +1,100 @@
+# roi_tracker.py
+
+import numpy as np
+import cv2
+
+
+class ForeheadTracker:
+    """
+    Cheap tracker that carries the forehead ROI between face detections.
+    Sparse Lucas-Kanade optical flow on keypoints inside the face box; the
+    ROI is shifted by the median motion. Confidence is the fraction of
+    points that pass the forward-backward check.
+    """
+
+    def __init__(self, max_points=40, min_points=6, fb_threshold=1.0,
+                 win_size=(15, 15), max_level=2):
+        self.max_points = max_points
+        self.min_points = min_points
+        self.fb_threshold = fb_threshold
+        self.lk_params = dict(
+            winSize=win_size, maxLevel=max_level,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+        self.rect = None
+        self.confidence = 0.0
+        self._rect_f = None  # posisi sub-piksel, agar pembulatan tidak menumpuk
+        self._points = None
+        self._prev_gray = None
+
+    def reset(self):
+        self.rect = None
+        self._rect_f = None
+        self.confidence = 0.0
+        self._points = None
+        self._prev_gray = None
+
+    def init(self, gray, rect, feature_rect=None):
+        """
+        Start tracking `rect` (x1, y1, x2, y2). Keypoints are taken from
+        feature_rect (e.g. the whole face box) when given, since the
+        forehead alone has little texture.
+        """
+        self.reset()
+        if rect is None:
+            return
+        x1, y1, x2, y2 = feature_rect or rect
+        h, w = gray.shape[:2]
+        x1, y1, x2, y2 = max(0, x1), max(0, y1), min(w, x2), min(h, y2)
+        if x2 - x1 < 4 or y2 - y1 < 4:
+            return
+
+        mask = np.zeros_like(gray)
+        mask[y1:y2, x1:x2] = 255
+        points = cv2.goodFeaturesToTrack(gray, maxCorners=self.max_points, qualityLevel=0.01,
+                                         minDistance=5, mask=mask)
+        if points is None or len(points) < self.min_points:
+            # Fallback: grid titik di dalam kotak
+            xs = np.linspace(x1, x2 - 1, 6)
+            ys = np.linspace(y1, y2 - 1, 6)
+            points = np.array([[[x, y]] for y in ys for x in xs], dtype=np.float32)
+
+        self.rect = tuple(int(v) for v in rect)
+        self._rect_f = np.array(self.rect, dtype=float)
+        self.confidence = 1.0
+        self._points = points.astype(np.float32)
+        self._prev_gray = gray
+
+    def track(self, gray):
+        """
+        Move the ROI to the new frame. Returns (rect, confidence); rect is
+        None when tracking is lost.
+        """
+        if self.rect is None or self._points is None:
+            return None, 0.0
+
+        p0 = self._points
+        p1, st1, _ = cv2.calcOpticalFlowPyrLK(self._prev_gray, gray, p0, None, **self.lk_params)
+        if p1 is None:
+            self.reset()
+            return None, 0.0
+        p0r, st2, _ = cv2.calcOpticalFlowPyrLK(gray, self._prev_gray, p1, None, **self.lk_params)
+
+        fb_error = np.linalg.norm((p0 - p0r).reshape(-1, 2), axis=1)
+        good = (st1.reshape(-1) == 1) & (st2.reshape(-1) == 1) & (fb_error < self.fb_threshold)
+        self.confidence = float(np.count_nonzero(good)) / len(p0)
+        if np.count_nonzero(good) < self.min_points:
+            self.reset()
+            return None, 0.0
+
+        dx, dy = np.median((p1 - p0).reshape(-1, 2)[good], axis=0)
+        h, w = gray.shape[:2]
+        x1, y1, x2, y2 = self._rect_f
+        dx = np.clip(dx, -x1, w - x2)
+        dy = np.clip(dy, -y1, h - y2)
+        self._rect_f += (dx, dy, dx, dy)
+        self.rect = tuple(int(round(v)) for v in self._rect_f)
+
+        self._points = p1[good].reshape(-1, 1, 2)
+        self._prev_gray = gray
+        return self.rect, self.confidence
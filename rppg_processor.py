@@ -1,112 +1,468 @@
 # rppg_processor.py
 
+import time
 import numpy as np
-import cv2
-import mediapipe as mp
-from signal_utils import bandpass_filter_rppg, calculate_heart_rate
+from signal_utils import (bandpass_filter_rppg, calculate_heart_rate, compute_pos,
+                          IncrementalPOS, StreamingBandpass, SpectralRateEstimator, UniformResampler)
+from ring_buffer import RingBuffer
+from roi_tracker import ForeheadTracker
+from frame_context import FrameContext
+from latency import NULL_MONITOR
+from model_loader import load_model
+from subject_tracking import SubjectTracker, roi_means
 
-class RPPGProcessor:
-    def __init__(self, fps=30):
+class RPPGSignalChain:
+    """
+    Signal state of one subject: RGB history, POS, band-pass filter and
+    heart-rate estimate. RPPGProcessor is one chain plus face detection;
+    in multi-subject mode every tracked face gets its own chain.
+
+    Samples that come with a capture timestamp are resampled onto a
+    uniform `fps` grid before POS/filtering, so irregular or dropped frames
+    do not bias the rate; without timestamps every sample is taken as one
+    grid step.
+    """
+
+    def __init__(self, fps=30, pos_mode="incremental", buffer_sec=60, refine_display_sec=None,
+                 hr_method="peaks", hr_window_sec=10, rate_update_hz=1.0, latency=None,
+                 hr_band=(0.9, 2.4), hr_filter_order=4, pos_window_sec=1.6, hr_prominence=0.5,
+                 max_gap_sec=1.0, rate_every=1):
         self.fps = fps
-        self.r, self.g, self.b = [], [], []
+        # Hook timing per stage (LatencyMonitor); nonaktif = hampir tanpa biaya
+        self.latency = latency or NULL_MONITOR
+        # Histori sinyal dibatasi buffer_sec detik (memori konstan).
+        # rgb/rgb_time: rata-rata ROI mentah per frame + timestamp capture (NaN jika tidak ada);
+        # rgb_uniform: hasil resampling ke grid fps, dipakai tahap sinyal
+        self.rgb = RingBuffer(buffer_sec, fps=fps, shape=(3,))
+        self.rgb_time = RingBuffer(buffer_sec, fps=fps)
+        self.rgb_uniform = RingBuffer(buffer_sec, fps=fps, shape=(3,))
+        self.resampler = UniformResampler(fs=fps, shape=(3,), max_gap_sec=max_gap_sec)
         self.filtered_rppg = []
         self.heart_rate = 0
 
-        self.mp_face_detection = mp.solutions.face_detection
-        self.face_detection = self.mp_face_detection.FaceDetection(model_selection=1, min_detection_confidence=0.5)
-
-        self.last_forehead_rect = None  # Untuk menampilkan ROI di kamera
+        # "incremental": POS diperbarui per frame (O(w)), "batch": POS ulang seluruh histori
+        self.pos_mode = pos_mode
+        self.pos_window_sec = pos_window_sec
+        self.pos = IncrementalPOS(fps=fps, window_sec=pos_window_sec, capacity_sec=buffer_sec)
+        # Filter kausal per sampel POS yang sudah final (mode incremental)
+        self.hr_band = tuple(hr_band)
+        self.hr_filter_order = hr_filter_order
+        self.rppg_filter = StreamingBandpass(fs=fps, low=hr_band[0], high=hr_band[1], order=hr_filter_order,
+                                             capacity_sec=buffer_sec)
+        # Jika diisi (detik), sinyal tampilan di-refine zero-phase pada jendela pendek
+        self.refine_display_sec = refine_display_sec
 
-    def extract_rgb_from_frame(self, frame):
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        results = self.face_detection.process(frame_rgb)
+        # Estimasi HR: "peaks" (hitung puncak) atau "spectral" (Welch, diperbarui rate_update_hz)
+        self.hr_method = hr_method
+        self.hr_prominence = hr_prominence
+        self.hr_estimator = SpectralRateEstimator(fs=fps, low=hr_band[0], high=hr_band[1],
+                                                  window_sec=hr_window_sec, update_hz=rate_update_hz)
+        # Estimasi HR (dan POS batch) hanya tiap rate_every sampel seragam;
+        # dinaikkan FrameScheduler saat CPU tertinggal, HR terakhir ditahan
+        self.rate_every = rate_every
+        self._rate_pending = 0
 
-        h, w, _ = frame.shape
-        r_mean = g_mean = b_mean = 0
+        self.last_forehead_rect = None  # Untuk menampilkan ROI di kamera
 
-        if results.detections:
-            detection = results.detections[0]
-            bbox = detection.location_data.relative_bounding_box
+    def process_rgb_mean(self, rgb_mean, rect=None, timestamp=None):
+        """
+        Perbarui sinyal dari rata-rata ROI (R, G, B) yang sudah dihitung
+        (mis. replay trace), tanpa frame dan tanpa model.
+        """
+        self.last_forehead_rect = rect
+        self._update_signal(*rgb_mean, timestamp=timestamp)
 
-            x = int(bbox.xmin * w)
-            y = int(bbox.ymin * h)
-            width = int(bbox.width * w)
-            height = int(bbox.height * h)
-
-            # ROI hanya jidat (lebih presisi)
-            forehead_x1 = x + int(0.15 * width)
-            forehead_x2 = x + int(0.85 * width)
-            forehead_y1 = y - int(0.10 * height)
-            forehead_y2 = y + int(0.08 * height)
-
-            # Validasi batas ROI
-            forehead_x1 = max(0, forehead_x1)
-            forehead_x2 = min(w, forehead_x2)
-            forehead_y1 = max(0, forehead_y1)
-            forehead_y2 = min(h, forehead_y2)
-
-            self.last_forehead_rect = (forehead_x1, forehead_y1, forehead_x2, forehead_y2)
-
-            roi = frame[forehead_y1:forehead_y2, forehead_x1:forehead_x2]
-            if roi.size > 0:
-                r_mean = np.mean(roi[:, :, 2])
-                g_mean = np.mean(roi[:, :, 1])
-                b_mean = np.mean(roi[:, :, 0])
+    def _update_signal(self, r_mean, g_mean, b_mean, timestamp=None):
+        # Simpan nilai mentah + timestamp capture
+        self.rgb.append((r_mean, g_mean, b_mean))
+        self.rgb_time.append(np.nan if timestamp is None else timestamp)
+        if timestamp is None:
+            samples = ((r_mean, g_mean, b_mean),)
         else:
-            self.last_forehead_rect = None
+            with self.latency.stage("resample"):
+                samples = self.resampler.push(timestamp, (r_mean, g_mean, b_mean))
+            if len(samples) == 0:
+                # Frame lebih rapat dari grid: belum ada sampel seragam baru
+                return
+        self.rgb_uniform.extend(samples)
 
-        # Simpan nilai ke sinyal
-        self.r.append(r_mean)
-        self.g.append(g_mean)
-        self.b.append(b_mean)
+        if self.pos_mode == "incremental":
+            for sample in samples:
+                with self.latency.stage("pos"):
+                    final_sample = self.pos.update(sample)
+                if final_sample is not None:
+                    with self.latency.stage("rppg_filter"):
+                        self.rppg_filter.process(final_sample)
 
         # Terapkan POS jika cukup frame
-        if len(self.g) >= 30:
-            rgb_signal = np.array([self.r, self.g, self.b]).reshape(1, 3, -1)
-            pos_signal = self.compute_pos(rgb_signal)
-
-            self.filtered_rppg = bandpass_filter_rppg(pos_signal, fs=self.fps)
-            self.heart_rate, _ = calculate_heart_rate(self.filtered_rppg, fs=self.fps)
+        if self.pos_mode == "incremental" and len(self.rppg_filter) >= 30:
+            self.filtered_rppg = self.rppg_filter.get_output()
+            n_new = self._rate_due(len(samples))
+            if n_new:
+                self._update_heart_rate(n_new)
+        elif self.pos_mode == "batch" and len(self.rgb_uniform) >= 30:
+            n_new = self._rate_due(len(samples))
+            if not n_new:
+                return
+            with self.latency.stage("pos"):
+                pos_signal = self.compute_pos(self.get_rgb_signals())
+            with self.latency.stage("rppg_filter"):
+                self.filtered_rppg = bandpass_filter_rppg(pos_signal, fs=self.fps, low=self.hr_band[0],
+                                                          high=self.hr_band[1], order=self.hr_filter_order)
+            self._update_heart_rate(n_new)
         else:
             self.filtered_rppg = self.g
             self.heart_rate = 0
 
-    # ===== Akses ke data =====
+    def reset_signal(self):
+        """
+        Kosongkan histori sinyal dan estimasi (mis. saat subjek berganti).
+        """
+        for buf in (self.rgb, self.rgb_time, self.rgb_uniform):
+            buf.clear()
+        self.resampler.reset()
+        self.pos.reset()
+        self.rppg_filter.reset()
+        self.hr_estimator.reset()
+        self.filtered_rppg = []
+        self.heart_rate = 0
+        self._rate_pending = 0
 
-    def get_forehead_rect(self):
-        return self.last_forehead_rect
+    def _rate_due(self, n_samples):
+        """
+        Jumlah sampel sejak estimasi terakhir bila estimasi jatuh tempo, selain itu 0.
+        """
+        self._rate_pending += n_samples
+        if self._rate_pending < self.rate_every:
+            return 0
+        n_new, self._rate_pending = self._rate_pending, 0
+        return n_new
+
+    def set_rate_every(self, n):
+        self.rate_every = max(1, int(n))
+
+    def _update_heart_rate(self, n_new):
+        with self.latency.stage("hr_rate"):
+            if self.hr_method == "spectral":
+                self.heart_rate = self.hr_estimator.update(self.filtered_rppg, n_new)
+            else:
+                self.heart_rate, _ = calculate_heart_rate(self.filtered_rppg, fs=self.fps,
+                                                          prominence=self.hr_prominence)
+
+    # r/g/b dan get_rgb_signals: sinyal seragam (grid fps)
+    @property
+    def r(self):
+        return self.rgb_uniform.latest()[:, 0]
+
+    @property
+    def g(self):
+        return self.rgb_uniform.latest()[:, 1]
+
+    @property
+    def b(self):
+        return self.rgb_uniform.latest()[:, 2]
 
     def get_rgb_signals(self):
-        return np.array([self.r, self.g, self.b]).reshape(1, 3, -1)
+        return self.rgb_uniform.latest().T[np.newaxis]
 
     def get_filtered_rppg(self):
+        if self.refine_display_sec and self.pos_mode == "incremental" and len(self.rppg_filter) >= 30:
+            return self.rppg_filter.refine(self.refine_display_sec)
         return self.filtered_rppg
 
     def get_heart_rate(self):
         return self.heart_rate
 
-    # Implementasi algoritma POS
+    # Implementasi algoritma POS (batch, untuk analisis offline)
     def compute_pos(self, signal):
-        eps = 1e-9
-        e, c, f = signal.shape
-        w = int(1.6 * self.fps)
-        P = np.array([[0, 1, -1], [-2, 1, 1]])
-        Q = np.stack([P for _ in range(e)], axis=0)
-        H = np.zeros((e, f))
-
-        for n in np.arange(w, f):
-            m = n - w + 1
-            Cn = signal[:, :, m:(n + 1)]
-            M = 1.0 / (np.mean(Cn, axis=2) + eps)
-            M = np.expand_dims(M, axis=2)
-            Cn = np.multiply(M, Cn)
-            S = np.dot(Q, Cn)[0]
-            S = np.swapaxes(S, 0, 1)
-            S1, S2 = S[:, 0, :], S[:, 1, :]
-            alpha = np.std(S1, axis=1) / (np.std(S2, axis=1) + eps)
-            alpha = np.expand_dims(alpha, axis=1)
-            Hn = S1 + alpha * S2
-            Hn -= np.expand_dims(np.mean(Hn, axis=1), axis=1)
-            H[:, m:(n + 1)] += Hn
-
-        return H.reshape(-1)
+        return compute_pos(signal, fps=self.fps, window_sec=self.pos_window_sec).reshape(-1)
+
+
+class RPPGProcessor(RPPGSignalChain):
+    def __init__(self, fps=30, pos_mode="incremental", buffer_sec=60, refine_display_sec=None,
+                 hr_method="peaks", hr_window_sec=10, rate_update_hz=1.0,
+                 detect_every=1, min_track_confidence=0.5, latency=None,
+                 multi_subject=False, max_subjects=4, subject_timeout_sec=1.0,
+                 hr_band=(0.9, 2.4), hr_filter_order=4, pos_window_sec=1.6, hr_prominence=0.5,
+                 inference_scale=1.0, max_gap_sec=1.0, rate_every=1):
+        self._chain_kwargs = dict(fps=fps, pos_mode=pos_mode, buffer_sec=buffer_sec,
+                                  refine_display_sec=refine_display_sec, hr_method=hr_method,
+                                  hr_window_sec=hr_window_sec, rate_update_hz=rate_update_hz,
+                                  latency=latency, hr_band=hr_band, hr_filter_order=hr_filter_order,
+                                  pos_window_sec=pos_window_sec, hr_prominence=hr_prominence,
+                                  max_gap_sec=max_gap_sec, rate_every=rate_every)
+        super().__init__(**self._chain_kwargs)
+
+        # Model dibuat saat pertama dipakai (replay trace tidak membutuhkannya)
+        self._face_detection = None
+        # FaceDetection berjalan di frame yang diperkecil; rata-rata ROI tetap dari frame penuh
+        self.inference_scale = inference_scale
+
+        # Detect-then-track: deteksi penuh tiap detect_every frame (1 = setiap frame),
+        # di antaranya ROI dibawa oleh tracker optical flow
+        self.detect_every = detect_every
+        self.min_track_confidence = min_track_confidence
+        self.tracker = ForeheadTracker()
+        self._frames_since_detect = 0
+        self._track_stats = {
+            "frames": 0, "detections": 0, "tracked_frames": 0, "redetect_on_loss": 0,
+            "detect_time": 0.0, "track_time": 0.0, "drift_sum": 0.0, "drift_count": 0, "last_drift": 0.0,
+        }
+
+        # Multi-subjek: semua deteksi diasosiasikan ke ID stabil, tiap subjek
+        # punya RPPGSignalChain sendiri. Chain milik processor ini sendiri
+        # (getter lama) mengikuti subjek utama = subjek aktif paling lama, dan
+        # dikosongkan saat subjek utama berganti (sinyal dua orang tidak disambung).
+        # Mode ini menjalankan FaceDetection tiap frame: detect_every/tracker
+        # optical flow tidak dipakai.
+        self.multi_subject = multi_subject
+        self.subject_tracker = SubjectTracker(max_subjects=max_subjects,
+                                              max_missing=int(subject_timeout_sec * fps))
+        self.subjects = {}        # subject_id -> RPPGSignalChain
+        self.subject_rects = {}   # subject_id -> forehead_rect frame terakhir (None jika hilang)
+        self._last_means = {}     # subject_id -> (r, g, b) terakhir, ditahan selama subjek hilang
+        self._primary_id = None   # subjek yang sinyalnya sedang diikuti chain processor ini
+
+    @property
+    def face_detection(self):
+        if self._face_detection is None:
+            self._face_detection = load_model("face")
+        return self._face_detection
+
+    def _detect_forehead(self, ctx):
+        """
+        Jalankan FaceDetection, kembalikan (forehead_rect, face_rect) atau (None, None).
+        """
+        face_boxes = self._detect_face_boxes(ctx)
+        if not face_boxes:
+            return None, None
+        return self._forehead_from_box(face_boxes[0], ctx.width, ctx.height)
+
+    def _detect_face_boxes(self, ctx):
+        """
+        Semua deteksi wajah sebagai list (xmin, ymin, width, height) relatif.
+        """
+        with self.latency.stage("face_detect"):
+            results = self.face_detection.process(ctx.for_inference(self.inference_scale).rgb)
+        face_boxes = []
+        for detection in results.detections or []:
+            bbox = detection.location_data.relative_bounding_box
+            face_boxes.append((bbox.xmin, bbox.ymin, bbox.width, bbox.height))
+        return face_boxes
+
+    def _forehead_from_box(self, face_box, w, h):
+        """
+        face_box relatif (xmin, ymin, width, height) -> (forehead_rect, face_rect) dalam piksel.
+        """
+        xmin, ymin, box_w, box_h = face_box
+        x = int(xmin * w)
+        y = int(ymin * h)
+        width = int(box_w * w)
+        height = int(box_h * h)
+
+        # ROI hanya jidat (lebih presisi)
+        forehead_x1 = x + int(0.15 * width)
+        forehead_x2 = x + int(0.85 * width)
+        forehead_y1 = y - int(0.10 * height)
+        forehead_y2 = y + int(0.08 * height)
+
+        # Validasi batas ROI
+        forehead_x1 = max(0, forehead_x1)
+        forehead_x2 = min(w, forehead_x2)
+        forehead_y1 = max(0, forehead_y1)
+        forehead_y2 = min(h, forehead_y2)
+
+        return (forehead_x1, forehead_y1, forehead_x2, forehead_y2), (x, y, x + width, y + height)
+
+    def _locate_forehead(self, ctx):
+        stats = self._track_stats
+        stats["frames"] += 1
+        if self.detect_every <= 1:
+            t0 = time.perf_counter()
+            rect, _ = self._detect_forehead(ctx)
+            stats["detect_time"] += time.perf_counter() - t0
+            stats["detections"] += 1
+            return rect
+
+        gray = ctx.gray
+        tracked = None
+        if self.tracker.rect is not None:
+            t0 = time.perf_counter()
+            with self.latency.stage("track"):
+                tracked, confidence = self.tracker.track(gray)
+            stats["track_time"] += time.perf_counter() - t0
+            if tracked is None or confidence < self.min_track_confidence:
+                stats["redetect_on_loss"] += 1
+                tracked = None
+            elif self._frames_since_detect + 1 < self.detect_every:
+                self._frames_since_detect += 1
+                stats["tracked_frames"] += 1
+                return tracked
+
+        t0 = time.perf_counter()
+        rect, face_rect = self._detect_forehead(ctx)
+        stats["detect_time"] += time.perf_counter() - t0
+        stats["detections"] += 1
+        self._frames_since_detect = 0
+
+        # Drift tracker: selisih pusat ROI hasil tracking vs hasil deteksi
+        if tracked is not None and rect is not None:
+            drift = np.hypot((tracked[0] + tracked[2] - rect[0] - rect[2]) / 2,
+                             (tracked[1] + tracked[3] - rect[1] - rect[3]) / 2)
+            stats["drift_sum"] += drift
+            stats["drift_count"] += 1
+            stats["last_drift"] = float(drift)
+
+        self.tracker.init(gray, rect, face_rect)
+        return rect
+
+    def extract_rgb_from_frame(self, frame):
+        """
+        frame: BGR array atau FrameContext (konversi warna dipakai bersama).
+        Mode multi_subject selalu mendeteksi semua wajah (tanpa detect-then-track).
+        """
+        ctx = FrameContext.wrap(frame)
+        if self.multi_subject:
+            stats = self._track_stats
+            t0 = time.perf_counter()
+            face_boxes = self._detect_face_boxes(ctx)
+            stats["detect_time"] += time.perf_counter() - t0
+            stats["frames"] += 1
+            stats["detections"] += 1
+            self._update_subjects(ctx, face_boxes)
+            return
+        self._update_from_rect(ctx, self._locate_forehead(ctx))
+
+    def process_face_box(self, frame, face_box):
+        """
+        Seperti extract_rgb_from_frame, tetapi memakai hasil deteksi wajah yang
+        sudah dihitung di tempat lain (mis. proses worker).
+        face_box: (xmin, ymin, width, height) relatif, atau None jika tidak ada wajah.
+        """
+        ctx = FrameContext.wrap(frame)
+        rect = None
+        if face_box is not None:
+            rect, _ = self._forehead_from_box(face_box, ctx.width, ctx.height)
+        self._update_from_rect(ctx, rect)
+
+    def process_face_boxes(self, frame, face_boxes):
+        """
+        Seperti process_face_box untuk semua wajah dalam frame. Pada mode
+        satu subjek hanya wajah pertama yang dipakai.
+        """
+        ctx = FrameContext.wrap(frame)
+        if not self.multi_subject:
+            self.process_face_box(ctx, face_boxes[0] if face_boxes else None)
+            return
+        self._update_subjects(ctx, face_boxes or [])
+
+    def _update_subjects(self, ctx, face_boxes):
+        located = [self._forehead_from_box(box, ctx.width, ctx.height) for box in face_boxes]
+        ids, removed = self.subject_tracker.update([face_rect for _, face_rect in located])
+        for sid in removed:
+            self.subjects.pop(sid, None)
+            self.subject_rects.pop(sid, None)
+            self._last_means.pop(sid, None)
+
+        visible = [(sid, forehead) for sid, (forehead, _) in zip(ids, located) if sid is not None]
+        # Rata-rata ROI semua subjek sekaligus (satu integral image)
+        with self.latency.stage("roi_mean"):
+            means = roi_means(ctx.bgr, [rect for _, rect in visible])
+
+        self.subject_rects = dict.fromkeys(self.subjects)
+        for (sid, rect), mean in zip(visible, means):
+            if sid not in self.subjects:
+                self.subjects[sid] = RPPGSignalChain(**self._chain_kwargs)
+            self.subject_rects[sid] = rect
+            self._last_means[sid] = tuple(mean)
+
+        # Subjek yang sesaat tidak terdeteksi memakai nilai terakhirnya, supaya
+        # sampling tetap seragam dan POS tidak melompat ke nol
+        for sid, chain in self.subjects.items():
+            chain._update_signal(*self._last_means[sid], timestamp=ctx.timestamp)
+
+        primary = self.get_primary_subject()
+        if primary != self._primary_id:
+            self._primary_id = primary
+            self.reset_signal()
+        if primary is None:
+            self.last_forehead_rect = None
+            self._update_signal(0, 0, 0, timestamp=ctx.timestamp)
+        else:
+            self.last_forehead_rect = self.subject_rects[primary]
+            self._update_signal(*self._last_means[primary], timestamp=ctx.timestamp)
+
+    def _update_from_rect(self, ctx, rect):
+        r_mean = g_mean = b_mean = 0
+        self.last_forehead_rect = rect
+        if rect is not None:
+            forehead_x1, forehead_y1, forehead_x2, forehead_y2 = rect
+            with self.latency.stage("roi_mean"):
+                roi = ctx.bgr[forehead_y1:forehead_y2, forehead_x1:forehead_x2]
+                if roi.size > 0:
+                    r_mean = np.mean(roi[:, :, 2])
+                    g_mean = np.mean(roi[:, :, 1])
+                    b_mean = np.mean(roi[:, :, 0])
+
+        self._update_signal(r_mean, g_mean, b_mean, timestamp=ctx.timestamp)
+
+    def set_rate_every(self, n):
+        """
+        Berlaku juga untuk chain setiap subjek (termasuk subjek baru).
+        """
+        super().set_rate_every(n)
+        self._chain_kwargs["rate_every"] = self.rate_every
+        for chain in self.subjects.values():
+            chain.set_rate_every(self.rate_every)
+
+    # ===== Akses ke data =====
+
+    def get_forehead_rect(self):
+        return self.last_forehead_rect
+
+    def get_primary_subject(self):
+        """
+        ID subjek aktif paling lama (None jika tidak ada).
+        """
+        return min(self.subjects) if self.subjects else None
+
+    def get_subject(self, subject_id):
+        return self.subjects.get(subject_id)
+
+    def get_subjects(self):
+        """
+        {subject_id: {"rect", "visible", "heart_rate"}} untuk semua subjek aktif.
+        """
+        return {
+            sid: {
+                "rect": self.subject_rects.get(sid),
+                "visible": self.subject_rects.get(sid) is not None,
+                "heart_rate": chain.get_heart_rate(),
+            }
+            for sid, chain in self.subjects.items()
+        }
+
+    def get_tracking_stats(self):
+        """
+        Statistik detect-then-track: rasio deteksi, drift tracker (px) dan
+        estimasi penghematan latensi per frame (ms).
+        """
+        s = self._track_stats
+        frames = max(1, s["frames"])
+        detections = max(1, s["detections"])
+        detect_ms = 1000 * s["detect_time"] / detections
+        track_ms = 1000 * s["track_time"] / frames
+        locate_ms = 1000 * (s["detect_time"] + s["track_time"]) / frames
+        return {
+            "frames": s["frames"],
+            "detections": s["detections"],
+            "tracked_frames": s["tracked_frames"],
+            "redetect_on_loss": s["redetect_on_loss"],
+            "detection_rate": s["detections"] / frames,
+            "mean_drift_px": float(s["drift_sum"] / s["drift_count"]) if s["drift_count"] else 0.0,
+            "last_drift_px": s["last_drift"],
+            "detect_ms": detect_ms,
+            "track_ms": track_ms,
+            "locate_ms": locate_ms,
+            "saved_ms_per_frame": max(0.0, detect_ms - locate_ms),
+        }
@@ -0,0 +1,376 @@
+# session_manager.py
+#
+# Beberapa sumber (kamera atau file video) sekaligus, masing-masing dengan
+# RPPGProcessor/RespirasiProcessor sendiri, tersebar di proses worker
+# sebanyak core CPU. Hasil semua sesi digabung dalam satu stream:
+#   python session_manager.py 0 1 rekaman.mp4 --workers 2
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import time
+
+TERMINAL_STATES = ("finished", "stopped", "error")
+
+
+class SessionConfig:
+    """
+    One monitored source. `source` is a camera index (int or digit string)
+    or a video path. File sources run as fast as possible unless
+    `realtime` is set, in which case they are paced at their frame rate and
+    frames are skipped when processing falls behind, like a live camera.
+    """
+
+    def __init__(self, source, name=None, fps=None, max_frames=None, realtime=None,
+                 rppg_kwargs=None, resp_kwargs=None):
+        if isinstance(source, str) and source.isdigit():
+            source = int(source)
+        self.source = source
+        self.name = name or (f"cam{source}" if isinstance(source, int) else os.path.basename(str(source)))
+        self.fps = fps
+        self.max_frames = max_frames
+        self.realtime = realtime
+        self.rppg_kwargs = rppg_kwargs or {}
+        self.resp_kwargs = resp_kwargs or {}
+
+    @property
+    def is_camera(self):
+        return isinstance(self.source, int)
+
+
+class _Session:
+    """
+    State of one session inside a worker process.
+    """
+
+    def __init__(self, config, worker_id):
+        import cv2
+        from camera_discovery import open_camera
+        from capture import LatestFrameCapture, RateMeter
+        from frame_context import FrameContext
+        from rppg_processor import RPPGProcessor
+        from respirasi_processor import RespirasiProcessor
+        from parallel_inference import InferenceRunner
+
+        self.config = config
+        self.name = config.name
+        self.worker_id = worker_id
+        self.state = "starting"
+        self.error = None
+        self.meter = RateMeter()
+        self.frames = 0
+        self.dropped_frames = 0
+        self.dropped_results = 0
+        self.last_frame_time = None
+        self._FrameContext = FrameContext
+
+        # Kamera lewat backend platform (camera_discovery), file lewat backend default
+        self.cap = open_camera(config.source) if config.is_camera else cv2.VideoCapture(config.source)
+        if not self.cap.isOpened():
+            raise IOError(f"Tidak bisa membuka sumber: {config.source}")
+        file_fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.fps = config.fps or (file_fps if file_fps and file_fps > 0 else 30)
+        self.realtime = config.is_camera if config.realtime is None else config.realtime
+
+        # Kamera: thread capture latest-frame (frame lama otomatis dibuang)
+        self.capture = LatestFrameCapture(self.cap).start() if config.is_camera else None
+        self._file_index = 0
+        self._t_start = time.monotonic()
+
+        rppg_kwargs = dict(config.rppg_kwargs)
+        rppg_kwargs.setdefault("fps", self.fps)
+        resp_kwargs = dict(config.resp_kwargs)
+        resp_kwargs.setdefault("fps", self.fps)
+        self.rppg = RPPGProcessor(**rppg_kwargs)
+        self.resp = RespirasiProcessor(**resp_kwargs)
+        self.runner = InferenceRunner(self.rppg, self.resp, mode="inprocess")
+        self.state = "running"
+
+    def _next_frame(self):
+        """
+        Next FrameContext, None if nothing is ready yet, or False at the end.
+        """
+        if self.capture is not None:
+            ctx = self.capture.read(timeout=0)
+            if ctx is None and not self.capture.running:
+                return False
+            if ctx is not None:
+                self.dropped_frames = self.capture.dropped
+            return ctx
+
+        if self.config.max_frames is not None and self._file_index >= self.config.max_frames:
+            return False
+        if self.realtime:
+            # File sebagai pengganti kamera: jaga laju real-time, lompati frame yang terlambat
+            due = int((time.monotonic() - self._t_start) * self.fps)
+            if due < self._file_index:
+                return None
+            while due > self._file_index:
+                if not self.cap.grab():
+                    return False
+                self._file_index += 1
+                self.dropped_frames += 1
+        ret, frame = self.cap.read()
+        if not ret:
+            return False
+        ctx = self._FrameContext(frame, index=self._file_index, timestamp=self._file_index / self.fps)
+        self._file_index += 1
+        return ctx
+
+    def step(self, result_queue, emit_every):
+        """
+        Process at most one frame. Returns True if a frame was processed.
+        """
+        if self.state in TERMINAL_STATES:
+            return False
+        try:
+            ctx = self._next_frame()
+            if ctx is False:
+                self.state = "finished"
+                return False
+            if ctx is None:
+                return False
+            self.runner.process(ctx)
+        except Exception as e:
+            self.state = "error"
+            self.error = repr(e)
+            return False
+
+        self.frames += 1
+        self.meter.tick()
+        self.last_frame_time = time.monotonic()
+        if self.frames % emit_every == 0:
+            result = {
+                "type": "result",
+                "session": self.name,
+                "frame": ctx.index,
+                "t": ctx.timestamp,
+                "hr": float(self.rppg.get_heart_rate()),
+                "rr": float(self.resp.get_respiration_rate()),
+                "roi": self.rppg.get_forehead_rect(),
+            }
+            # Backpressure: konsumen lambat tidak boleh menahan pemrosesan
+            try:
+                result_queue.put_nowait(result)
+            except queue.Full:
+                self.dropped_results += 1
+        return True
+
+    def health(self):
+        age = None if self.last_frame_time is None else time.monotonic() - self.last_frame_time
+        return {
+            "type": "health",
+            "session": self.name,
+            "worker": self.worker_id,
+            "state": self.state,
+            "error": self.error,
+            "frames": self.frames,
+            "fps": self.meter.rate,
+            "dropped_frames": self.dropped_frames,
+            "dropped_results": self.dropped_results,
+            "last_frame_age_s": age,
+        }
+
+    def close(self):
+        if self.capture is not None:
+            self.capture.close()
+        else:
+            self.cap.release()
+
+
+def _session_worker(worker_id, configs, result_queue, stop_event, emit_every, health_interval):
+    sessions = []
+    for config in configs:
+        try:
+            sessions.append(_Session(config, worker_id))
+        except Exception as e:
+            result_queue.put({"type": "health", "session": config.name, "worker": worker_id,
+                              "state": "error", "error": repr(e), "frames": 0, "fps": 0.0,
+                              "dropped_frames": 0, "dropped_results": 0, "last_frame_age_s": None})
+
+    next_health = time.monotonic()
+    try:
+        while not stop_event.is_set():
+            active = [s for s in sessions if s.state not in TERMINAL_STATES]
+            # Round-robin: satu frame per sesi per putaran
+            busy = False
+            for session in active:
+                busy |= session.step(result_queue, emit_every)
+
+            now = time.monotonic()
+            if now >= next_health or len(active) != sum(s.state not in TERMINAL_STATES for s in sessions):
+                next_health = now + health_interval
+                for session in sessions:
+                    try:
+                        result_queue.put_nowait(session.health())
+                    except queue.Full:
+                        pass
+            if not active:
+                break
+            if not busy:
+                time.sleep(0.002)
+    finally:
+        for session in sessions:
+            if session.state not in TERMINAL_STATES:
+                session.state = "stopped" if stop_event.is_set() else "finished"
+            session.close()
+            # Status akhir harus sampai ke manager
+            try:
+                result_queue.put(session.health(), timeout=1.0)
+            except queue.Full:
+                pass
+
+
+class SessionManager:
+    """
+    Runs several SessionConfig sources in a pool of worker processes
+    (default: one per CPU core, never more than the number of sessions).
+    Sessions are spread round-robin over the workers; each worker
+    interleaves its sessions frame by frame.
+
+    Results and health reports of all sessions arrive on one bounded
+    queue. When the consumer falls behind, workers drop results instead of
+    blocking (counted in health as dropped_results); live cameras also
+    drop stale frames at capture.
+    """
+
+    def __init__(self, sources, n_workers=None, queue_size=256, emit_every=1, health_interval=1.0):
+        self.configs = [s if isinstance(s, SessionConfig) else SessionConfig(s) for s in sources]
+        names = [c.name for c in self.configs]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Nama sesi harus unik: {names}")
+        self.n_workers = max(1, min(n_workers or os.cpu_count() or 1, len(self.configs)))
+        self.emit_every = emit_every
+        self.health_interval = health_interval
+
+        self._mp = multiprocessing.get_context("spawn")
+        self._queue = self._mp.Queue(maxsize=queue_size)
+        self._stop_event = self._mp.Event()
+        self._workers = []
+        self._health = {c.name: {"session": c.name, "state": "pending"} for c in self.configs}
+        self._assignment = {}
+
+    def start(self):
+        for worker_id in range(self.n_workers):
+            configs = self.configs[worker_id::self.n_workers]
+            for config in configs:
+                self._assignment[config.name] = worker_id
+            proc = self._mp.Process(
+                target=_session_worker, name=f"session-worker-{worker_id}", daemon=True,
+                args=(worker_id, configs, self._queue, self._stop_event,
+                      self.emit_every, self.health_interval))
+            proc.start()
+            self._workers.append(proc)
+        return self
+
+    @property
+    def running(self):
+        return any(p.is_alive() for p in self._workers) or not self._queue.empty()
+
+    def _check_workers(self):
+        # Worker mati tanpa laporan akhir (mis. crash native): tandai sesinya error
+        for worker_id, proc in enumerate(self._workers):
+            if proc.is_alive() or proc.exitcode == 0:
+                continue
+            for name, wid in self._assignment.items():
+                if wid == worker_id and self._health[name].get("state") not in TERMINAL_STATES:
+                    self._health[name] = {"session": name, "worker": worker_id, "state": "error",
+                                          "error": f"worker exit code {proc.exitcode}"}
+
+    def poll(self, timeout=0.1):
+        """
+        Next message (result or health dict), or None on timeout.
+        """
+        try:
+            message = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            self._check_workers()
+            return None
+        if message.get("type") == "health":
+            self._health[message["session"]] = message
+        return message
+
+    def results(self, include_health=False, timeout=0.1):
+        """
+        Aggregated stream of all sessions until every session has ended
+        or stop() is called.
+        """
+        while True:
+            message = self.poll(timeout)
+            if message is None:
+                if self._stop_event.is_set() or self.all_done():
+                    return
+                continue
+            if include_health or message.get("type") == "result":
+                yield message
+
+    def all_done(self):
+        states_done = all(h.get("state") in TERMINAL_STATES for h in self._health.values())
+        return states_done and not any(p.is_alive() for p in self._workers) and self._queue.empty()
+
+    def health(self):
+        """
+        Latest health report per session name.
+        """
+        self._check_workers()
+        return {name: dict(h) for name, h in self._health.items()}
+
+    def stop(self, timeout=5.0):
+        self._stop_event.set()
+        deadline = time.monotonic() + timeout
+        # Kosongkan queue agar worker tidak tertahan saat menulis status akhir
+        while any(p.is_alive() for p in self._workers) and time.monotonic() < deadline:
+            self.poll(timeout=0.05)
+        while self.poll(timeout=0) is not None:
+            pass
+        for proc in self._workers:
+            proc.join(timeout=0.1)
+            if proc.is_alive():
+                proc.terminate()
+        self._workers = []
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pantau HR/RR dari beberapa kamera/video sekaligus")
+    parser.add_argument("sources", nargs="+", help="indeks kamera (0, 1, ...) atau path video")
+    parser.add_argument("--workers", type=int, default=None, help="jumlah proses (default: jumlah core)")
+    parser.add_argument("--realtime", action="store_true", help="putar file video dengan laju aslinya")
+    parser.add_argument("--max-frames", type=int, default=None)
+    parser.add_argument("--emit-every", type=int, default=1)
+    parser.add_argument("--json", action="store_true", help="tulis semua pesan sebagai JSON per baris")
+    args = parser.parse_args(argv)
+
+    configs = [SessionConfig(s, max_frames=args.max_frames, realtime=args.realtime or None)
+               for s in args.sources]
+    last_print = 0.0
+    with SessionManager(configs, n_workers=args.workers, emit_every=args.emit_every) as manager:
+        try:
+            for message in manager.results(include_health=args.json):
+                if args.json:
+                    print(json.dumps(message))
+                elif time.monotonic() - last_print >= 1.0:
+                    last_print = time.monotonic()
+                    line = " | ".join(
+                        f"{name}: {h.get('state')} {h.get('fps', 0.0):5.1f} fps"
+                        for name, h in manager.health().items())
+                    print(f"[{message['session']}] HR {message['hr']:5.1f} RR {message['rr']:5.1f}  ({line})")
+        except KeyboardInterrupt:
+            pass
+        health = manager.health()
+    for name, h in health.items():
+        print(f"{name}: {h.get('state')} frames={h.get('frames', 0)} "
+              f"dropped_frames={h.get('dropped_frames', 0)} dropped_results={h.get('dropped_results', 0)}"
+              + (f" error={h['error']}" if h.get("error") else ""))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,19 +1,40 @@
 # signal_utils.py
 
 import numpy as np
-from scipy.signal import butter, filtfilt, find_peaks, savgol_filter
+from numpy.lib.stride_tricks import sliding_window_view
+from functools import lru_cache
+from scipy.fft import next_fast_len
+from scipy.signal import (butter, filtfilt, find_peaks, get_window, savgol_filter,
+                          sosfilt, sosfilt_zi, sosfiltfilt)
+from ring_buffer import RingBuffer
 
 # ==========================================
 # FILTERS
 # ==========================================
 
 
+@lru_cache(maxsize=32)
+def design_bandpass_ba(fs, low, high, order):
+    """
+    Butterworth band-pass (b, a), designed once per (fs, band, order).
+    """
+    return butter(order, [low, high], btype='band', fs=fs)
+
+
+@lru_cache(maxsize=32)
+def design_bandpass_sos(fs, low, high, order):
+    """
+    Butterworth band-pass as second-order sections, designed once per (fs, band, order).
+    """
+    return butter(order, [low, high], btype='band', fs=fs, output='sos')
+
+
 def bandpass_filter_rppg(data, fs=30, low=0.9, high=2.4, order=4):
     """
     Bandpass filter for rPPG signal (heart rate domain).
     Default: 54–144 bpm (0.9–2.4 Hz)
     """
-    b, a = butter(order, [low, high], btype='band', fs=fs)
+    b, a = design_bandpass_ba(fs, low, high, order)
     return filtfilt(b, a, data)
 
 
@@ -22,9 +43,67 @@ def bandpass_filter_respirasi(data, fs=30, low=0.2, high=0.33, order=3):
     Bandpass filter for respiration signal (shoulder movement domain).
     Default: 12–20 breaths/min (0.2–0.33 Hz)
     """
-    b, a = butter(order, [low, high], btype='band', fs=fs)
+    b, a = design_bandpass_ba(fs, low, high, order)
     return filtfilt(b, a, data)
 
+
+class StreamingBandpass:
+    """
+    Causal band-pass filter for per-frame streams.
+    Keeps the sosfilt state between calls, so each call only filters the
+    new samples (O(1) per frame regardless of session length).
+    """
+
+    def __init__(self, fs=30, low=0.9, high=2.4, order=4, capacity_sec=60):
+        self.fs = fs
+        self.sos = design_bandpass_sos(fs, low, high, order)
+        self._zi = None
+        self.input = RingBuffer(capacity_sec, fps=fs)
+        self.output = RingBuffer(capacity_sec, fps=fs)
+
+        # Panjang minimum untuk sosfiltfilt (padlen default scipy)
+        n_sections = self.sos.shape[0]
+        self._padlen = 3 * (2 * n_sections + 1 - min(
+            (self.sos[:, 2] == 0).sum(), (self.sos[:, 5] == 0).sum()))
+
+    def __len__(self):
+        return len(self.output)
+
+    def reset(self):
+        self._zi = None
+        self.input.clear()
+        self.output.clear()
+
+    def process(self, samples):
+        """
+        Filter new samples and return their filtered values.
+        """
+        x = np.atleast_1d(np.asarray(samples, dtype=float))
+        if x.size == 0:
+            return x
+        if self._zi is None:
+            # Mulai dari kondisi steady-state agar transien awal kecil
+            self._zi = sosfilt_zi(self.sos) * x[0]
+        y, self._zi = sosfilt(self.sos, x, zi=self._zi)
+        self.input.extend(x)
+        self.output.extend(y)
+        return y
+
+    def get_output(self):
+        return self.output.latest()
+
+    def refine(self, lookback_sec=10):
+        """
+        Zero-phase (forward-backward) version of the last lookback_sec
+        seconds, for display. Falls back to the causal output when the
+        look-back is too short.
+        """
+        n = int(lookback_sec * self.fs)
+        x = self.input.latest(n)
+        if len(x) <= self._padlen:
+            return self.output.latest(n)
+        return sosfiltfilt(self.sos, x)
+
 # ==========================================
 # HEART & RESPIRATION RATE CALCULATION
 # ==========================================
@@ -51,6 +130,281 @@ def calculate_respiration_rate(signal, fs=30, prominence=0.1):
     rr = 60 * len(peaks) / duration_sec
     return rr, peaks
 
+
+@lru_cache(maxsize=16)
+def _hann_window(n):
+    return get_window('hann', n)
+
+
+@lru_cache(maxsize=16)
+def _spectrum_bins(nfft, fs, low, high):
+    freqs = np.fft.rfftfreq(nfft, d=1.0 / fs)
+    band = np.flatnonzero((freqs >= low) & (freqs <= high))
+    return freqs, band
+
+
+class SpectralRateEstimator:
+    """
+    Windowed spectral rate estimator (per minute).
+    Welch periodogram over a trailing window, band-limited peak search and
+    parabolic interpolation of the peak bin. Recomputed at update_hz, not
+    every frame; window functions and FFT sizes are cached.
+    """
+
+    def __init__(self, fs=30, low=0.9, high=2.4, window_sec=10, segment_sec=None,
+                 overlap=0.5, pad_factor=4, update_hz=1.0, min_sec=3):
+        self.fs = fs
+        self.low = low
+        self.high = high
+        self.window = int(window_sec * fs)
+        self.segment = int((segment_sec or window_sec) * fs)
+        self.overlap = overlap
+        self.pad_factor = pad_factor
+        self.min_samples = int(min_sec * fs)
+        self.update_every = max(1, int(round(fs / update_hz)))
+
+        self._samples_since_update = self.update_every
+        self.rate = 0
+        self.freq = 0.0
+        self.psd = None
+        self.freqs = None
+
+    def estimate(self, signal):
+        """
+        Estimate the rate from the trailing window right now.
+        Returns (rate_per_min, peak_freq_hz).
+        """
+        x = np.asarray(signal, dtype=float)[-self.window:]
+        if len(x) < self.min_samples:
+            return 0, 0.0
+
+        nperseg = min(self.segment, len(x))
+        step = max(1, int(nperseg * (1 - self.overlap)))
+        segments = sliding_window_view(x, nperseg)[::step]
+        segments = segments - segments.mean(axis=1, keepdims=True)
+
+        nfft = next_fast_len(self.pad_factor * nperseg)
+        freqs, band = _spectrum_bins(nfft, self.fs, self.low, self.high)
+        spectrum = np.fft.rfft(segments * _hann_window(nperseg), n=nfft, axis=1)
+        psd = np.mean(np.abs(spectrum) ** 2, axis=0)
+        self.psd, self.freqs = psd, freqs
+
+        if band.size == 0 or np.max(psd[band]) <= 1e-12:
+            return 0, 0.0
+        k = band[np.argmax(psd[band])]
+
+        # Interpolasi parabola pada log-power di sekitar puncak
+        offset = 0.0
+        if 0 < k < len(psd) - 1:
+            a, b, c = np.log(psd[k - 1:k + 2] + 1e-20)
+            denom = a - 2 * b + c
+            if denom != 0:
+                offset = float(np.clip(0.5 * (a - c) / denom, -0.5, 0.5))
+        freq = float((k + offset) * self.fs / nfft)
+        return 60.0 * freq, freq
+
+    def update(self, signal, n_new):
+        """
+        Throttled estimate: only recomputed every fs / update_hz new
+        samples, otherwise the last value is returned.
+        n_new: number of samples appended to `signal` since the last call.
+        """
+        self._samples_since_update += n_new
+        if self._samples_since_update >= self.update_every:
+            self._samples_since_update = 0
+            self.rate, self.freq = self.estimate(signal)
+        return self.rate
+
+    def reset(self):
+        self._samples_since_update = self.update_every
+        self.rate = 0
+        self.freq = 0.0
+        self.psd = self.freqs = None
+
+# ==========================================
+# POS (PLANE-ORTHOGONAL-TO-SKIN)
+# ==========================================
+
+POS_PROJECTION = np.array([[0, 1, -1], [-2, 1, 1]])
+
+
+def compute_pos(signal, fps=30, window_sec=1.6, eps=1e-9, chunk_size=4096):
+    """
+    Batch POS over a full recording, all windows at once.
+    signal: (e, 3, f) RGB traces, one row per estimator/ROI (or (3, f)).
+    Returns the overlap-added POS signal with shape (e, f).
+    """
+    signal = np.asarray(signal, dtype=float)
+    if signal.ndim == 2:
+        signal = signal[np.newaxis]
+    e, c, f = signal.shape
+    w = int(window_sec * fps)
+    H = np.zeros((e, f))
+    if f <= w:
+        return H
+
+    # Jendela ke-k mencakup sampel k+1 .. k+w (sama seperti loop n = w .. f-1)
+    windows = sliding_window_view(signal, w, axis=2)[:, :, 1:]
+    n_windows = f - w
+    offsets = np.arange(w)
+    rows = np.arange(e)[:, np.newaxis, np.newaxis]
+
+    for start in range(0, n_windows, chunk_size):
+        stop = min(start + chunk_size, n_windows)
+        k = stop - start
+        Cn = windows[:, :, start:stop]                   # (e, 3, k, w)
+        M = 1.0 / (np.mean(Cn, axis=3) + eps)
+        Cn = np.expand_dims(M, axis=3) * Cn
+        S = np.tensordot(POS_PROJECTION, Cn, axes=([1], [1]))  # (2, e, k, w)
+        S1, S2 = S[0], S[1]
+        alpha = np.std(S1, axis=2) / (np.std(S2, axis=2) + eps)
+        Hn = S1 + np.expand_dims(alpha, axis=2) * S2
+        Hn -= np.mean(Hn, axis=2, keepdims=True)
+
+        # Overlap-add semua jendela dalam satu scatter
+        span = k + w - 1
+        local = np.arange(k)[:, np.newaxis] + offsets  # (k, w)
+        flat = (rows * span + local).ravel()
+        H[:, start + 1:start + 1 + span] += np.bincount(
+            flat, weights=Hn.ravel(), minlength=e * span).reshape(e, span)
+
+    return H
+
+
+class IncrementalPOS:
+    """
+    Streaming POS projection.
+    Each new RGB sample only processes the newest window (O(w) per frame),
+    and the overlap-add output matches the batch compute_pos over the
+    retained history (the last capacity_sec seconds).
+    """
+
+    def __init__(self, fps=30, n_estimators=1, window_sec=1.6, eps=1e-9, capacity_sec=60):
+        self.fps = fps
+        self.eps = eps
+        self.n_estimators = n_estimators
+        self.window = int(window_sec * fps)
+
+        # Sampel RGB terakhir (w sampel) dan output overlap-add H
+        self._rgb_window = np.zeros((n_estimators, 3, self.window))
+        self._H = RingBuffer(max(capacity_sec, 2 * window_sec), fps=fps, shape=(n_estimators,))
+        self.count = 0
+
+        # State jendela terakhir
+        self.last_mean = np.zeros((n_estimators, 3))
+        self.last_alpha = np.zeros(n_estimators)
+
+    def __len__(self):
+        return len(self._H)
+
+    def reset(self):
+        self._rgb_window[:] = 0
+        self._H.clear()
+        self.count = 0
+        self.last_mean[:] = 0
+        self.last_alpha[:] = 0
+
+    def update(self, rgb):
+        """
+        Push one RGB sample, shape (3,) or (n_estimators, 3).
+        Returns the POS sample that just became final (no later window
+        overlaps it), shape (n_estimators,), or None while warming up.
+        """
+        rgb = np.asarray(rgb, dtype=float).reshape(self.n_estimators, 3)
+        w = self.window
+
+        self._rgb_window[:, :, :-1] = self._rgb_window[:, :, 1:]
+        self._rgb_window[:, :, -1] = rgb
+
+        n = self.count
+        self.count += 1
+        self._H.append(0.0)
+
+        # Jendela pertama pada batch POS berakhir di indeks n = w
+        if n < w:
+            return None
+
+        Hn = self._project(self._rgb_window)
+        window = self._H.latest(w)
+        window[:] += Hn.T
+        return window[0].copy()
+
+    def _project(self, Cn):
+        eps = self.eps
+        mean = np.mean(Cn, axis=2)
+        M = np.expand_dims(1.0 / (mean + eps), axis=2)
+        Cn = np.multiply(M, Cn)
+        S = np.einsum('ij,ejt->eit', POS_PROJECTION, Cn)
+        S1, S2 = S[:, 0, :], S[:, 1, :]
+        alpha = np.std(S1, axis=1) / (np.std(S2, axis=1) + eps)
+        Hn = S1 + np.expand_dims(alpha, axis=1) * S2
+        Hn -= np.expand_dims(np.mean(Hn, axis=1), axis=1)
+
+        self.last_mean = mean
+        self.last_alpha = alpha
+        return Hn
+
+    def get_signal(self):
+        """
+        Overlap-add POS output (view), shape (n_estimators, n_retained).
+        """
+        return self._H.latest().T
+
+# ==========================================
+# RESAMPLING
+# ==========================================
+
+
+class UniformResampler:
+    """
+    Streaming linear-interpolation resampler from irregularly timed samples
+    onto a uniform grid at `fs` Hz (grid origin = first timestamp).
+
+    push(t, value) returns every grid sample in (previous t, t] as an array
+    of shape (n,) + shape: usually one, zero when frames arrive faster than
+    fs, several (interpolated in one vectorized step) after a dropped or
+    late frame. A gap longer than `max_gap_sec` restarts the grid at the new
+    sample instead of interpolating across it.
+    """
+
+    def __init__(self, fs=30, shape=(), max_gap_sec=1.0):
+        self.fs = fs
+        self.shape = tuple(shape)
+        self.max_gap_sec = max_gap_sec
+        self.resets = 0
+        self._empty = np.empty((0,) + self.shape)
+        self.reset()
+
+    def reset(self):
+        self._origin = None
+        self._k = 0          # indeks grid berikutnya yang belum dikeluarkan
+        self._t = None
+        self._value = None
+
+    def push(self, t, value):
+        value = np.asarray(value, dtype=float).reshape(self.shape)
+        if self._t is not None and t <= self._t:
+            # Timestamp ganda / mundur: tidak ada informasi waktu baru
+            return self._empty
+        if self._t is None or t - self._t > self.max_gap_sec:
+            if self._t is not None:
+                self.resets += 1
+            self._origin, self._k = t, 1
+            self._t, self._value = t, value
+            return value[np.newaxis].copy()
+
+        # Toleransi kecil agar timestamp yang tepat di grid (i / fps) tidak terlewat
+        last_k = int(np.floor((t - self._origin) * self.fs + 1e-6))
+        n = last_k - self._k + 1
+        out = self._empty
+        if n > 0:
+            tg = self._origin + np.arange(self._k, last_k + 1) / self.fs
+            w = np.clip((tg - self._t) / (t - self._t), 0.0, 1.0).reshape((n,) + (1,) * len(self.shape))
+            out = self._value + w * (value - self._value)
+            self._k = last_k + 1
+        self._t, self._value = t, value
+        return out
+
 # ==========================================
 # UTILITY
 # ==========================================
@@ -0,0 +1,430 @@
+# stream_server.py
+#
+# Mode headless (tanpa Tk) berbasis asyncio: frame dari kamera, file video,
+# atau dikirim lewat socket lokal diproses, lalu HR/RR dan potongan sinyal
+# dikirim ke subscriber lewat TCP (JSON per baris) atau WebSocket.
+#   python stream_server.py --source 0 --ndjson-port 8765 --ws-port 8766
+#   python stream_server.py --source push --push-port 8767 --fps 30
+
+import argparse
+import asyncio
+import base64
+import concurrent.futures
+import hashlib
+import json
+import struct
+import time
+
+import cv2
+import numpy as np
+
+from capture import LatestFrameCapture, RateMeter
+from frame_context import FrameContext
+from rppg_processor import RPPGProcessor
+from respirasi_processor import RespirasiProcessor
+from parallel_inference import InferenceRunner
+
+WS_GUID = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+PUSH_HEADER = struct.Struct("!I")
+
+
+class ClientQueue:
+    """
+    Bounded per-connection send queue. When full the oldest message is
+    dropped, so a slow client only loses data and never blocks the
+    processing loop.
+    """
+
+    def __init__(self, maxsize=100):
+        self._queue = asyncio.Queue(maxsize=maxsize)
+        self.dropped = 0
+
+    def put(self, message):
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(message)
+
+    async def get(self):
+        return await self._queue.get()
+
+
+class ResultHub:
+    """
+    Fan-out of result messages to all connected subscribers.
+    """
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self.clients = set()
+
+    def subscribe(self):
+        client = ClientQueue(self.queue_size)
+        self.clients.add(client)
+        return client
+
+    def unsubscribe(self, client):
+        self.clients.discard(client)
+
+    def publish(self, message):
+        # Serialisasi sekali untuk semua client
+        line = json.dumps(message)
+        for client in self.clients:
+            client.put(line)
+
+
+def encode_push_frame(frame, ext=".jpg"):
+    """
+    Frame BGR -> bytes siap kirim ke push socket (panjang 4 byte + gambar terenkode).
+    """
+    ok, data = cv2.imencode(ext, frame)
+    if not ok:
+        raise ValueError("Gagal mengenkode frame")
+    return PUSH_HEADER.pack(len(data)) + data.tobytes()
+
+
+def _ws_frame(payload, opcode=0x1):
+    header = bytearray([0x80 | opcode])
+    n = len(payload)
+    if n < 126:
+        header.append(n)
+    elif n < 65536:
+        header.append(126)
+        header += struct.pack("!H", n)
+    else:
+        header.append(127)
+        header += struct.pack("!Q", n)
+    return bytes(header) + payload
+
+
+async def _ws_read_frame(reader):
+    """
+    Baca satu frame dari client (selalu ter-mask). Returns (opcode, payload).
+    """
+    b0, b1 = await reader.readexactly(2)
+    n = b1 & 0x7F
+    if n == 126:
+        n = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif n == 127:
+        n = struct.unpack("!Q", await reader.readexactly(8))[0]
+    mask = await reader.readexactly(4) if b1 & 0x80 else b"\0\0\0\0"
+    data = np.frombuffer(await reader.readexactly(n), dtype=np.uint8)
+    key = np.frombuffer(mask * (n // 4 + 1), dtype=np.uint8)[:n]
+    return b0 & 0x0F, (data ^ key).tobytes()
+
+
+class StreamServer:
+    """
+    Headless processing service.
+
+    source: camera index, video path, or "push" (frames arrive on
+    push_port as length-prefixed JPEG/PNG). Processing runs on a single
+    worker thread so the event loop only handles I/O. Every
+    `rate_interval` seconds subscribers get {"type": "rates", ...}; every
+    `chunk_interval` seconds {"type": "signal", ...} carries the filtered
+    rPPG and respiration samples produced since the previous chunk.
+    """
+
+    def __init__(self, source, host="127.0.0.1", ndjson_port=8765, ws_port=None, push_port=None,
+                 fps=None, realtime=False, queue_size=100, rate_interval=0.2, chunk_interval=1.0,
+                 rppg_kwargs=None, resp_kwargs=None):
+        if isinstance(source, str) and source.isdigit():
+            source = int(source)
+        if source == "push" and push_port is None:
+            raise ValueError("source='push' membutuhkan push_port")
+        self.source = source
+        self.host = host
+        self.ndjson_port = ndjson_port
+        self.ws_port = ws_port
+        self.push_port = push_port
+        self.fps = fps
+        self.realtime = realtime
+        self.rate_interval = rate_interval
+        self.chunk_interval = chunk_interval
+        self.rppg_kwargs = rppg_kwargs or {}
+        self.resp_kwargs = resp_kwargs or {}
+
+        self.hub = ResultHub(queue_size)
+        self.meter = RateMeter()
+        self.frames = 0
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="rppg")
+        self._servers = []
+        self._handlers = set()   # task koneksi client yang masih terbuka
+        self._cap = None
+        self._push_queue = None
+        self._stopping = False
+        self._last_rates = 0.0
+        self._last_chunk = 0.0
+        self._sent_totals = {"rppg": 0, "resp": 0}
+
+    # ===== Sumber frame =====
+
+    def _open_source(self):
+        if self.source == "push":
+            self._push_queue = asyncio.Queue(maxsize=2)
+            self.fps = self.fps or 30
+            return None
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            raise IOError(f"Tidak bisa membuka sumber: {self.source}")
+        file_fps = cap.get(cv2.CAP_PROP_FPS)
+        self.fps = self.fps or (file_fps if file_fps and file_fps > 0 else 30)
+        return cap
+
+    async def _frames(self, cap):
+        loop = asyncio.get_running_loop()
+        if self.source == "push":
+            while not self._stopping:
+                ctx = await self._push_queue.get()
+                if ctx is None:
+                    return
+                yield ctx
+        elif isinstance(self.source, int):
+            capture = LatestFrameCapture(cap).start()
+            try:
+                while not self._stopping and capture.running:
+                    ctx = await loop.run_in_executor(None, capture.read, 0.2)
+                    if ctx is not None:
+                        yield ctx
+            finally:
+                capture.close()
+        else:
+            index = 0
+            t_start = time.monotonic()
+            try:
+                while not self._stopping:
+                    ret, frame = await loop.run_in_executor(None, cap.read)
+                    if not ret:
+                        return
+                    if self.realtime:
+                        await asyncio.sleep(max(0.0, t_start + index / self.fps - time.monotonic()))
+                    yield FrameContext(frame, index=index, timestamp=index / self.fps)
+                    index += 1
+            finally:
+                cap.release()
+
+    async def _handle_push(self, reader, writer):
+        index = 0
+        try:
+            while not self._stopping:
+                (size,) = PUSH_HEADER.unpack(await reader.readexactly(PUSH_HEADER.size))
+                data = np.frombuffer(await reader.readexactly(size), dtype=np.uint8)
+                frame = cv2.imdecode(data, cv2.IMREAD_COLOR)
+                if frame is None:
+                    continue
+                # Latest-frame: jika pemrosesan tertinggal, frame terlama dibuang
+                if self._push_queue.full():
+                    self._push_queue.get_nowait()
+                self._push_queue.put_nowait(FrameContext(frame, index=index, timestamp=time.monotonic()))
+                index += 1
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    # ===== Pemrosesan =====
+
+    def _process(self, ctx):
+        """
+        Runs on the worker thread; returns the messages to publish.
+        """
+        self.runner.process(ctx)
+        self.frames += 1
+        self.meter.tick()
+
+        messages = []
+        now = time.monotonic()
+        if now - self._last_rates >= self.rate_interval:
+            self._last_rates = now
+            messages.append({
+                "type": "rates", "frame": ctx.index, "t": ctx.timestamp,
+                "hr": float(self.rppg.get_heart_rate()),
+                "rr": float(self.resp.get_respiration_rate()),
+                "fps": self.meter.rate,
+            })
+        if now - self._last_chunk >= self.chunk_interval:
+            self._last_chunk = now
+            messages.append(self._signal_chunk(ctx.index, ctx.timestamp))
+        return messages
+
+    def _signal_chunk(self, frame_index, timestamp):
+        """
+        Sampel sinyal terfilter yang belum terkirim sejak chunk sebelumnya.
+        """
+        chunk = {"type": "signal", "frame": frame_index, "t": timestamp, "fs": self.fps}
+        for key, buf in (("rppg", self.rppg.rppg_filter.output), ("resp", self.resp.resp_filter.output)):
+            n_new = min(buf.total - self._sent_totals[key], len(buf))
+            self._sent_totals[key] = buf.total
+            chunk[key] = np.round(buf.latest(n_new), 6).tolist() if n_new > 0 else []
+        return chunk
+
+    # ===== Subscriber =====
+
+    async def _send_loop(self, client, write):
+        while True:
+            await write(await client.get())
+
+    async def _handle_ndjson(self, reader, writer):
+        client = self.hub.subscribe()
+
+        async def write(line):
+            writer.write(line.encode() + b"\n")
+            await writer.drain()
+
+        try:
+            await write(json.dumps(self._hello()))
+            await self._send_loop(client, write)
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.hub.unsubscribe(client)
+            writer.close()
+
+    async def _handle_ws(self, reader, writer):
+        try:
+            request = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            writer.close()
+            return
+        headers = {}
+        for line in request.decode(errors="replace").split("\r\n")[1:]:
+            if ":" in line:
+                k, v = line.split(":", 1)
+                headers[k.strip().lower()] = v.strip()
+        key = headers.get("sec-websocket-key")
+        if not key:
+            writer.write(b"HTTP/1.1 400 Bad Request\r\nContent-Length: 0\r\n\r\n")
+            writer.close()
+            return
+        accept = base64.b64encode(hashlib.sha1(key.encode() + WS_GUID).digest()).decode()
+        writer.write(("HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\n"
+                      f"Connection: Upgrade\r\nSec-WebSocket-Accept: {accept}\r\n\r\n").encode())
+
+        client = self.hub.subscribe()
+
+        async def write(line):
+            writer.write(_ws_frame(line.encode()))
+            await writer.drain()
+
+        sender = asyncio.ensure_future(self._send_loop(client, write))
+        try:
+            await write(json.dumps(self._hello()))
+            # Baca frame client hanya untuk ping/close
+            while not sender.done():
+                opcode, payload = await _ws_read_frame(reader)
+                if opcode == 0x8:
+                    writer.write(_ws_frame(payload[:2], opcode=0x8))
+                    break
+                if opcode == 0x9:
+                    writer.write(_ws_frame(payload, opcode=0xA))
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            sender.cancel()
+            self.hub.unsubscribe(client)
+            writer.close()
+
+    def _tracked(self, handler):
+        """
+        Catat task handler koneksi agar stop() bisa membatalkannya.
+        """
+        async def run(reader, writer):
+            task = asyncio.current_task()
+            self._handlers.add(task)
+            try:
+                await handler(reader, writer)
+            finally:
+                self._handlers.discard(task)
+        return run
+
+    def _hello(self):
+        return {"type": "hello", "source": str(self.source), "fps": self.fps}
+
+    # ===== Siklus hidup =====
+
+    async def start(self):
+        self._cap = self._open_source()
+        rppg_kwargs = dict(self.rppg_kwargs)
+        rppg_kwargs.setdefault("fps", self.fps)
+        resp_kwargs = dict(self.resp_kwargs)
+        resp_kwargs.setdefault("fps", self.fps)
+        self.rppg = RPPGProcessor(**rppg_kwargs)
+        self.resp = RespirasiProcessor(**resp_kwargs)
+        self.runner = InferenceRunner(self.rppg, self.resp, mode="inprocess")
+
+        if self.ndjson_port is not None:
+            self._servers.append(await asyncio.start_server(self._tracked(self._handle_ndjson),
+                                                            self.host, self.ndjson_port))
+        if self.ws_port is not None:
+            self._servers.append(await asyncio.start_server(self._tracked(self._handle_ws), self.host, self.ws_port))
+        if self.push_port is not None:
+            self._servers.append(await asyncio.start_server(self._tracked(self._handle_push),
+                                                            self.host, self.push_port))
+        return self
+
+    @property
+    def ports(self):
+        """
+        Port yang benar-benar dipakai (berguna jika port 0 = dipilih OS).
+        """
+        return [s.sockets[0].getsockname()[1] for s in self._servers]
+
+    async def run(self):
+        """
+        Process frames until the source ends or stop() is called.
+        """
+        if not self._servers:
+            await self.start()
+        loop = asyncio.get_running_loop()
+        try:
+            async for ctx in self._frames(self._cap):
+                for message in await loop.run_in_executor(self._executor, self._process, ctx):
+                    self.hub.publish(message)
+            self.hub.publish(self._signal_chunk(self.frames - 1, None))
+            self.hub.publish({"type": "end", "frames": self.frames})
+            # Beri kesempatan sender menghabiskan queue
+            await asyncio.sleep(0.1)
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        self._stopping = True
+        if self._push_queue is not None and not self._push_queue.full():
+            self._push_queue.put_nowait(None)
+        for server in self._servers:
+            server.close()
+        # Handler subscriber tidak pernah selesai sendiri; sejak Python 3.12
+        # wait_closed() menunggu semua koneksi, jadi batalkan dulu
+        handlers = list(self._handlers)
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+        for server in self._servers:
+            await server.wait_closed()
+        self._servers = []
+        self._executor.shutdown(wait=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Server headless HR/RR (TCP JSON per baris / WebSocket)")
+    parser.add_argument("--source", default="0", help="indeks kamera, path video, atau 'push'")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--ndjson-port", type=int, default=8765)
+    parser.add_argument("--ws-port", type=int, default=None)
+    parser.add_argument("--push-port", type=int, default=None)
+    parser.add_argument("--fps", type=float, default=None)
+    parser.add_argument("--realtime", action="store_true", help="putar file video dengan laju aslinya")
+    parser.add_argument("--queue-size", type=int, default=100, help="batas antrean kirim per koneksi")
+    args = parser.parse_args(argv)
+
+    server = StreamServer(args.source, host=args.host, ndjson_port=args.ndjson_port,
+                          ws_port=args.ws_port, push_port=args.push_port, fps=args.fps,
+                          realtime=args.realtime, queue_size=args.queue_size)
+    try:
+        asyncio.run(server.run())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
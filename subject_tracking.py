@@ -0,0 +1,143 @@
+# subject_tracking.py
+
+import numpy as np
+import cv2
+
+
+def box_iou(a, b):
+    """
+    Pairwise IoU between boxes a (n, 4) and b (m, 4) as (x1, y1, x2, y2).
+    Returns an (n, m) matrix.
+    """
+    a = np.asarray(a, dtype=float).reshape(-1, 4)
+    b = np.asarray(b, dtype=float).reshape(-1, 4)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+def roi_means(bgr, rects):
+    """
+    Mean (R, G, B) of several rectangles in one pass over the frame.
+
+    A single integral image is built over the bounding region of all ROIs,
+    after which every ROI sum costs four lookups, so the cost barely grows
+    with the number of subjects.
+    rects: (n, 4) as (x1, y1, x2, y2) in pixels. Empty ROIs give zeros.
+    Returns an (n, 3) float array in RGB order.
+    """
+    rects = np.asarray(rects, dtype=np.intp).reshape(-1, 4)
+    if len(rects) == 0:
+        return np.zeros((0, 3))
+    h, w = bgr.shape[:2]
+    x1 = np.clip(rects[:, 0], 0, w)
+    y1 = np.clip(rects[:, 1], 0, h)
+    x2 = np.maximum(np.clip(rects[:, 2], 0, w), x1)
+    y2 = np.maximum(np.clip(rects[:, 3], 0, h), y1)
+
+    # Integral hanya pada area gabungan semua ROI
+    ox, oy = x1.min(), y1.min()
+    crop = bgr[oy:max(y2.max(), oy + 1), ox:max(x2.max(), ox + 1)]
+    integral = cv2.integral(crop, sdepth=cv2.CV_64F)
+    x1, x2, y1, y2 = x1 - ox, x2 - ox, y1 - oy, y2 - oy
+    sums = integral[y2, x2] - integral[y1, x2] - integral[y2, x1] + integral[y1, x1]
+    area = ((x2 - x1) * (y2 - y1)).astype(float)
+    means = np.zeros((len(rects), 3))
+    valid = area > 0
+    means[valid] = sums[valid] / area[valid, None]
+    # BGR -> RGB
+    return means[:, ::-1]
+
+
+class SubjectTracker:
+    """
+    Associates per-frame face boxes with stable subject IDs.
+
+    Boxes are matched greedily by IoU first; boxes left over are matched by
+    centroid distance (relative to the face size) so a fast head move that
+    drops the IoU does not spawn a new subject. A subject that is not seen
+    for more than `max_missing` frames is removed; new IDs are only handed
+    out while fewer than `max_subjects` are active.
+    """
+
+    def __init__(self, max_subjects=4, iou_threshold=0.3, centroid_gate=0.5, max_missing=30):
+        self.max_subjects = max_subjects
+        self.iou_threshold = iou_threshold
+        self.centroid_gate = centroid_gate
+        self.max_missing = max_missing
+        self.boxes = {}     # subject_id -> (x1, y1, x2, y2)
+        self.missing = {}   # subject_id -> frame berturut-turut tidak terlihat
+        self._next_id = 0
+
+    def __len__(self):
+        return len(self.boxes)
+
+    def update(self, boxes):
+        """
+        boxes: list of (x1, y1, x2, y2). Returns (ids, removed): ids[i] is
+        the subject ID of boxes[i] (None if over capacity), removed lists
+        the IDs dropped in this call.
+        """
+        boxes = [tuple(b) for b in boxes]
+        ids = [None] * len(boxes)
+        known = list(self.boxes)
+
+        if boxes and known:
+            det = np.asarray(boxes, dtype=float)
+            ref = np.asarray([self.boxes[k] for k in known], dtype=float)
+            iou = box_iou(ref, det)
+
+            # Jarak pusat dinormalisasi diagonal kotak subjek
+            c_ref = (ref[:, :2] + ref[:, 2:]) / 2
+            c_det = (det[:, :2] + det[:, 2:]) / 2
+            diag = np.maximum(np.hypot(ref[:, 2] - ref[:, 0], ref[:, 3] - ref[:, 1]), 1.0)
+            dist = np.linalg.norm(c_ref[:, None] - c_det[None], axis=2) / diag[:, None]
+
+            used_ref, used_det = set(), set()
+            for score, gate, better in ((iou, self.iou_threshold, -1), (dist, self.centroid_gate, 1)):
+                order = np.argsort(better * score, axis=None)
+                for flat in order:
+                    i, j = divmod(int(flat), len(boxes))
+                    if i in used_ref or j in used_det:
+                        continue
+                    value = score[i, j]
+                    if (better < 0 and value < gate) or (better > 0 and value > gate):
+                        break
+                    used_ref.add(i)
+                    used_det.add(j)
+                    ids[j] = known[i]
+
+        for j, sid in enumerate(ids):
+            if sid is not None:
+                self.boxes[sid] = boxes[j]
+                self.missing[sid] = 0
+
+        removed = []
+        seen = set(i for i in ids if i is not None)
+        for sid in known:
+            if sid not in seen:
+                self.missing[sid] += 1
+                if self.missing[sid] > self.max_missing:
+                    removed.append(sid)
+        for sid in removed:
+            del self.boxes[sid]
+            del self.missing[sid]
+
+        for j, sid in enumerate(ids):
+            if sid is None and len(self.boxes) < self.max_subjects:
+                sid = self._next_id
+                self._next_id += 1
+                self.boxes[sid] = boxes[j]
+                self.missing[sid] = 0
+                ids[j] = sid
+        return ids, removed
+
+    def reset(self):
+        self.boxes = {}
+        self.missing = {}
@@ -0,0 +1,8 @@
+# tests/conftest.py
+#
+# Modul proyek berada di root repo (layout datar).
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
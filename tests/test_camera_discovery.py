@@ -0,0 +1,89 @@
+# tests/test_camera_discovery.py
+#
+# CameraDiscovery dengan FakeDeviceProvider: enumerasi di thread latar,
+# cache kapabilitas antar refresh, dan error provider.
+
+import threading
+
+from camera_discovery import CameraDiscovery, FakeDeviceProvider
+
+DEVICES = [
+    {"id": 0, "name": "Kamera Depan", "modes": [(640, 480, 30.0), (1280, 720, 30.0)]},
+    {"id": 2, "modes": [(1920, 1080, 60.0)]},
+]
+
+
+class FailingProvider(FakeDeviceProvider):
+    def list_devices(self):
+        raise OSError("perangkat tidak bisa dibaca")
+
+
+def test_background_discovery():
+    provider = FakeDeviceProvider(DEVICES, delay=0.2)
+    discovery = CameraDiscovery(provider=provider).start()
+    assert not discovery.done
+    assert discovery.devices == []
+
+    devices = discovery.wait(timeout=5)
+    assert discovery.done
+    assert discovery.error is None
+    assert [d["id"] for d in devices] == [0, 2]
+    assert devices[0]["name"] == "Kamera Depan"
+    assert devices[1]["name"] == "Kamera 2"
+    assert devices[0]["modes"] == [(640, 480, 30.0), (1280, 720, 30.0)]
+    assert devices[1]["modes"] == [(1920, 1080, 60.0)]
+
+
+def test_callback_runs_after_done():
+    received = []
+    finished = threading.Event()
+
+    def callback(devices):
+        received.append(devices)
+        finished.set()
+
+    CameraDiscovery(provider=FakeDeviceProvider(DEVICES)).start(callback)
+    assert finished.wait(5)
+    assert [d["id"] for d in received[0]] == [0, 2]
+
+
+def test_capabilities_cached_across_refreshes():
+    provider = FakeDeviceProvider(DEVICES)
+    discovery = CameraDiscovery(provider=provider)
+    discovery.start().wait(timeout=5)
+    assert provider.capability_calls == 2
+
+    discovery.start().wait(timeout=5)
+    assert provider.list_calls == 2
+    assert provider.capability_calls == 2
+    assert discovery.devices[1]["modes"] == [(1920, 1080, 60.0)]
+
+    # Perangkat baru diprobe, yang lama tetap dari cache
+    provider.devices.append({"id": 4, "modes": [(320, 240, 15.0)]})
+    discovery.start().wait(timeout=5)
+    assert provider.capability_calls == 3
+
+    discovery.invalidate(discovery.devices[0])
+    discovery.start().wait(timeout=5)
+    assert provider.capability_calls == 4
+
+
+def test_list_only_does_not_probe():
+    provider = FakeDeviceProvider(DEVICES)
+    devices = CameraDiscovery(provider=provider, probe_capabilities=False).start().wait(timeout=5)
+    assert provider.capability_calls == 0
+    assert [d["modes"] for d in devices] == [[], []]
+
+
+def test_provider_error_reported():
+    provider = FailingProvider(DEVICES)
+    discovery = CameraDiscovery(provider=provider).start()
+    assert discovery.wait(timeout=5) == []
+    assert discovery.done
+    assert isinstance(discovery.error, OSError)
+
+    # Refresh yang berhasil menghapus error sebelumnya
+    discovery.provider = FakeDeviceProvider(DEVICES)
+    discovery.start().wait(timeout=5)
+    assert discovery.error is None
+    assert len(discovery.devices) == 2
@@ -0,0 +1,31 @@
+# tests/test_frame_timestamps.py
+#
+# Array BGR mentah (tanpa timestamp capture) tetap diproses satu sampel per
+# frame; hanya frame bertimestamp yang melewati resampler.
+
+from benchmarks.synthetic import SyntheticVideo
+from frame_context import FrameContext
+from rppg_processor import RPPGProcessor
+
+
+def _run(video, wrap):
+    rppg = RPPGProcessor(fps=video.fps)
+    for i in range(len(video)):
+        rppg.process_face_box(wrap(video.frame(i), i), video.face_box(i))
+    return rppg
+
+
+def test_raw_array_has_no_timestamp():
+    video = SyntheticVideo(duration_sec=1, width=320, height=240)
+    assert FrameContext.wrap(video.frame(0)).timestamp is None
+
+
+def test_raw_array_one_sample_per_frame():
+    video = SyntheticVideo(hr_bpm=72, fps=30, duration_sec=30, width=320, height=240, seed=0)
+    raw = _run(video, lambda frame, i: frame)
+    stamped = _run(video, lambda frame, i: FrameContext(frame, index=i, timestamp=i / video.fps))
+
+    assert len(raw.rgb_uniform) == len(video)
+    assert len(stamped.rgb_uniform) == len(video)
+    assert abs(raw.get_heart_rate() - 72) < 6
+    assert abs(raw.get_heart_rate() - stamped.get_heart_rate()) < 1e-6
@@ -0,0 +1,49 @@
+# tests/test_pos.py
+#
+# IncrementalPOS (streaming) harus sama dengan compute_pos (batch) pada
+# histori yang tersimpan, termasuk setelah ring buffer berputar.
+
+import numpy as np
+
+from signal_utils import IncrementalPOS, compute_pos
+
+
+def _rgb_trace(n, n_estimators=1, fps=30, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n) / fps
+    pulse = np.sin(2 * np.pi * 1.2 * t)
+    base = np.array([150.0, 110.0, 90.0])[:, np.newaxis]
+    trace = base + np.array([0.3, 0.6, 0.2])[:, np.newaxis] * pulse + rng.normal(0, 0.5, (3, n))
+    return np.stack([trace + 5 * e for e in range(n_estimators)])   # (e, 3, n)
+
+
+def _stream(signal, fps=30, capacity_sec=60):
+    pos = IncrementalPOS(fps=fps, n_estimators=signal.shape[0], capacity_sec=capacity_sec)
+    finals = []
+    for i in range(signal.shape[2]):
+        final = pos.update(signal[:, :, i])
+        if final is not None:
+            finals.append(final)
+    return pos, np.array(finals).T
+
+
+def test_matches_batch_without_wraparound():
+    signal = _rgb_trace(300)
+    pos, finals = _stream(signal)
+    batch = compute_pos(signal)
+
+    np.testing.assert_allclose(pos.get_signal(), batch, rtol=1e-9, atol=1e-9)
+    # Sampel final ke-k = indeks batch k + 1 (sebelum jendela berikut menyentuhnya)
+    np.testing.assert_allclose(finals, batch[:, 1:1 + finals.shape[1]], rtol=1e-9, atol=1e-9)
+
+
+def test_matches_batch_after_wraparound():
+    # capacity 4 s = 120 sampel, 600 sampel -> buffer berputar beberapa kali
+    signal = _rgb_trace(600, n_estimators=2)
+    pos, finals = _stream(signal, capacity_sec=4)
+    batch = compute_pos(signal)
+    retained = pos.get_signal()
+
+    assert retained.shape == (2, 120)
+    np.testing.assert_allclose(retained, batch[:, -120:], rtol=1e-9, atol=1e-9)
+    np.testing.assert_allclose(finals, batch[:, 1:1 + finals.shape[1]], rtol=1e-9, atol=1e-9)
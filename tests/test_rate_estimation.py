@@ -0,0 +1,84 @@
+# tests/test_rate_estimation.py
+#
+# Estimasi rate spektral diperbarui per jumlah sampel seragam, bukan per
+# panggilan, sehingga kadensnya tidak bergantung pada frame yang terbuang.
+
+import numpy as np
+
+from respirasi_processor import RespirasiProcessor
+from rppg_processor import RPPGSignalChain
+from signal_utils import SpectralRateEstimator
+
+
+def _pulse_rgb(t, hr_bpm):
+    pulse = np.sin(2 * np.pi * hr_bpm / 60 * t)
+    return 150 + 0.3 * pulse, 110 + 0.6 * pulse, 90 + 0.2 * pulse
+
+
+def _count_estimates(estimator):
+    calls = []
+    original = estimator.estimate
+
+    def counted(signal):
+        calls.append(len(signal))
+        return original(signal)
+
+    estimator.estimate = counted
+    return calls
+
+
+def test_update_counts_samples_not_calls():
+    est = SpectralRateEstimator(fs=30, update_hz=1.0)
+    calls = _count_estimates(est)
+    signal = np.zeros(300)
+    est.update(signal, 30)          # panggilan pertama selalu menghitung
+    for _ in range(3):
+        est.update(signal, 10)
+    assert len(calls) == 2
+
+
+def test_refresh_cadence_independent_of_dropped_frames():
+    fps, duration = 30, 20
+    counts = {}
+    for step in (1, 2, 3):          # step > 1: hanya tiap frame ke-step yang sampai
+        chain = RPPGSignalChain(fps=fps, hr_method="spectral")
+        calls = _count_estimates(chain.hr_estimator)
+        for i in range(0, duration * fps, step):
+            t = i / fps
+            chain.process_rgb_mean(_pulse_rgb(t, 72), timestamp=t)
+        counts[step] = len(calls)
+        assert abs(chain.heart_rate - 72) < 3
+    # Sekitar satu estimasi per detik sinyal di semua kasus
+    assert max(counts.values()) - min(counts.values()) <= 1
+
+
+def test_heart_rate_follows_change_while_rates_shed():
+    # rate_every = fps / rate_min_hz, seperti FrameScheduler saat "rates" dilepas
+    fps = 30
+    chain = RPPGSignalChain(fps=fps, hr_method="spectral", rate_every=fps)
+    calls = _count_estimates(chain.hr_estimator)
+    history = []
+    for i in range(60 * fps):
+        t = i / fps
+        chain.process_rgb_mean(_pulse_rgb(t, 72 if t < 30 else 96), timestamp=t)
+        history.append(chain.heart_rate)
+    assert abs(history[30 * fps - 1] - 72) < 3
+    assert abs(history[-1] - 96) < 3
+    assert len(calls) >= 50          # tetap sekitar 1 Hz
+
+
+def test_respiration_rate_follows_change_while_rates_shed():
+    fps = 30
+    resp = RespirasiProcessor(fps=fps, rr_method="spectral", rate_every=fps)
+    calls = _count_estimates(resp.rr_estimator)
+    history = []
+    y = 240.0
+    for i in range(90 * fps):
+        t = i / fps
+        rr = 13 if t < 45 else 18
+        y += 2 * np.pi * rr / 60 / fps * 20 * np.cos(2 * np.pi * rr / 60 * t)
+        resp.process_shoulder_pixels(((200, int(round(y))), (440, int(round(y)))), timestamp=t)
+        history.append(resp.respiration_rate)
+    assert abs(history[45 * fps - 1] - 13) < 1.5
+    assert abs(history[-1] - 18) < 1.5
+    assert len(calls) >= 80
@@ -0,0 +1,88 @@
+# tests/test_session_manager.py
+#
+# SessionManager dengan file video sintetis sebagai pengganti kamera:
+# hasil per sesi, result terbuang saat antrean penuh, dan laporan health.
+
+import queue
+import time
+
+import pytest
+
+from benchmarks.synthetic import SyntheticVideo
+from session_manager import SessionConfig, SessionManager, _Session
+
+N_FRAMES = 60
+
+
+@pytest.fixture(scope="module")
+def videos(tmp_path_factory):
+    root = tmp_path_factory.mktemp("sessions")
+    paths = []
+    for name, seed in (("bed1.avi", 0), ("bed2.avi", 1)):
+        video = SyntheticVideo(fps=30, duration_sec=N_FRAMES / 30, width=160, height=120, seed=seed)
+        paths.append(str(video.write(root / name)))
+    return paths
+
+
+def _drain(manager, delay=0.0, timeout=60):
+    messages = []
+    deadline = time.monotonic() + timeout
+    for message in manager.results(include_health=True):
+        messages.append(message)
+        time.sleep(delay)
+        assert time.monotonic() < deadline
+    return messages
+
+
+def test_sessions_from_video_files(videos):
+    with SessionManager(videos, n_workers=2) as manager:
+        messages = _drain(manager)
+        health = manager.health()
+
+    for name in ("bed1.avi", "bed2.avi"):
+        results = [m for m in messages if m["type"] == "result" and m["session"] == name]
+        assert [m["frame"] for m in results] == list(range(N_FRAMES))
+        assert results[-1]["t"] == pytest.approx((N_FRAMES - 1) / 30)
+        assert all(isinstance(m["hr"], float) and isinstance(m["rr"], float) for m in results)
+
+        report = health[name]
+        assert report["state"] == "finished"
+        assert report["error"] is None
+        assert report["frames"] == N_FRAMES
+        assert report["dropped_results"] == 0
+        assert report["fps"] > 0
+    assert {health[name]["worker"] for name in health} == {0, 1}
+
+
+def test_queue_full_drops_results(videos):
+    session = _Session(SessionConfig(videos[0]), worker_id=0)
+    results = queue.Queue(maxsize=5)
+    try:
+        for _ in range(20):
+            assert session.step(results, emit_every=1)
+    finally:
+        session.close()
+    assert results.qsize() == 5
+    assert [results.get_nowait()["frame"] for _ in range(5)] == list(range(5))
+
+    report = session.health()
+    assert report["frames"] == 20
+    assert report["dropped_results"] == 15
+    assert report["state"] == "running"
+
+
+def test_slow_consumer_and_missing_source(videos):
+    configs = [SessionConfig(videos[0]), SessionConfig(videos[1] + ".hilang", name="hilang")]
+    with SessionManager(configs, n_workers=1, queue_size=4) as manager:
+        messages = _drain(manager, delay=0.01)
+        health = manager.health()
+
+    report = health["bed1.avi"]
+    assert report["state"] == "finished"
+    assert report["frames"] == N_FRAMES
+    assert report["dropped_results"] > 0
+    results = [m for m in messages if m["type"] == "result"]
+    assert len(results) + report["dropped_results"] == N_FRAMES
+
+    assert health["hilang"]["state"] == "error"
+    assert "Tidak bisa membuka sumber" in health["hilang"]["error"]
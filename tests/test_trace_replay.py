@@ -0,0 +1,54 @@
+# tests/test_trace_replay.py
+#
+# Trace rekaman dengan Pose yang dilepas FrameScheduler harus di-replay
+# menjadi sinyal respirasi yang sama dengan saat live.
+
+import numpy as np
+
+from benchmarks.synthetic import SyntheticVideo
+from frame_context import FrameContext
+from frame_scheduler import FrameScheduler
+from parallel_inference import InferenceRunner
+from respirasi_processor import RespirasiProcessor
+from rppg_processor import RPPGProcessor
+from trace_io import POSE_SKIPPED, ReplaySource, TraceReader, TraceRecorder
+
+
+class _GroundTruthRPPG(RPPGProcessor):
+    def __init__(self, video, **kwargs):
+        super().__init__(**kwargs)
+        self.video = video
+
+    def extract_rgb_from_frame(self, ctx):
+        self.process_face_box(ctx, self.video.face_box(ctx.index))
+
+
+class _GroundTruthResp(RespirasiProcessor):
+    def __init__(self, video, **kwargs):
+        super().__init__(**kwargs)
+        self.video = video
+
+    def extract_resp_from_frame(self, ctx):
+        self.process_shoulders(ctx, self.video.shoulders(ctx.index))
+
+
+def test_shed_record_replays_like_live(tmp_path):
+    video = SyntheticVideo(fps=30, duration_sec=10, width=320, height=240, seed=0)
+    rppg = _GroundTruthRPPG(video, fps=30)
+    resp = _GroundTruthResp(video, fps=30)
+    # Pose selalu dilepas: hanya berjalan tiap 1/pose_min_hz detik
+    scheduler = FrameScheduler(rppg, resp, budget_sec=0.0, cooldown_frames=10 ** 6)
+    scheduler.level = 2
+    with TraceRecorder(str(tmp_path / "trace"), fps=30) as recorder:
+        runner = InferenceRunner(rppg, resp, mode="inprocess", recorder=recorder, scheduler=scheduler)
+        for i in range(len(video)):
+            runner.process(FrameContext(video.frame(i), index=i, timestamp=video.time(i)))
+    assert 0 < scheduler.counts["pose_skipped"] < len(video)
+
+    reader = TraceReader(str(tmp_path / "trace"))
+    skipped = sum(1 for *_, shoulders in reader if shoulders == POSE_SKIPPED)
+    assert skipped == scheduler.counts["pose_skipped"]
+
+    replayed = RespirasiProcessor(fps=30)
+    ReplaySource(reader).replay(resp=replayed)
+    np.testing.assert_allclose(replayed.get_signal(), resp.get_signal())
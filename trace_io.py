@@ -0,0 +1,235 @@
+# trace_io.py
+#
+# Rekaman trace per frame (rata-rata RGB ROI, kotak jidat, titik bahu,
+# timestamp) dalam format biner kompak: satu folder berisi index.json dan
+# chunk kolom .npy yang dibaca ulang dengan memory-map. Replay memberi
+# makan tahap sinyal langsung, tanpa decode video dan tanpa model.
+
+import json
+import os
+import time
+
+import numpy as np
+
+TRACE_VERSION = 1
+
+# nama kolom -> (dtype, shape per frame)
+TRACE_COLUMNS = {
+    "frame": ("int64", ()),
+    "time": ("float64", ()),
+    "rgb": ("float64", (3,)),
+    "roi": ("int32", (4,)),
+    "shoulders": ("int32", (2, 2)),
+    "shoulders_valid": ("bool", ()),
+}
+
+# Nilai shoulders untuk frame yang tidak menjalankan Pose (mis. dilepas
+# FrameScheduler): disimpan sebagai shoulders_valid=False dengan titik -1,
+# dan saat replay frame tersebut tidak diumpankan ke RespirasiProcessor
+# (sama seperti saat live, resampler mengisi celahnya)
+POSE_SKIPPED = "pose_skipped"
+
+
+def _pose_skipped(shoulders):
+    return isinstance(shoulders, str) and shoulders == POSE_SKIPPED
+
+
+class TraceRecorder:
+    """
+    Writes per-frame upstream results into `path/` as chunks of `.npy`
+    columns plus `index.json`. Rows are buffered in preallocated arrays
+    and flushed every `chunk_size` frames, so recording costs one row copy
+    per frame.
+
+        with TraceRecorder("sesi01", fps=30) as rec:
+            runner = InferenceRunner(rppg, resp, recorder=rec)
+    """
+
+    def __init__(self, path, fps=30, chunk_size=4096, meta=None):
+        self.path = path
+        self.fps = fps
+        self.chunk_size = chunk_size
+        self.meta = dict(meta or {})
+        self.frames = 0
+        self.frame_size = None
+        self._chunks = []
+        self._n = 0
+        self._buffers = {name: np.zeros((chunk_size,) + shape, dtype=dtype)
+                         for name, (dtype, shape) in TRACE_COLUMNS.items()}
+        os.makedirs(path, exist_ok=True)
+
+    def append(self, frame, timestamp, rgb, roi=None, shoulders=None):
+        """
+        roi: (x1, y1, x2, y2) atau None; shoulders: titik bahu dalam piksel,
+        None (tidak terdeteksi) atau POSE_SKIPPED.
+        """
+        i = self._n
+        b = self._buffers
+        b["frame"][i] = frame
+        b["time"][i] = np.nan if timestamp is None else timestamp
+        b["rgb"][i] = rgb
+        b["roi"][i] = (-1, -1, -1, -1) if roi is None else roi
+        skipped = _pose_skipped(shoulders)
+        b["shoulders_valid"][i] = shoulders is not None and not skipped
+        b["shoulders"][i] = -1 if skipped else 0 if shoulders is None else shoulders
+        self._n += 1
+        self.frames += 1
+        if self._n == self.chunk_size:
+            self._flush()
+
+    def record_frame(self, ctx, rppg=None, resp=None, pose_ran=True):
+        """
+        Ambil hasil frame terakhir langsung dari processor.
+        pose_ran=False: Pose tidak berjalan di frame ini, titik bahu terakhir
+        milik frame sebelumnya dan tidak dicatat.
+        """
+        if self.frame_size is None:
+            self.frame_size = (ctx.width, ctx.height)
+        index = self.frames if ctx.index is None else ctx.index
+        rgb = (0.0, 0.0, 0.0)
+        roi = None
+        if rppg is not None:
+            last = rppg.rgb.last()
+            rgb = (0.0, 0.0, 0.0) if last is None else last
+            roi = rppg.get_forehead_rect()
+        shoulders = None
+        if resp is not None and not pose_ran:
+            shoulders = POSE_SKIPPED
+        elif resp is not None:
+            last = resp.get_last_shoulder_points()
+            # RespirasiProcessor menyimpan ((0, 0), (0, 0)) jika bahu tidak terdeteksi
+            if last is not None and any(v for point in last for v in point):
+                shoulders = last
+        self.append(index, ctx.timestamp, rgb, roi, shoulders)
+
+    def _flush(self):
+        if self._n == 0:
+            return
+        name = f"chunk_{len(self._chunks):05d}"
+        os.makedirs(os.path.join(self.path, name), exist_ok=True)
+        for column, buf in self._buffers.items():
+            np.save(os.path.join(self.path, name, column + ".npy"), buf[:self._n])
+        self._chunks.append({"name": name, "start": self.frames - self._n, "length": self._n})
+        self._n = 0
+        self._write_index()
+
+    def _write_index(self):
+        index = {
+            "version": TRACE_VERSION,
+            "fps": self.fps,
+            "frames": self.frames - self._n,
+            "frame_size": self.frame_size,
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "columns": {name: {"dtype": dtype, "shape": list(shape)}
+                        for name, (dtype, shape) in TRACE_COLUMNS.items()},
+            "chunks": self._chunks,
+            "meta": self.meta,
+        }
+        tmp = os.path.join(self.path, "index.json.tmp")
+        with open(tmp, "w") as f:
+            json.dump(index, f, indent=1)
+        os.replace(tmp, os.path.join(self.path, "index.json"))
+
+    def close(self):
+        self._flush()
+        self._write_index()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class TraceReader:
+    """
+    Memory-mapped access to a recorded trace. Iteration (and replay) walks
+    the trace chunk by chunk over per-chunk memmaps, so memory stays at
+    one chunk. column(name) returns the whole column: a zero-copy memmap
+    when the trace has a single chunk, otherwise a materialised copy in
+    RAM (use chunks(name) for long traces).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "index.json")) as f:
+            self.index = json.load(f)
+        if self.index.get("version") != TRACE_VERSION:
+            raise ValueError(f"Versi trace tidak didukung: {self.index.get('version')}")
+        self.fps = self.index["fps"]
+        self.frame_size = self.index.get("frame_size")
+        self.meta = self.index.get("meta", {})
+        self._cache = {}
+
+    def __len__(self):
+        return self.index["frames"]
+
+    def chunks(self, name):
+        """
+        Memmap kolom `name` per chunk (tanpa salinan).
+        """
+        for chunk in self.index["chunks"]:
+            yield self._load(chunk, name)
+
+    def _load(self, chunk, name):
+        return np.load(os.path.join(self.path, chunk["name"], name + ".npy"), mmap_mode="r")
+
+    def column(self, name):
+        if name not in self._cache:
+            parts = list(self.chunks(name))
+            if not parts:
+                dtype, shape = TRACE_COLUMNS[name]
+                self._cache[name] = np.zeros((0,) + tuple(shape), dtype=dtype)
+            else:
+                self._cache[name] = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        return self._cache[name]
+
+    def __iter__(self):
+        """
+        Yields (frame, time, rgb, roi_or_None, shoulders) per frame; shoulders
+        is the points, None (not detected) or POSE_SKIPPED.
+        """
+        names = ("frame", "time", "rgb", "roi", "shoulders", "shoulders_valid")
+        for chunk in self.index["chunks"]:
+            columns = [self._load(chunk, name) for name in names]
+            for frame, t, rgb, roi, shoulders, valid in zip(*columns):
+                yield (int(frame), float(t), rgb,
+                       None if roi[0] < 0 else tuple(int(v) for v in roi),
+                       tuple(tuple(int(v) for v in p) for p in shoulders) if valid
+                       else POSE_SKIPPED if shoulders[0, 0] < 0 else None)
+
+
+class ReplaySource:
+    """
+    Feeds a recorded trace back into the signal stages of fresh
+    processors: rppg.process_rgb_mean() and resp.process_shoulder_pixels().
+    No video is decoded and no model runs.
+    """
+
+    def __init__(self, path_or_reader):
+        self.reader = path_or_reader if isinstance(path_or_reader, TraceReader) else TraceReader(path_or_reader)
+        self.fps = self.reader.fps
+
+    def __len__(self):
+        return len(self.reader)
+
+    def replay(self, rppg=None, resp=None, callback=None):
+        """
+        Jalankan seluruh trace. callback(i, rppg, resp) dipanggil tiap frame
+        (mis. untuk mengumpulkan HR/RR per frame). Returns frames/second.
+        """
+        t0 = time.perf_counter()
+        n = 0
+        for i, (_, t, rgb, roi, shoulders) in enumerate(self.reader):
+            # Timestamp capture ikut di-replay agar resampling sama dengan saat rekaman
+            timestamp = None if t != t else t
+            if rppg is not None:
+                rppg.process_rgb_mean(rgb, roi, timestamp=timestamp)
+            if resp is not None and not _pose_skipped(shoulders):
+                resp.process_shoulder_pixels(shoulders, timestamp=timestamp)
+            if callback is not None:
+                callback(i, rppg, resp)
+            n += 1
+        elapsed = time.perf_counter() - t0
+        return n / elapsed if elapsed > 0 else 0.0
@@ -1,14 +1,17 @@
 import matplotlib.pyplot as plt
-import matplotlib.animation as animation
 import cv2
 import numpy as np
+import time
 import matplotlib.gridspec as gridspec
+from frame_context import FrameContext
+from plot_backend import BlitPlot
 
 class SignalDashboard:
-    def __init__(self, rppg_processor, respirasi_processor):
+    def __init__(self, rppg_processor, respirasi_processor, plot_fps=15, process_interval_ms=1):
         self.rppg = rppg_processor
         self.resp = respirasi_processor
         self.cap = cv2.VideoCapture(0)
+        self.frame_index = 0
 
         self.fig = plt.figure(figsize=(12, 8))
         gs = gridspec.GridSpec(2, 2, width_ratios=[2, 1])
@@ -16,77 +19,82 @@ class SignalDashboard:
         # Subplot sinyal rPPG
         self.ax_rppg = self.fig.add_subplot(gs[0, 0])
         self.ax_rppg.set_title("Sinyal rPPG")
-        self.rppg_line, = self.ax_rppg.plot([], [], color='green')
+        self.rppg_plot = BlitPlot(self.ax_rppg, n_points=100, max_fps=plot_fps)
+        self.rppg_line = self.rppg_plot.add_line(color='green')
 
         # Subplot sinyal respirasi
         self.ax_resp = self.fig.add_subplot(gs[1, 0])
         self.ax_resp.set_title("Sinyal Respirasi (Pergerakan Bahu)")
-        self.resp_line, = self.ax_resp.plot([], [], color='orange')
+        self.resp_plot = BlitPlot(self.ax_resp, n_points=100, max_fps=plot_fps)
+        self.resp_line = self.resp_plot.add_line(color='orange')
 
         # Subplot kamera
         self.ax_cam = self.fig.add_subplot(gs[:, 1])
         self.ax_cam.set_title("Camera)")
         self.img_cam = self.ax_cam.imshow(np.zeros((480, 640, 3), dtype=np.uint8))
         self.ax_cam.axis("off")
+        self.cam_plot = BlitPlot(self.ax_cam, max_fps=plot_fps, autoscale=False)
+        self.cam_plot.add_artist(self.img_cam)
 
-        # Batas sumbu awal
-        self.ax_rppg.set_xlim(0, 100)
-        self.ax_resp.set_xlim(0, 100)
+        # Batas sumbu Y awal; selanjutnya diatur BlitPlot (hanya berubah jika data keluar batas)
         self.ax_rppg.set_ylim(0, 255)
         self.ax_resp.set_ylim(-10, 10)
 
+        # Pemrosesan dijalankan timer sendiri; gambar ulang dibatasi plot_fps
+        self.process_interval_ms = process_interval_ms
+
     def update(self, _):
         ret, frame = self.cap.read()
         if not ret:
             return
 
-        # Ambil dan gambar kotak hijau di jidat
-        rect = self.rppg.get_forehead_rect()
-        if rect:
-            x1, y1, x2, y2 = rect
-            cv2.rectangle(frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-
-        frame = cv2.resize(frame, (640, 480))
+        # Processor memakai frame penuh (model berjalan di skala inferensi masing-masing);
+        # tampilan memakai salinan 640x480
+        ctx = FrameContext(frame, index=self.frame_index, timestamp=time.monotonic())
+        view = ctx.resized((640, 480))
+        sx, sy = view.width / ctx.width, view.height / ctx.height
+        self.frame_index += 1
 
-        self.rppg.extract_rgb_from_frame(frame)
-        self.resp.extract_resp_from_frame(frame)
+        self.rppg.extract_rgb_from_frame(ctx)
+        self.resp.extract_resp_from_frame(ctx)
 
         # Ambil data sinyal
         rppg_data = self.rppg.g[-100:]
         resp_data = self.resp.get_signal()[-100:]
 
-        # Convert BGR ke RGB
-        frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        # Salinan RGB (sudah dikonversi di konteks) untuk overlay
+        frame_rgb = view.rgb.copy()
+
+        # Ambil dan gambar kotak hijau di jidat
+        rect = self.rppg.get_forehead_rect()
+        if rect:
+            x1, y1, x2, y2 = rect
+            cv2.rectangle(frame_rgb, (int(x1 * sx), int(y1 * sy)), (int(x2 * sx), int(y2 * sy)), (0, 255, 0), 2)
 
         # Menambahkan titik bahu kiri dan kanan dari MediaPipe Pose
-        shoulder_points = self.resp.get_shoulder_points()
+        shoulder_points = self.resp.get_last_shoulder_points()
         if shoulder_points:
-            left_shoulder, right_shoulder = shoulder_points[-1]
+            left_shoulder, right_shoulder = shoulder_points
             if left_shoulder[0] > 0 and left_shoulder[1] > 0:
-                cv2.circle(frame_rgb, left_shoulder, 6, (0, 255, 0), -1)  # Bahu Kiri
+                cv2.circle(frame_rgb, (int(left_shoulder[0] * sx), int(left_shoulder[1] * sy)), 6, (0, 255, 0), -1)  # Bahu Kiri
             if right_shoulder[0] > 0 and right_shoulder[1] > 0:
-                cv2.circle(frame_rgb, right_shoulder, 6, (0, 255, 0), -1)  # Bahu Kanan
+                cv2.circle(frame_rgb, (int(right_shoulder[0] * sx), int(right_shoulder[1] * sy)), 6, (0, 255, 0), -1)  # Bahu Kanan
 
-        # Update grafik sinyal
-        self.rppg_line.set_data(np.arange(len(rppg_data)), rppg_data)
-        self.resp_line.set_data(np.arange(len(resp_data)), resp_data)
+        # Update grafik sinyal (salin ke buffer, blit hanya garis/gambar)
+        self.rppg_plot.set_line(self.rppg_line, rppg_data)
+        self.resp_plot.set_line(self.resp_line, resp_data)
         self.img_cam.set_data(frame_rgb)
+        self.cam_plot.mark_dirty()
 
-        # Update sumbu X
-        self.ax_rppg.set_xlim(0, len(rppg_data))
-        self.ax_resp.set_xlim(0, len(resp_data))
-
-        # Update sumbu Y dinamis
-        if len(rppg_data) > 0:
-            self.ax_rppg.set_ylim(min(rppg_data) - 10, max(rppg_data) + 10)
-        if len(resp_data) > 0:
-            self.ax_resp.set_ylim(min(resp_data) - 1, max(resp_data) + 1)
+        self.rppg_plot.render()
+        self.resp_plot.render()
+        self.cam_plot.render()
 
     def run(self):
-        ani = animation.FuncAnimation(
-            self.fig, self.update, interval=100,
-            blit=False, cache_frame_data=False
-        )
         plt.tight_layout()
+        timer = self.fig.canvas.new_timer(interval=self.process_interval_ms)
+        timer.add_callback(self.update, None)
+        timer.start()
         plt.show()
+        timer.stop()
         self.cap.release()
\ No newline at end of file